@@ -1,12 +1,25 @@
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
 from carts.models import Cart, CartItem
+from utils.pagination import EstimatedCountPaginator
 
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
+    raw_id_fields = ["product"]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        return super().get_queryset(request).select_related("product")
 
 
 @admin.register(Cart)
 class CartItemAdmin(admin.ModelAdmin):
+    list_display = ["__str__", "region", "status", "updated_at"]
+    list_select_related = ["user", "region"]
+    list_filter = ["status", "region"]
+    raw_id_fields = ["user", "region"]
     inlines = [CartItemInline, ]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from carts.stores import get_cart_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes items of open carts kept in the cache by the cart store (CART_STORE = \"cache\") to the database. "
+        "Only carts changed since the last flush are written, each in a short transaction. Should be scheduled "
+        "periodically (e.g. cron), items not flushed are lost when their cache entry expires or is evicted."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000, help="Carts read from the database at once.")
+
+    def handle(self, *args, **options) -> None:
+        flushed = get_cart_store().flush(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} carts."))
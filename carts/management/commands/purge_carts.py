@@ -0,0 +1,67 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from carts.models import Cart
+from carts.stores import get_cart_store
+from utils.constants import CartStatuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes carts (and their items) not changed for longer than CART_RETENTION_DAYS of their status. "
+        "Open carts kept by the cart store are skipped. Carts are processed in id ranges, each range in a short "
+        "transaction followed by a pause, interrupted runs can be resumed with --start-id."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--status", choices=CartStatuses.names, help="Purge only carts with given status.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Width of the cart id range per transaction.")
+        parser.add_argument("--sleep", type=float, default=0.1, help="Seconds to pause between chunks.")
+        parser.add_argument("--start-id", type=int, default=0, help="Skip carts with lower id.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report number of carts to delete.")
+
+    def handle(self, *args, **options) -> None:
+        statuses = [options["status"]] if options["status"] else CartStatuses.names
+        for status_name in statuses:
+            days = settings.CART_RETENTION_DAYS.get(status_name)
+            if days is None:
+                continue
+            carts = Cart.objects.filter(
+                status=CartStatuses[status_name],
+                updated_at__lt=timezone.now() - datetime.timedelta(days=days),
+                id__gte=options["start_id"]
+            )
+            if options["dry_run"]:
+                self.stdout.write(f"{status_name}: {carts.count()} carts older than {days} days")
+                continue
+            deleted = self.purge(carts, options["chunk_size"], options["sleep"], status_name, get_cart_store())
+            self.stdout.write(self.style.SUCCESS(f"{status_name}: deleted {deleted} carts older than {days} days"))
+
+    def purge(self, carts, chunk_size: int, sleep: float, status_name: str, cart_store) -> int:
+        bounds = carts.aggregate(first=Min("id"), last=Max("id"))
+        if bounds["first"] is None:
+            return 0
+
+        deleted = 0
+        for chunk_start in range(bounds["first"], bounds["last"] + 1, chunk_size):
+            chunk_end = chunk_start + chunk_size
+            with transaction.atomic():
+                rows = list(carts.select_for_update().filter(
+                    id__gte=chunk_start, id__lt=chunk_end
+                ).values_list("id", "user_id"))
+                kept = cart_store.stored_cart_ids(rows) if status_name == CartStatuses.OPEN.name else set()
+                cart_ids = [cart_id for cart_id, _ in rows if cart_id not in kept]
+                if cart_ids:
+                    # Cart items have no dependants or delete signals, so they are deleted with one statement
+                    # without loading them.
+                    _, deleted_rows = Cart.objects.filter(id__in=cart_ids).delete()
+                    deleted += deleted_rows.get(Cart._meta.label, 0)
+            self.stdout.write(f"{status_name}: {deleted} carts deleted, resume with --start-id {chunk_end}")
+            time.sleep(sleep)
+        return deleted
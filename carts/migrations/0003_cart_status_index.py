@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0002_cart_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['status', 'updated_at'], name='cart_status_updated_at_idx'),
+        ),
+    ]
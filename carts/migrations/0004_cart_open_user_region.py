@@ -0,0 +1,36 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+OPEN, CLOSED = 10, 20
+
+
+def close_duplicate_open_carts(apps, schema_editor):
+    """
+    Keeps only the most recently updated open cart of each user and region open, the others are closed.
+    """
+    Cart = apps.get_model("carts", "Cart")
+    duplicates = Cart.objects.filter(status=OPEN).values("user_id", "region_id").annotate(
+        carts=Count("id")
+    ).filter(carts__gt=1).order_by()
+    for duplicate in duplicates.iterator():
+        cart_ids = list(Cart.objects.filter(
+            status=OPEN, user_id=duplicate["user_id"], region_id=duplicate["region_id"]
+        ).order_by("-updated_at", "-id").values_list("id", flat=True))
+        Cart.objects.filter(id__in=cart_ids[1:]).update(status=CLOSED)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0003_cart_status_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_carts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 10)), fields=('user', 'region'), name='cart_open_user_region'),
+        ),
+    ]
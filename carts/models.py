@@ -1,10 +1,45 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import connections, models
+from django.utils import timezone
 
 from utils.constants import CartStatuses
 from shop.models import Region, Product
 
 
+class CartQuerySet(models.QuerySet):
+
+    def upsert_open(self, user_id: int, region_id: int) -> "Cart":
+        """
+        Returns the open cart of the user in the region, creating it if there is none, with a single
+        INSERT ... ON CONFLICT ... RETURNING statement (PostgreSQL, SQLite 3.35+). The partial unique constraint on
+        open carts makes concurrent calls return the same cart. An existing cart gets its `updated_at` bumped.
+        """
+        self._for_write = True
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        opts = self.model._meta
+        cart_id, user, region, status, updated_at = [
+            quote_name(opts.get_field(name).column) for name in ("id", "user", "region", "status", "updated_at")
+        ]
+        now = timezone.now()
+        # The status is inlined, so the conflict target matches the predicate of the partial unique index.
+        sql = (
+            f"INSERT INTO {quote_name(opts.db_table)} ({user}, {region}, {status}, {updated_at}) "
+            f"VALUES (%s, %s, {int(CartStatuses.OPEN)}, %s) "
+            f"ON CONFLICT ({user}, {region}) WHERE {status} = {int(CartStatuses.OPEN)} "
+            f"DO UPDATE SET {updated_at} = EXCLUDED.{updated_at} "
+            f"RETURNING {cart_id}"
+        )
+        params = [user_id, region_id, opts.get_field("updated_at").get_db_prep_value(now, connection)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row_id = cursor.fetchone()[0]
+        cart = self.model(id=row_id, user_id=user_id, region_id=region_id, status=CartStatuses.OPEN, updated_at=now)
+        cart._state.adding = False
+        cart._state.db = self.db
+        return cart
+
+
 class Cart(models.Model):
     user = models.ForeignKey(
         User,
@@ -22,10 +57,22 @@ class Cart(models.Model):
         related_name="region_carts",
         on_delete=models.CASCADE
     )
+    updated_at = models.DateTimeField(verbose_name="updated at", auto_now=True)
 
     class Meta:
         verbose_name = "Cart"
         verbose_name_plural = "Carts"
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="cart_user_updated_at_idx"),
+            models.Index(fields=["status", "updated_at"], name="cart_status_updated_at_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "region"], condition=models.Q(status=CartStatuses.OPEN), name="cart_open_user_region"
+            ),
+        ]
+
+    objects = CartQuerySet.as_manager()
 
     def __str__(self) -> str:
         return f"Cart of user {self.user} cart, id: {self.id}"
@@ -1,6 +1,11 @@
+from collections import defaultdict
+from typing import Iterable
+
+from django.db.models import QuerySet
 from rest_framework import serializers
 
 from carts.models import CartItem, Cart
+from carts.stores import get_cart_store
 
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -9,6 +14,23 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ["product"]
 
 
+def carts_data(carts: Iterable[Cart]) -> list[dict]:
+    """
+    CartSerializer representation of carts, items are read from the cart store with one query (or cache read).
+    """
+    carts = list(carts)
+    items = get_cart_store().cart_items(carts)
+    return build_carts_data(
+        [(cart.id, cart.status) for cart in carts],
+        [(cart.id, product_id) for cart in carts for product_id in items.get(cart.id, [])],
+    )
+
+
+class CartListSerializer(serializers.ListSerializer):
+    def to_representation(self, data: QuerySet | list[Cart]) -> list[dict]:
+        return carts_data(data.all() if isinstance(data, QuerySet) else data)
+
+
 class CartSerializer(serializers.ModelSerializer):
     cart_items = CartItemSerializer(many=True)
 
@@ -21,16 +43,33 @@ class CartSerializer(serializers.ModelSerializer):
             'region': {'write_only': True},
             'cart_items': {'write_only': True},
         }
+        list_serializer_class = CartListSerializer
 
     def create(self, validated_data: dict) -> Cart:
         """
-        Create or get a cart with cart items.
-        :param validated_data: region id and cart items
+        Create or get the open cart of the user in the region and add the cart items to the cart store (see
+        carts.stores).
+        :param validated_data: user, region and cart items
         :return: Cart
         """
-        cart_items = validated_data.pop('cart_items')
-        cart, created = Cart.objects.get_or_create(**validated_data)
+        return get_cart_store().add_items(
+            user_id=validated_data["user"].id,
+            region_id=validated_data["region"].id,
+            product_ids=[cart_item["product"].id for cart_item in validated_data["cart_items"]],
+        )
+
+    def to_representation(self, instance: Cart) -> dict:
+        return carts_data([instance])[0]
+
 
-        for cart_item in cart_items:
-            CartItem.objects.create(cart=cart, **cart_item)
-        return cart
+def build_carts_data(cart_rows: Iterable[tuple], item_rows: Iterable[tuple]) -> list[dict]:
+    """
+    Assembles CartSerializer representation from flat rows.
+    :param cart_rows: (id, status) tuples
+    :param item_rows: (cart id, product id) tuples ordered by cart item id
+    :return: list of carts data
+    """
+    cart_items = defaultdict(list)
+    for cart_id, product_id in item_rows:
+        cart_items[cart_id].append({"product": product_id})
+    return [{"id": cart_id, "status": status, "cart_items": cart_items[cart_id]} for cart_id, status in cart_rows]
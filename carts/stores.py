@@ -0,0 +1,233 @@
+"""
+Storage of items of open carts, selected by CART_STORE. "database" writes every added item as a CartItem row.
+"cache" keeps the items in the CART_STORE_CACHE cache, one entry per user, and writes them to CartItem rows only at
+checkout and by `flush_carts`, so browsing does not write to the database: the Cart row is created by the first item
+added to a region and every later item changes only the cache entry. Closed carts are always read from the database.
+
+Entries are changed with get and set like throttle buckets, concurrent changes of carts of one user may lose one of
+them. Items not flushed yet are lost when the entry expires or is evicted, so the cache must not evict entries and
+`flush_carts` should run more often than CART_STORE_TIMEOUT. purge_carts keeps open carts which have an entry, their
+`updated_at` changes only when they are flushed.
+"""
+import datetime
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from carts.models import Cart, CartItem
+from utils.constants import CartStatuses
+from utils.iterators import avalues_list, batched
+
+
+def database_items(cart_ids: Iterable[int]) -> dict[int, list[int]]:
+    """
+    Product ids of cart items stored in the database, in order of addition.
+    """
+    items = defaultdict(list)
+    for cart_id, product_id in CartItem.objects.filter(cart_id__in=list(cart_ids)).order_by("id").values_list(
+            "cart_id", "product_id"
+    ):
+        items[cart_id].append(product_id)
+    return items
+
+
+def write_items(cart_id: int, product_ids: list[int]) -> None:
+    """
+    Replaces cart items of the cart in the database, so writing the same items again does not duplicate them.
+    """
+    CartItem.objects.filter(cart_id=cart_id).delete()
+    CartItem.objects.bulk_create([CartItem(cart_id=cart_id, product_id=product_id) for product_id in product_ids])
+
+
+class DatabaseCartStore:
+    """
+    Items are CartItem rows written when they are added.
+    """
+
+    def add_items(self, user_id: int, region_id: int, product_ids: list[int]) -> Cart:
+        """
+        Adds items to the open cart of the user in the region, the cart is upserted and items are inserted with one
+        statement each, in one transaction.
+        """
+        with transaction.atomic():
+            cart = Cart.objects.upsert_open(user_id=user_id, region_id=region_id)
+            CartItem.objects.bulk_create([CartItem(cart=cart, product_id=product_id) for product_id in product_ids])
+        return cart
+
+    def cart_items(self, carts: Iterable[Cart]) -> dict[int, list[int]]:
+        return database_items(cart.id for cart in carts)
+
+    async def acart_items(self, cart_ids: list[int], user_id: int) -> dict[int, list[int]]:
+        items = defaultdict(list)
+        for cart_id, product_id in await avalues_list(
+                CartItem.objects.filter(cart_id__in=cart_ids).order_by("id"), "cart_id", "product_id"
+        ):
+            items[cart_id].append(product_id)
+        return items
+
+    def persist(self, cart: Cart) -> list[int]:
+        """
+        Writes items of the cart to the database (at checkout) and returns their product ids.
+        """
+        return database_items([cart.id])[cart.id]
+
+    def forget(self, cart: Cart) -> None:
+        """
+        Drops the stored items of a cart which was checked out or deleted.
+        """
+
+    def changed_at(self, user_id: int) -> datetime.datetime | None:
+        """
+        Time of the last change not reflected by `updated_at` of carts of the user.
+        """
+        return None
+
+    def flush(self, batch_size: int = 1000) -> int:
+        """
+        Writes stored items to the database, returns number of written carts. Items are already there.
+        """
+        return 0
+
+    def stored_cart_ids(self, carts: Iterable[tuple[int, int]]) -> set[int]:
+        """
+        Ids of carts, given as (cart id, user id), whose items are kept outside the database. Their `updated_at` does
+        not reflect changes, so purge_carts keeps them.
+        """
+        return set()
+
+
+class CacheCartStore(DatabaseCartStore):
+    """
+    Items of open carts are kept in the cache entry of their user: {"changed_at": time, "carts": {cart id: {"region":
+    region id, "items": product ids, "version": number of changes, "flushed": version written to the database}}}.
+    Carts missing in the entry (created with the database store or flushed and evicted) are read from the database.
+    """
+
+    def __init__(self) -> None:
+        self.cache = caches[settings.CART_STORE_CACHE]
+
+    @staticmethod
+    def entry_key(user_id: int) -> str:
+        return f"cart_store_{user_id}"
+
+    def get_entry(self, user_id: int) -> dict:
+        return self.cache.get(self.entry_key(user_id)) or {"changed_at": None, "carts": {}}
+
+    def set_entry(self, user_id: int, entry: dict) -> None:
+        self.cache.set(self.entry_key(user_id), entry, settings.CART_STORE_TIMEOUT)
+
+    def add_items(self, user_id: int, region_id: int, product_ids: list[int]) -> Cart:
+        """
+        Adds items to the entry. The open cart of the region is upserted only when the entry has none yet, its items
+        stored in the database are copied to the entry. A cart of the entry which is no longer open (deleted or
+        checked out by another process) is dropped from the entry first.
+        """
+        entry = self.get_entry(user_id)
+        cart_id = next((cart_id for cart_id, cart in entry["carts"].items() if cart["region"] == region_id), None)
+        if cart_id is not None and not Cart.objects.filter(id=cart_id, status=CartStatuses.OPEN).exists():
+            del entry["carts"][cart_id]
+            cart_id = None
+        if cart_id is None:
+            cart_id = Cart.objects.upsert_open(user_id=user_id, region_id=region_id).id
+            entry["carts"][cart_id] = {
+                "region": region_id, "items": database_items([cart_id])[cart_id], "version": 0, "flushed": 0
+            }
+        stored = entry["carts"][cart_id]
+        stored["items"].extend(product_ids)
+        stored["version"] += 1
+        entry["changed_at"] = timezone.now()
+        self.set_entry(user_id, entry)
+
+        cart = Cart(id=cart_id, user_id=user_id, region_id=region_id, status=CartStatuses.OPEN)
+        cart._state.adding = False
+        cart._state.db = Cart.objects.db
+        return cart
+
+    def cart_items(self, carts: Iterable[Cart]) -> dict[int, list[int]]:
+        carts = list(carts)
+        entries = self.cache.get_many([self.entry_key(user_id) for user_id in {cart.user_id for cart in carts}])
+        items = {}
+        for cart in carts:
+            stored = entries.get(self.entry_key(cart.user_id), {}).get("carts", {}).get(cart.id)
+            if stored is not None and cart.status == CartStatuses.OPEN:
+                items[cart.id] = stored["items"]
+        return {**database_items(cart.id for cart in carts if cart.id not in items), **items}
+
+    async def acart_items(self, cart_ids: list[int], user_id: int) -> dict[int, list[int]]:
+        """
+        Carts of the entry are open (closed ones are forgotten), other carts are read from the database.
+        """
+        stored = (await self.cache.aget(self.entry_key(user_id)) or {}).get("carts", {})
+        items = {cart_id: stored[cart_id]["items"] for cart_id in cart_ids if cart_id in stored}
+        missing = [cart_id for cart_id in cart_ids if cart_id not in items]
+        return {**await super().acart_items(missing, user_id), **items}
+
+    def persist(self, cart: Cart) -> list[int]:
+        stored = self.get_entry(cart.user_id)["carts"].get(cart.id)
+        if stored is None:
+            return super().persist(cart)
+        write_items(cart.id, stored["items"])
+        return stored["items"]
+
+    def forget(self, cart: Cart) -> None:
+        entry = self.get_entry(cart.user_id)
+        if entry["carts"].pop(cart.id, None) is not None:
+            entry["changed_at"] = timezone.now()
+            self.set_entry(cart.user_id, entry)
+
+    def changed_at(self, user_id: int) -> datetime.datetime | None:
+        return self.get_entry(user_id)["changed_at"]
+
+    def flush(self, batch_size: int = 1000) -> int:
+        """
+        Writes items of open carts changed since their last flush to the database and touches their `updated_at`.
+        Carts are read in batches with one cache read per batch. Returns number of written carts.
+        """
+        flushed = 0
+        rows = Cart.objects.filter(status=CartStatuses.OPEN).order_by("id").values_list("id", "user_id")
+        for batch in batched(rows.iterator(chunk_size=batch_size), batch_size):
+            entries = self.cache.get_many([self.entry_key(user_id) for _, user_id in batch])
+            for cart_id, user_id in batch:
+                stored = entries.get(self.entry_key(user_id), {}).get("carts", {}).get(cart_id)
+                if stored is None or stored["version"] == stored["flushed"]:
+                    continue
+                with transaction.atomic():
+                    # Carts checked out meanwhile are skipped, checkout writes their items itself.
+                    # The update locks the cart row until the items are written.
+                    if not Cart.objects.filter(id=cart_id, status=CartStatuses.OPEN).update(updated_at=timezone.now()):
+                        continue
+                    write_items(cart_id, stored["items"])
+                self.mark_flushed(user_id, cart_id, stored["version"])
+                flushed += 1
+        return flushed
+
+    def stored_cart_ids(self, carts: Iterable[tuple[int, int]]) -> set[int]:
+        carts = list(carts)
+        entries = self.cache.get_many([self.entry_key(user_id) for user_id in {user_id for _, user_id in carts}])
+        return {
+            cart_id for cart_id, user_id in carts
+            if cart_id in entries.get(self.entry_key(user_id), {}).get("carts", {})
+        }
+
+    def mark_flushed(self, user_id: int, cart_id: int, version: int) -> None:
+        entry = self.get_entry(user_id)
+        stored = entry["carts"].get(cart_id)
+        if stored is not None:
+            stored["flushed"] = max(stored["flushed"], version)
+            self.set_entry(user_id, entry)
+
+
+STORES: dict[str, Callable] = {
+    "database": DatabaseCartStore,
+    "cache": CacheCartStore,
+}
+
+
+def get_cart_store() -> DatabaseCartStore | CacheCartStore:
+    if settings.CART_STORE not in STORES:
+        raise ValueError(f"Unsupported cart store: {settings.CART_STORE}")
+    return STORES[settings.CART_STORE]()
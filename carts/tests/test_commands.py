@@ -0,0 +1,46 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from carts.models import Cart, CartItem
+from utils.constants import CartStatuses
+from utils.factories import CartFactory, CartItemFactory
+
+
+@pytest.mark.django_db
+class PurgeCartsCommandTestCase:
+
+    @staticmethod
+    def create_cart(status: int, days_old: int) -> Cart:
+        cart = CartFactory(status=status)
+        CartItemFactory.create_batch(2, cart=cart)
+        Cart.objects.filter(id=cart.id).update(updated_at=timezone.now() - datetime.timedelta(days=days_old))
+        return cart
+
+    def test_purge_removes_expired_carts_in_chunks(self, settings):
+        settings.CART_RETENTION_DAYS = {"OPEN": 30, "CLOSED": 7}
+        expired = [self.create_cart(CartStatuses.CLOSED, 8) for _ in range(3)]
+        expired.append(self.create_cart(CartStatuses.OPEN, 31))
+        kept = [self.create_cart(CartStatuses.CLOSED, 1), self.create_cart(CartStatuses.OPEN, 8)]
+        stdout = StringIO()
+
+        call_command("purge_carts", chunk_size=1, sleep=0, stdout=stdout)
+
+        assert set(Cart.objects.values_list("id", flat=True)) == {cart.id for cart in kept}
+        assert not CartItem.objects.filter(cart_id__in=[cart.id for cart in expired]).exists()
+        assert CartItem.objects.count() == 4
+        assert "CLOSED: deleted 3 carts" in stdout.getvalue()
+
+    def test_purge_dry_run_and_status_without_retention(self, settings):
+        settings.CART_RETENTION_DAYS = {"OPEN": None, "CLOSED": 7}
+        self.create_cart(CartStatuses.OPEN, 365)
+        self.create_cart(CartStatuses.CLOSED, 8)
+
+        call_command("purge_carts", dry_run=True, stdout=StringIO())
+        assert Cart.objects.count() == 2
+
+        call_command("purge_carts", sleep=0, stdout=StringIO())
+        assert list(Cart.objects.values_list("status", flat=True)) == [CartStatuses.OPEN]
@@ -0,0 +1,133 @@
+import datetime
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from carts.models import Cart, CartItem
+from orders.models import OrderItem
+from utils.constants import CartStatuses
+from utils.factories import CartFactory, ProductFactory
+
+
+@pytest.fixture
+def cache_store(settings):
+    settings.CART_STORE = "cache"
+
+
+def writes(queries: CaptureQueriesContext) -> list[str]:
+    return [query["sql"] for query in queries if query["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")]
+
+
+@pytest.mark.django_db
+class CacheCartStoreTestCase:
+    url = reverse("api:cart-list")
+
+    def add(self, client, region, product) -> dict:
+        data = {"region": region.id, "cart_items": [{"product": product.id}]}
+        return client.post(path=self.url, data=data, format="json").data
+
+    def test_items_added_without_database_writes(self, client, region, product, cache_store):
+        other_product = ProductFactory()
+        cart_id = self.add(client, region, product)["id"]
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.add(client, region, other_product)
+
+        assert not writes(queries)
+        assert data == {
+            "id": cart_id,
+            "status": CartStatuses.OPEN,
+            "cart_items": [{"product": product.id}, {"product": other_product.id}],
+        }
+        assert Cart.objects.get().id == cart_id
+        assert not CartItem.objects.exists()
+
+    def test_reads_include_stored_items(self, client, region, product, cache_store):
+        cart_id = self.add(client, region, product)["id"]
+        etag = client.get(self.url)["ETag"]
+        self.add(client, region, product)
+
+        response = client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["cart_items"] == [{"product": product.id}] * 2
+        assert client.get(reverse("api:cart-detail", args=[cart_id])).data == response.data[0]
+        assert client.get(reverse("async:cart-list")).json() == json.loads(response.content)
+        assert client.get(reverse("async:cart-detail", args=[cart_id])).json() == response.data[0]
+        batch = client.get(reverse("api:cart-batch"), {"ids": str(cart_id)}).data
+        assert batch[0]["data"] == response.data[0]
+
+    def test_checkout_writes_items(
+            self, client, region, product, global_limit, cache_store, django_capture_on_commit_callbacks
+    ):
+        cart_id = self.add(client, region, product)["id"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(path=reverse("api:order-list"), data={"cart_id": cart_id})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert list(CartItem.objects.filter(cart_id=cart_id).values_list("product_id", flat=True)) == [product.id]
+        assert list(OrderItem.objects.values_list("item_id", flat=True)) == [product.id]
+        assert Cart.objects.get(id=cart_id).status == CartStatuses.CLOSED
+        new_cart_id = self.add(client, region, product)["id"]
+        assert new_cart_id != cart_id
+        assert client.get(reverse("api:cart-detail", args=[cart_id])).data["cart_items"] == [{"product": product.id}]
+
+    def test_flush_writes_changed_carts(self, client, region, product, cache_store):
+        cart_id = self.add(client, region, product)["id"]
+        self.add(client, region, product)
+        updated_at = Cart.objects.get().updated_at
+
+        call_command("flush_carts", stdout=StringIO())
+
+        assert list(CartItem.objects.filter(cart_id=cart_id).values_list("product_id", flat=True)) == [product.id] * 2
+        assert Cart.objects.get().updated_at > updated_at
+        with CaptureQueriesContext(connection) as queries:
+            call_command("flush_carts", stdout=StringIO())
+        assert not writes(queries)
+
+        self.add(client, region, product)
+        call_command("flush_carts", stdout=StringIO())
+        assert CartItem.objects.filter(cart_id=cart_id).count() == 3
+
+    def test_items_of_database_cart_are_kept(self, client, region, product, cart_1_item, cache_store):
+        data = self.add(client, region, product)
+
+        assert data["id"] == cart_1_item.id
+        assert data["cart_items"] == [{"product": product.id}] * 2
+
+    def test_deleted_cart_is_forgotten(self, client, region, product, cache_store):
+        cart_id = self.add(client, region, product)["id"]
+
+        assert client.delete(reverse("api:cart-detail", args=[cart_id])).status_code == status.HTTP_204_NO_CONTENT
+
+        assert self.add(client, region, product)["cart_items"] == [{"product": product.id}]
+        assert Cart.objects.count() == 1
+
+    def test_cart_deleted_outside_store_is_replaced(self, client, region, product, cache_store):
+        cart_id = self.add(client, region, product)["id"]
+        Cart.objects.filter(id=cart_id).delete()
+
+        data = self.add(client, region, product)
+
+        assert data["id"] != cart_id
+        assert data["cart_items"] == [{"product": product.id}]
+        assert Cart.objects.get().id == data["id"]
+
+    def test_purge_keeps_stored_open_carts(self, client, region, product, settings, cache_store):
+        settings.CART_RETENTION_DAYS = {"OPEN": 30, "CLOSED": 7}
+        cart_id = self.add(client, region, product)["id"]
+        expired = CartFactory(status=CartStatuses.OPEN)
+        Cart.objects.update(updated_at=timezone.now() - datetime.timedelta(days=31))
+
+        call_command("purge_carts", sleep=0, stdout=StringIO())
+
+        assert list(Cart.objects.values_list("id", flat=True)) == [cart_id]
+        assert not Cart.objects.filter(id=expired.id).exists()
@@ -1,8 +1,16 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from django.db import connection
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.test import APIClient
 
-from utils.constants import CartStatuses
+from utils.constants import CartStatuses, ErrorMessages
+from carts.models import Cart
+from utils.factories import CartFactory, ProductFactory
 
 
 @pytest.mark.django_db
@@ -54,3 +62,103 @@ class CartViewSetTestCase:
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.data.get("region")[0] == 'Invalid pk "12345" - object does not exist.'
+
+    def test_list_not_modified_until_item_added(self, client, product, region, cart_1_item):
+        response = client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+
+        assert client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post(
+            path=self.url, data={"region": region.id, "cart_items": [{"product": product.id}]}, format="json"
+        )
+
+        modified = client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert modified.status_code == status.HTTP_200_OK
+        assert len(modified.data[0]["cart_items"]) == 2
+
+
+@pytest.mark.django_db
+class CartAsyncViewsTestCase:
+    def test_list_matches_sync_list(self, client, cart_1_item, cart_1_item_second_region):
+        response = client.get(reverse("async:cart-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == json.loads(client.get(reverse("api:cart-list")).content)
+
+    def test_retrieve_matches_sync_retrieve(self, client, cart_1_item):
+        response = client.get(reverse("async:cart-detail", args=[cart_1_item.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == json.loads(client.get(reverse("api:cart-detail", args=[cart_1_item.id])).content)
+
+    def test_cannot_retrieve_cart_of_other_user(self, client, region):
+        cart = CartFactory(region=region)
+
+        response = client.get(reverse("async:cart-detail", args=[cart.id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_anonymous_user_not_authenticated(self):
+        response = APIClient().get(reverse("async:cart-list"))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class CartBatchRetrieveTestCase:
+
+    def test_batch_returns_own_carts_with_items(self, client, user, product, cart_1_item, django_assert_num_queries):
+        other_cart = CartFactory(region=cart_1_item.region)
+
+        with django_assert_num_queries(2):
+            response = client.get(reverse("api:cart-batch"), {"ids": f"{cart_1_item.id},{other_cart.id}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [
+            {
+                "id": cart_1_item.id,
+                "status": status.HTTP_200_OK,
+                "data": {"id": cart_1_item.id, "status": CartStatuses.OPEN, "cart_items": [{"product": product.id}]},
+            },
+            {"id": other_cart.id, "status": status.HTTP_404_NOT_FOUND, "detail": ErrorMessages.OBJECT_NOT_FOUND},
+        ]
+
+
+@pytest.mark.django_db(transaction=True)
+class CartConcurrencyTestCase:
+
+    def test_parallel_creates_share_one_open_cart(self, user, region):
+        products = ProductFactory.create_batch(8)
+        barrier = threading.Barrier(len(products))
+
+        def create(product) -> int:
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+            try:
+                response = client.post(
+                    path=reverse("api:cart-list"),
+                    data={"region": region.id, "cart_items": [{"product": product.id}]},
+                    format="json",
+                )
+            finally:
+                connection.close()
+            return response.status_code
+
+        with ThreadPoolExecutor(max_workers=len(products)) as executor:
+            statuses = list(executor.map(create, products))
+
+        assert statuses == [status.HTTP_201_CREATED] * len(products)
+        cart = Cart.objects.get(user=user, region=region, status=CartStatuses.OPEN)
+        assert sorted(cart.cart_items.values_list("product_id", flat=True)) == sorted(p.id for p in products)
+
+    def test_new_open_cart_after_checkout(self, client, user, product, region):
+        data = {"region": region.id, "cart_items": [{"product": product.id}]}
+        first_id = client.post(path=reverse("api:cart-list"), data=data, format="json").data["id"]
+        Cart.objects.filter(id=first_id).update(status=CartStatuses.CLOSED)
+
+        second_id = client.post(path=reverse("api:cart-list"), data=data, format="json").data["id"]
+
+        assert second_id != first_id
+        assert client.post(path=reverse("api:cart-list"), data=data, format="json").data["id"] == second_id
@@ -1,24 +1,74 @@
+import datetime
+
 from django.db.models import QuerySet
+from django.http import HttpRequest, JsonResponse
 from rest_framework import mixins
 from rest_framework.viewsets import GenericViewSet
 
 from carts.models import Cart
-from carts.serializers import CartSerializer
+from carts.serializers import CartSerializer, build_carts_data
+from carts.stores import get_cart_store
+from utils.authentication import aauthenticate, not_authenticated_response, not_found_response
+from utils.iterators import avalues_list
+from utils.mixins import BatchRetrieveMixin, ConditionalGetMixin
+from utils.throttling import CheckoutThrottleMixin
 
 
 # Create your views here.
 class CartViewSet(
-    mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin, mixins.ListModelMixin, GenericViewSet
+    CheckoutThrottleMixin, ConditionalGetMixin, BatchRetrieveMixin, mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin, mixins.DestroyModelMixin, mixins.ListModelMixin, GenericViewSet
 ):
     """
     CartViewSet is a viewset that provides the following actions:
-    create, retrieve, destroy, list.
+    create, retrieve, batch (see BatchRetrieveMixin), destroy, list.
     All action is available only for the owner of the carts.
+    List and retrieve answer conditional requests (ETag, Last-Modified) with 304 if the carts did not change.
+    Create is throttled per user, region and globally (see CheckoutThrottleMixin).
+    Items of open carts are read from the cart store (see carts.stores), which may keep them outside the database.
     """
     serializer_class = CartSerializer
 
     def get_queryset(self) -> QuerySet:
+        if getattr(self, 'swagger_fake_view', False):
+            return Cart.objects.none()
         return Cart.objects.filter(user=self.request.user)
 
+    def get_changed_at(self) -> datetime.datetime | None:
+        return get_cart_store().changed_at(self.request.user.id)
+
     def perform_create(self, serializer) -> None:
         serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance: Cart) -> None:
+        get_cart_store().forget(instance)
+        instance.delete()
+
+
+async def cart_list_async(request: HttpRequest) -> JsonResponse:
+    """
+    Async version of cart list, returns the same data as CartViewSet.list using the async ORM.
+    """
+    user = await aauthenticate(request)
+    if user is None:
+        return not_authenticated_response()
+    cart_rows = await avalues_list(Cart.objects.filter(user=user), "id", "status")
+    items = await get_cart_store().acart_items([cart_id for cart_id, _ in cart_rows], user.id)
+    item_rows = [(cart_id, product_id) for cart_id, _ in cart_rows for product_id in items.get(cart_id, [])]
+    return JsonResponse(build_carts_data(cart_rows, item_rows), safe=False)
+
+
+async def cart_detail_async(request: HttpRequest, pk: int) -> JsonResponse:
+    """
+    Async version of cart retrieve.
+    """
+    user = await aauthenticate(request)
+    if user is None:
+        return not_authenticated_response()
+    try:
+        cart = await Cart.objects.filter(user=user).values("id", "status").aget(pk=pk)
+    except Cart.DoesNotExist:
+        return not_found_response()
+    items = await get_cart_store().acart_items([pk], user.id)
+    item_rows = [(pk, product_id) for product_id in items.get(pk, [])]
+    return JsonResponse(build_carts_data([tuple(cart.values())], item_rows)[0])
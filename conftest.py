@@ -1,4 +1,10 @@
+import os
+import tempfile
+
 import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
 from rest_framework.test import APIClient
 
 from utils.factories import (
@@ -7,6 +13,35 @@ from utils.factories import (
 )
 
 
+ORDER_SHARD_DATABASES = ["shard_1", "shard_2"]
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    Adds SQLite files used as order shards (see orders.sharding) to the test databases. A SQLite default database is
+    tested in a file as well, an in-memory database shared by threads fails concurrent writes instead of waiting.
+    """
+    default = settings.DATABASES["default"]
+    if default["ENGINE"].endswith("sqlite3") and not default.get("TEST", {}).get("NAME"):
+        default.setdefault("TEST", {})["NAME"] = os.path.join(tempfile.gettempdir(), "drf_shop_default_test.sqlite3")
+    for alias in ORDER_SHARD_DATABASES:
+        name = os.path.join(tempfile.gettempdir(), f"drf_shop_{alias}.sqlite3")
+        settings.DATABASES.setdefault(alias, {
+            "ENGINE": "django_drf_shop.db.sqlite3",
+            "NAME": name,
+            "TEST": {"NAME": name.replace(".sqlite3", "_test.sqlite3")},
+        })
+    # Fills in defaults of the added databases, the connection handler shares the DATABASES dict.
+    connections.configure_settings(settings.DATABASES)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def user(db):
     return UserFactory()
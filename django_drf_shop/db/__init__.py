@@ -0,0 +1,42 @@
+"""
+Database configuration built from environment variables. Standard engines are replaced with the tuned backends of
+this package: SQLite always (WAL journal, busy timeout, BEGIN IMMEDIATE support), PostgreSQL when
+`DB_POOL_MAX_SIZE` is set (per process connection pool).
+"""
+import environ
+
+SQLITE_ENGINE = "django.db.backends.sqlite3"
+POSTGRESQL_ENGINE = "django.db.backends.postgresql"
+
+
+def database_config(env: environ.Env) -> dict:
+    engine = env("SQL_ENGINE", default=SQLITE_ENGINE)
+    config = {
+        "ENGINE": engine,
+        "NAME": env("POSTGRES_DATABASE", default=None),
+        "USER": env("POSTGRES_USER", default="user"),
+        "PASSWORD": env("POSTGRES_PASSWORD", default="password"),
+        "HOST": env("POSTGRES_HOST", default="localhost"),
+        "PORT": env("POSTGRES_PORT", default="5432"),
+        # Connections are kept open between requests and checked before reuse.
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+        "OPTIONS": {},
+    }
+    if engine == SQLITE_ENGINE:
+        config["ENGINE"] = "django_drf_shop.db.sqlite3"
+        config["OPTIONS"] = {
+            "timeout": env.float("SQLITE_BUSY_TIMEOUT", default=5.0),
+            "journal_mode": env("SQLITE_JOURNAL_MODE", default="WAL"),
+            "synchronous": env("SQLITE_SYNCHRONOUS", default="NORMAL"),
+        }
+    elif engine == POSTGRESQL_ENGINE and env.int("DB_POOL_MAX_SIZE", default=0):
+        config["ENGINE"] = "django_drf_shop.db.postgresql_pool"
+        # Connections go back to the pool at the end of each request instead of staying with the thread.
+        config["CONN_MAX_AGE"] = 0
+        config["OPTIONS"] = {
+            "pool_min_size": env.int("DB_POOL_MIN_SIZE", default=1),
+            "pool_max_size": env.int("DB_POOL_MAX_SIZE"),
+            "pool_timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+        }
+    return config
@@ -0,0 +1,92 @@
+"""
+PostgreSQL backend which takes connections from a per process pool (psycopg2 ThreadedConnectionPool) and returns
+them when Django closes the connection, so requests (and ASGI threads) reuse a bounded number of open connections.
+OPTIONS: `pool_min_size`, `pool_max_size` and `pool_timeout` (seconds to wait for a free connection).
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from django.db.utils import OperationalError
+from psycopg2 import pool as psycopg2_pool
+
+POOL_OPTIONS = ("pool_min_size", "pool_max_size", "pool_timeout")
+
+
+class ConnectionPool:
+    def __init__(self, min_size: int, max_size: int, timeout: float, conn_params: dict) -> None:
+        self.pool = psycopg2_pool.ThreadedConnectionPool(min_size, max_size, **conn_params)
+        # ThreadedConnectionPool fails at once when exhausted, the semaphore makes callers wait for a connection.
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.timeout = timeout
+
+    def getconn(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise OperationalError(f"No database connection available within {self.timeout} seconds.")
+        try:
+            connection = self.pool.getconn()
+            if connection.closed:
+                self.pool.putconn(connection, close=True)
+                connection = self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+        return connection
+
+    def putconn(self, connection) -> None:
+        """
+        Returns the connection, an open transaction is rolled back by the pool and broken connections are closed.
+        """
+        try:
+            self.pool.putconn(connection, close=bool(connection.closed))
+        finally:
+            self.slots.release()
+
+
+_pools: dict[tuple[int, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, options: dict, conn_params: dict) -> ConnectionPool:
+    """
+    Pools are created per process, connections opened in the gunicorn master are never shared with workers.
+    """
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                options.get("pool_min_size", 1), options["pool_max_size"], options.get("pool_timeout", 10.0),
+                conn_params
+            )
+        return _pools[key]
+
+
+class PooledDatabase:
+    """
+    Stands for the psycopg2 module in DatabaseWrapper, `connect()` takes a connection from the pool.
+    """
+    def __init__(self, connection_pool: ConnectionPool) -> None:
+        self.connection_pool = connection_pool
+
+    def connect(self, **conn_params):
+        return self.connection_pool.getconn()
+
+    def __getattr__(self, name: str):
+        return getattr(base.Database, name)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self) -> dict:
+        conn_params = super().get_connection_params()
+        for option in POOL_OPTIONS:
+            conn_params.pop(option, None)
+        return conn_params
+
+    def get_new_connection(self, conn_params: dict):
+        self.Database = PooledDatabase(get_pool(self.alias, self.settings_dict["OPTIONS"], conn_params))
+        return super().get_new_connection(conn_params)
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.Database.connection_pool.putconn(self.connection)
@@ -0,0 +1,34 @@
+"""
+SQLite backend for concurrent requests. `journal_mode` and `synchronous` OPTIONS are applied as PRAGMAs to every
+new connection (WAL lets readers work while a write transaction is open), `timeout` is the busy timeout.
+Transactions started with `utils.transactions.immediate_atomic` take the write lock with BEGIN IMMEDIATE.
+"""
+from django.db.backends.sqlite3 import base
+
+PRAGMA_OPTIONS = ("journal_mode", "synchronous")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    begin_immediate = False
+
+    def get_connection_params(self) -> dict:
+        conn_params = super().get_connection_params()
+        for option in PRAGMA_OPTIONS:
+            conn_params.pop(option, None)
+        return conn_params
+
+    def get_new_connection(self, conn_params: dict):
+        connection = super().get_new_connection(conn_params)
+        options = self.settings_dict["OPTIONS"]
+        for option in PRAGMA_OPTIONS:
+            if options.get(option):
+                connection.execute(f"PRAGMA {option} = {options[option]}")
+        return connection
+
+    def _start_transaction_under_autocommit(self) -> None:
+        """
+        A deferred transaction takes the write lock on its first write. If another connection writes meanwhile the
+        lock cannot be upgraded and the transaction fails with "database is locked" without waiting for the busy
+        timeout. BEGIN IMMEDIATE takes the lock (waiting for it) when the transaction starts.
+        """
+        self.cursor().execute("BEGIN IMMEDIATE" if self.begin_immediate else "BEGIN")
@@ -0,0 +1,84 @@
+"""
+OpenAPI schema served from a file generated at build time (`python manage.py build_openapi_schema`).
+drf_yasg is imported only when the schema has to be generated or the swagger UI is requested.
+"""
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_INFO = {
+    "title": "Shop API",
+    "default_version": "v1",
+    "description": "API documentation",
+}
+
+
+@lru_cache
+def get_schema_view() -> type:
+    from drf_yasg import openapi
+    from drf_yasg.views import get_schema_view as yasg_schema_view
+    from rest_framework import authentication, permissions
+
+    return yasg_schema_view(
+        openapi.Info(**SCHEMA_INFO),
+        public=True,
+        permission_classes=[permissions.IsAuthenticated, ],
+        authentication_classes=[authentication.BasicAuthentication, ],
+    )
+
+
+def generate_schema() -> bytes:
+    """
+    Walks all API views and returns the OpenAPI document as JSON.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(openapi.Info(**SCHEMA_INFO)).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+@lru_cache
+def load_schema() -> tuple[bytes, str]:
+    """
+    Returns the schema document and its ETag. The prebuilt file is read once per process, the schema is generated
+    only if the file is missing.
+    """
+    try:
+        with open(settings.OPENAPI_SCHEMA_FILE, "rb") as schema_file:
+            content = schema_file.read()
+    except FileNotFoundError:
+        logger.warning("%s not found, generating OpenAPI schema at runtime.", settings.OPENAPI_SCHEMA_FILE)
+        content = generate_schema()
+    return content, quote_etag(hashlib.sha256(content).hexdigest())
+
+
+@login_required(login_url='/admin/login/')
+def schema_file_view(request: HttpRequest) -> HttpResponse:
+    content, etag = load_schema()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+@lru_cache
+def get_swagger_ui_view() -> Callable:
+    return get_schema_view().with_ui('swagger', cache_timeout=0)
+
+
+@login_required(login_url='/admin/login/')
+def swagger_ui_view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    return get_swagger_ui_view()(request, *args, **kwargs)
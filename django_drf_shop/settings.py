@@ -1,5 +1,9 @@
+import copy
 import environ
 import os
+import tempfile
+
+from django_drf_shop.db import database_config
 
 env = environ.Env()
 
@@ -59,16 +63,16 @@ TEMPLATES = [
 WSGI_APPLICATION = 'django_drf_shop.wsgi.application'
 
 DATABASES = {
-    "default": {
-        "ENGINE": os.environ.get("SQL_ENGINE", "django.db.backends.sqlite3"),
-        "NAME": os.environ.get("POSTGRES_DATABASE"),
-        "USER": os.environ.get("POSTGRES_USER", "user"),
-        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "password"),
-        "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
-        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
-    }
+    "default": database_config(env),
 }
 
+# Optional sharding of orders: ORDER_SHARD_DATABASES="shard_1=orders_1,shard_2=orders_2" adds databases (names on the
+# default server) holding only order tables, ORDER_SHARDS="2=shard_1,5=shard_2" maps region ids to them.
+for alias, name in env.dict("ORDER_SHARD_DATABASES", default={}).items():
+    DATABASES[alias] = {**copy.deepcopy(DATABASES["default"]), "NAME": name}
+ORDER_SHARDS = {int(region_id): alias for region_id, alias in env.dict("ORDER_SHARDS", default={}).items()}
+DATABASE_ROUTERS = ["orders.routers.OrderShardRouter"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -99,9 +103,96 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    # Shared by worker processes of one host, used by checkout throttles.
+    'throttle': env.cache(
+        'THROTTLE_CACHE_URL', default='filecache://' + os.path.join(tempfile.gettempdir(), 'drf_shop_throttle')
+    ),
+    # Items of open carts with CART_STORE = "cache", one entry per user with a cart. The cache is the only copy of
+    # items not flushed yet, so it must not evict entries (e.g. Redis with maxmemory-policy noeviction). The default
+    # file based cache does not cull entries.
+    'carts': env.cache('CART_CACHE_URL') if 'CART_CACHE_URL' in env else {
+        'BACKEND': 'utils.cache.PersistentFileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'drf_shop_carts'),
+    },
+}
+
+# Seconds cached catalog responses and region availability are kept, catalog changes invalidate them earlier.
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=60)
+
+# Limits apply to calendar days ("day") or to a window ending now ("rolling") counted in buckets of given length.
+LIMIT_WINDOW = env('LIMIT_WINDOW', default='day')
+LIMIT_WINDOW_SECONDS = env.int('LIMIT_WINDOW_SECONDS', default=24 * 60 * 60)
+LIMIT_BUCKET_SECONDS = env.int('LIMIT_BUCKET_SECONDS', default=5 * 60)
+
+# Workers prepare limits of the next day this many seconds before midnight (see orders.rollover).
+LIMIT_ROLLOVER_TIMER = env.bool('LIMIT_ROLLOVER_TIMER', default=True)
+LIMIT_ROLLOVER_LEAD_SECONDS = env.int('LIMIT_ROLLOVER_LEAD_SECONDS', default=30)
+
+# Number of products on the top sellers board of a region and day, seconds the board responses are cached.
+TOP_SELLERS_SIZE = env.int('TOP_SELLERS_SIZE', default=10)
+TOP_SELLERS_CACHE_TIMEOUT = env.int('TOP_SELLERS_CACHE_TIMEOUT', default=30)
+
+# Orders older than this many days are moved to the archive tables by archive_orders (see orders.archive).
+ORDER_ARCHIVE_AFTER_DAYS = env.int('ORDER_ARCHIVE_AFTER_DAYS', default=365)
+
+# Prebuilt with `python manage.py build_openapi_schema`, generated at runtime if the file is missing.
+OPENAPI_SCHEMA_FILE = env('OPENAPI_SCHEMA_FILE', default=os.path.join(BASE_DIR, 'openapi.json'))
+OPENAPI_SCHEMA_MAX_AGE = env.int('OPENAPI_SCHEMA_MAX_AGE', default=24 * 60 * 60)
+
+SWAGGER_SETTINGS = {
+    'SPEC_URL': 'openapi-schema',
+}
+
+# Days after the last change before carts are removed by purge_carts, keyed by CartStatuses name. None (the value
+# "never" in the environment) keeps carts.
+CART_RETENTION_DAYS = {
+    status_name: None if days.lower() == "never" else int(days)
+    for status_name, days in [
+        ("OPEN", env("CART_RETENTION_OPEN_DAYS", default="30")),
+        ("CLOSED", env("CART_RETENTION_CLOSED_DAYS", default="7")),
+    ]
+}
+
+# Items of open carts are written on every change ("database") or kept in the cache and written at checkout and by
+# flush_carts ("cache"), see carts.stores. Cache entries expire after CART_STORE_TIMEOUT seconds without a change
+# (never when open carts are kept).
+CART_STORE = env("CART_STORE", default="database")
+CART_STORE_CACHE = "carts"
+CART_STORE_TIMEOUT = env.int(
+    "CART_STORE_TIMEOUT",
+    default=None if CART_RETENTION_DAYS["OPEN"] is None else CART_RETENTION_DAYS["OPEN"] * 24 * 60 * 60
+)
+
+# Admission control of checkout per worker process (see utils.admission): at most CHECKOUT_MAX_IN_FLIGHT checkouts run
+# at once, others wait up to CHECKOUT_QUEUE_SECONDS. Checkouts are rejected while the average wait for limit locks is
+# above CHECKOUT_MAX_LOCK_WAIT seconds, it halves every CHECKOUT_LOCK_WAIT_HALF_LIFE seconds without checkouts.
+CHECKOUT_ADMISSION = env.bool("CHECKOUT_ADMISSION", default=True)
+CHECKOUT_MAX_IN_FLIGHT = env.int("CHECKOUT_MAX_IN_FLIGHT", default=4)
+CHECKOUT_QUEUE_SECONDS = env.float("CHECKOUT_QUEUE_SECONDS", default=1.0)
+CHECKOUT_MAX_LOCK_WAIT = env.float("CHECKOUT_MAX_LOCK_WAIT", default=2.0)
+CHECKOUT_LOCK_WAIT_HALF_LIFE = env.float("CHECKOUT_LOCK_WAIT_HALF_LIFE", default=5.0)
+
+# Maximum number of ids of one batch retrieve request of carts or orders.
+BATCH_RETRIEVE_MAX_IDS = env.int("BATCH_RETRIEVE_MAX_IDS", default=50)
+
+# Sink of dispatch_order_events: file:///path/events.ndjson appends NDJSON lines, http(s)://host/path posts batches.
+ORDER_EVENT_SINK = env("ORDER_EVENT_SINK", default=f"file://{os.path.join(BASE_DIR, 'order_events.ndjson')}")
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-    ]
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'checkout_user': env('THROTTLE_CHECKOUT_USER', default='30/min'),
+        'checkout_region': env('THROTTLE_CHECKOUT_REGION', default='600/min'),
+        'checkout_global': env('THROTTLE_CHECKOUT_GLOBAL', default='3000/min'),
+    },
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.FastJSONRenderer' if env.bool('FAST_JSON_RENDERER', default=False)
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
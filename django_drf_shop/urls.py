@@ -1,26 +1,11 @@
 from django.contrib import admin
-from django.contrib.auth.decorators import login_required
 from django.urls import path, include
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions, authentication
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Shop API",
-        default_version='v1',
-        description="API documentation",
-    ),
-    public=True,
-    permission_classes=[permissions.IsAuthenticated,],
-    authentication_classes=[authentication.BasicAuthentication,],
-)
+from django_drf_shop.schema import schema_file_view, swagger_ui_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('swagger/', login_required(
-        schema_view.with_ui('swagger', cache_timeout=0),
-        login_url='/admin/login/'), name='schema-swagger-ui'
-         ),
+    path('swagger/', swagger_ui_view, name='schema-swagger-ui'),
+    path('openapi.json', schema_file_view, name='openapi-schema'),
     path('', include('shop.urls')),
 ]
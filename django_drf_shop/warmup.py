@@ -0,0 +1,35 @@
+"""
+Warm-up steps of the production server (see gunicorn.conf.py). Application code and static data are loaded in the
+master process before forking, so workers share them copy-on-write. Per-process state is prepared in each worker
+before it accepts traffic.
+"""
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+
+from django_drf_shop.schema import load_schema
+from orders.rollover import start_rollover_timer
+from shop.catalog import region_availability
+
+
+def warm_up_master() -> None:
+    """
+    Loads URLconf (and with it all views and serializers) and the OpenAPI schema. Database connections opened in the
+    master are closed, they must not be shared with forked workers.
+    """
+    get_resolver().url_patterns
+    load_schema()
+    connections.close_all()
+
+
+def warm_up_worker() -> None:
+    """
+    Opens the worker's database connection and computes region availability of the catalog, so the first catalog
+    request of a worker does not pay for it when the cache is local to the process. Starts the timer preparing
+    limits of the next day before midnight.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+    region_availability()
+    if settings.LIMIT_ROLLOVER_TIMER:
+        start_rollover_timer()
@@ -1,9 +1,24 @@
 #!/bin/bash
 set -e
 
+if [ "$1" = "serve" ]; then
+  python manage.py migrate --noinput
+  for shard in ${ORDER_SHARD_DATABASES//,/ }; do
+    python manage.py migrate --noinput --database "${shard%%=*}"
+  done
+fi
+
 if [ ! -f /data_loaded ]; then
-  python manage.py loaddata fixtures.json
+  if [ -n "$SEED_ORDERS" ]; then
+    python manage.py seed_shop --orders "$SEED_ORDERS" --users "${SEED_USERS:-1000}" --days "${SEED_DAYS:-30}"
+  else
+    python manage.py loaddata fixtures.json
+  fi
   touch /data_loaded
 fi
 
+if [ "$1" = "serve" ]; then
+  exec gunicorn -c gunicorn.conf.py
+fi
+
 exec "$@"
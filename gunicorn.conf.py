@@ -0,0 +1,37 @@
+"""
+Production server configuration: `gunicorn -c gunicorn.conf.py` (`/entrypoint.sh serve` in Docker image).
+"""
+import multiprocessing
+import os
+
+wsgi_app = os.environ.get("GUNICORN_APP", "django_drf_shop.wsgi:application")
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Application is imported once in the master process, workers share its memory copy-on-write.
+preload_app = True
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+# Workers are recycled after a number of requests (with jitter so they do not restart at once) to bound memory growth.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server) -> None:
+    from django_drf_shop.warmup import warm_up_master
+
+    warm_up_master()
+
+
+def post_worker_init(worker) -> None:
+    from django_drf_shop.warmup import warm_up_worker
+
+    warm_up_worker()
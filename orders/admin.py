@@ -1,21 +1,119 @@
 from django import forms
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import QuerySet
+from django.http import HttpRequest
 
-from orders.models import Order, OrderItem
+from orders.models import ArchiveRun, Order, OrderItem
+from orders.sharding import order_alias, order_aliases
+from utils.pagination import EstimatedCountPaginator
 
 
 # Register your models here.
 class OrderItemFormSet(forms.BaseInlineFormSet):
-    pass
+    """
+    Items are read from the database of their order. Products cannot be joined in a shard, they are prefetched from
+    the default database instead.
+    """
+
+    def __init__(self, *args, instance: Order | None = None, queryset: QuerySet | None = None, **kwargs) -> None:
+        alias = instance._state.db if instance is not None else None
+        if queryset is not None and alias not in (None, DEFAULT_DB_ALIAS):
+            queryset = queryset.using(alias).select_related(None).prefetch_related("item")
+        super().__init__(*args, instance=instance, queryset=queryset, **kwargs)
 
 
 class OrderItemInline(admin.TabularInline):
+    """
+    Items are read only, limit usage counters count them (see OrderAdmin).
+    """
     model = OrderItem
     formset = OrderItemFormSet
+    raw_id_fields = ["item"]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        return super().get_queryset(request).select_related("item")
+
+    def has_add_permission(self, request: HttpRequest, obj: Order | None = None) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: Order | None = None) -> bool:
+        return False
+
+    def has_delete_permission(self, request: HttpRequest, obj: Order | None = None) -> bool:
+        return False
+
+
+class ShardListFilter(admin.SimpleListFilter):
+    """
+    Lists orders of one order database, the default database when no shard is selected. Users and regions of orders
+    stored in a shard are prefetched from the default database.
+    """
+    title = "database"
+    parameter_name = "shard"
+
+    def lookups(self, request: HttpRequest, model_admin: admin.ModelAdmin) -> list[tuple[str, str]]:
+        return [(alias, alias) for alias in order_aliases()]
+
+    def has_output(self) -> bool:
+        return len(self.lookup_choices) > 1
+
+    def queryset(self, request: HttpRequest, queryset: QuerySet) -> QuerySet:
+        if self.value() not in order_aliases() or self.value() == DEFAULT_DB_ALIAS:
+            return queryset
+        return queryset.using(self.value()).prefetch_related("user", "region")
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    readonly_fields = ["created_at"]
+    """
+    Orders are counted in limit usage counters by checkout and released by cancel and delete of the API, so the admin
+    cannot add or delete orders or change their status and items.
+    """
+    readonly_fields = ["status", "created_at"]
     list_display = ["user", "region", "status", "created_at"]
+    list_select_related = ["user", "region"]
+    list_filter = [ShardListFilter, "status", "region", "created_at"]
+    raw_id_fields = ["user", "region"]
     inlines = [OrderItemInline, ]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_list_select_related(self, request: HttpRequest) -> list[str] | tuple:
+        # Related objects cannot be joined in a shard, see ShardListFilter.
+        if request.GET.get(ShardListFilter.parameter_name, DEFAULT_DB_ALIAS) != DEFAULT_DB_ALIAS:
+            return ()
+        return super().get_list_select_related(request)
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_delete_permission(self, request: HttpRequest, obj: Order | None = None) -> bool:
+        return False
+
+    def get_object(self, request: HttpRequest, object_id: str, from_field: str | None = None) -> Order | None:
+        """
+        Orders are looked up in the database recorded by their locator.
+        """
+        if from_field is not None:
+            return super().get_object(request, object_id, from_field)
+        try:
+            return self.get_queryset(request).using(order_alias(object_id)).get(pk=object_id)
+        except (Order.DoesNotExist, ValidationError, ValueError):
+            return None
+
+
+@admin.register(ArchiveRun)
+class ArchiveRunAdmin(admin.ModelAdmin):
+    """
+    Progress of archive_orders runs, written by the command only.
+    """
+    list_display = ["shard", "cutoff", "orders", "items", "last_order_id", "started_at", "finished_at"]
+    list_filter = ["shard"]
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: ArchiveRun | None = None) -> bool:
+        return False
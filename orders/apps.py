@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self) -> None:
+        from django.contrib.auth.models import User
+        from django.db.models.signals import post_delete
+
+        from orders.models import ArchivedOrder, Order
+        from orders.sharding import delete_from_shards, delete_order_locator
+        from shop.models import Product, Region
+
+        for model in (User, Region, Product):
+            post_delete.connect(delete_from_shards, sender=model, dispatch_uid=f"shard_delete_{model.__name__}")
+        for model in (Order, ArchivedOrder):
+            post_delete.connect(delete_order_locator, sender=model, dispatch_uid=f"locator_delete_{model.__name__}")
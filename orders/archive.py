@@ -0,0 +1,126 @@
+"""
+Archival of old orders. Checkout and limits read only orders of today and users mostly read recent ones, so orders
+created more than ORDER_ARCHIVE_AFTER_DAYS days ago are moved from the hot tables (Order, OrderItem) to the archive
+tables (ArchivedOrder, ArchivedOrderItem) of the same database by `archive_orders`. Each chunk is copied and deleted
+in one transaction, so an order is always in exactly one of them. Readers of the order history (OrderViewSet, exports,
+rollups) read both.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Model
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, ArchivedOrderItem, ArchiveRun, Order, OrderItem
+
+ORDER_MODELS = (Order, ArchivedOrder)
+
+
+def order_item_model(order_model: type[Model]) -> type[Model]:
+    """
+    Model of items of an order model (OrderItem of Order, ArchivedOrderItem of ArchivedOrder).
+    """
+    return order_model._meta.get_field("order_items").related_model
+
+
+def archive_cutoff(days: int | None = None) -> datetime.date:
+    """
+    Orders created before the returned day are archived, ORDER_ARCHIVE_AFTER_DAYS days ago by default.
+    """
+    days = settings.ORDER_ARCHIVE_AFTER_DAYS if days is None else days
+    return datetime.date.today() - datetime.timedelta(days=days)
+
+
+def archive_chunk(alias: str, cutoff: datetime.date, after_id: int, chunk_size: int) -> tuple[int, int, int | None]:
+    """
+    Moves up to chunk_size orders of the database created before cutoff with ids greater than after_id, together with
+    their items. Orders are locked, so they are not cancelled or deleted while they are copied.
+    Returns numbers of moved orders and items and the last moved id.
+    """
+    with transaction.atomic(using=alias):
+        orders = list(
+            Order.objects.using(alias).select_for_update().filter(
+                created_at__lt=cutoff, id__gt=after_id
+            ).order_by("id")[:chunk_size]
+        )
+        if not orders:
+            return 0, 0, None
+        order_ids = [order.id for order in orders]
+        items = OrderItem.objects.using(alias).filter(order_id__in=order_ids).values_list("id", "order_id", "item_id")
+        ArchivedOrder.objects.using(alias).bulk_create([
+            ArchivedOrder(
+                id=order.id,
+                user_id=order.user_id,
+                region_id=order.region_id,
+                status=order.status,
+                created_at=order.created_at,
+                updated_at=order.updated_at,
+                ordered_at=order.ordered_at,
+            ) for order in orders
+        ])
+        archived_items = ArchivedOrderItem.objects.using(alias).bulk_create([
+            ArchivedOrderItem(id=item_id, order_id=order_id, item_id=product_id)
+            for item_id, order_id, product_id in items
+        ])
+        delete_moved(alias, order_ids)
+    return len(orders), len(archived_items), order_ids[-1]
+
+
+def delete_moved(alias: str, order_ids: list[int]) -> None:
+    """
+    Deletes moved orders and their items with one DELETE statement each. The SQL is executed directly because
+    `QuerySet.delete` sends post_delete of every order, which removes its locator, archived orders keep their locators.
+    """
+    connection = connections[alias]
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    with connection.cursor() as cursor:
+        for model, field_name in ((OrderItem, "order"), (Order, "id")):
+            table = connection.ops.quote_name(model._meta.db_table)
+            column = connection.ops.quote_name(model._meta.get_field(field_name).column)
+            cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", order_ids)
+
+
+def open_run(alias: str, cutoff: datetime.date) -> ArchiveRun:
+    """
+    Returns the unfinished run of the database or starts a new one. An unfinished run of another cutoff continues
+    with the new cutoff from the first order, orders it already moved are not in the hot tables anymore.
+    """
+    run, created = ArchiveRun.objects.get_or_create(shard=alias, finished_at=None, defaults={"cutoff": cutoff})
+    if not created and run.cutoff != cutoff:
+        run.cutoff = cutoff
+        run.last_order_id = 0
+        run.save(update_fields=["cutoff", "last_order_id", "updated_at"])
+    return run
+
+
+def archive_orders(
+        alias: str,
+        cutoff: datetime.date,
+        chunk_size: int = 1000,
+        max_chunks: int | None = None,
+        sleep: float = 0.0,
+) -> ArchiveRun:
+    """
+    Moves orders of the database created before cutoff to the archive in chunks, sleeping `sleep` seconds between
+    them. Progress is saved after each chunk, the run is finished when no orders are left. With max_chunks the run
+    may stop earlier and is resumed by the next call.
+    """
+    run = open_run(alias, cutoff)
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        orders, items, last_order_id = archive_chunk(alias, run.cutoff, run.last_order_id, chunk_size)
+        if not orders:
+            run.finished_at = timezone.now()
+            run.save(update_fields=["finished_at", "updated_at"])
+            break
+        # The chunk is already committed, progress only lets the next run skip it.
+        run.last_order_id = last_order_id
+        run.orders += orders
+        run.items += items
+        run.save(update_fields=["last_order_id", "orders", "items", "updated_at"])
+        chunks += 1
+        if sleep:
+            time.sleep(sleep)
+    return run
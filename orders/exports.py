@@ -0,0 +1,84 @@
+import csv
+import json
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from orders.archive import order_item_model
+from orders.sharding import product_names
+from utils.iterators import batched
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_HEADER = ["order_id", "created_at", "region", "status", "product", "product_name"]
+
+
+class Echo:
+    """
+    File-like object returning written value, allows csv.writer to produce lines for a streaming response.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_order_chunks(
+        querysets: Iterable[QuerySet], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[tuple[list, dict]]:
+    """
+    Iterates orders of the querysets (hot or archived orders of one database each) with a server-side cursor and
+    yields chunks of order rows together with their items. Items of the whole chunk are fetched in one query, product
+    names in another.
+    """
+    for queryset in querysets:
+        rows = queryset.order_by("id").values_list("id", "created_at", "region_id", "status").iterator(
+            chunk_size=chunk_size
+        )
+        for chunk in batched(rows, chunk_size):
+            items = defaultdict(list)
+            order_items = list(order_item_model(queryset.model).objects.using(queryset.db).filter(
+                order_id__in=[row[0] for row in chunk]
+            ).order_by("id").values_list("order_id", "item_id"))
+            names = product_names(product_id for _, product_id in order_items)
+            for order_id, product_id in order_items:
+                items[order_id].append((product_id, names[product_id]))
+            yield chunk, items
+
+
+def ndjson_export(querysets: Iterable[QuerySet]) -> Iterator[str]:
+    """
+    Yields one JSON document per order, each chunk of orders is sent as a single piece of the response.
+    """
+    for chunk, items in iter_order_chunks(querysets):
+        yield "".join(
+            json.dumps({
+                "id": order_id,
+                "created_at": created_at,
+                "region": region_id,
+                "status": status,
+                "items": [{"product": product_id, "name": name} for product_id, name in items[order_id]],
+            }, cls=DjangoJSONEncoder) + "\n"
+            for order_id, created_at, region_id, status in chunk
+        )
+
+
+def csv_export(querysets: Iterable[QuerySet]) -> Iterator[str]:
+    """
+    Yields CSV lines, one line per order item.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for chunk, items in iter_order_chunks(querysets):
+        yield "".join(
+            writer.writerow([order_id, created_at.isoformat(), region_id, status, product_id, name])
+            for order_id, created_at, region_id, status in chunk
+            for product_id, name in items[order_id]
+        )
+
+
+EXPORTS = {
+    "ndjson": (ndjson_export, "application/x-ndjson"),
+    "csv": (csv_export, "text/csv"),
+}
@@ -0,0 +1,54 @@
+"""
+Top sellers leaderboard: the TOP_SELLERS_SIZE most ordered products per region and day, kept in TopSeller rows.
+The board is updated from the daily sales rollup after an order is committed, only the board and the products of the
+order are compared, so the update does not depend on the number of products sold that day. Concurrent updates of the
+same region may leave the board briefly incomplete until the next order of the missing product,
+`rebuild_top_sellers` (orders.rollup) recomputes it exactly.
+"""
+import datetime
+import heapq
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+from orders.models import DailySales, TopSeller
+
+
+def top_products(rows: Iterable[tuple[int, int]], size: int) -> list[tuple[int, int]]:
+    """
+    Returns the best (product id, items) pairs, more items first, ties broken by product id.
+    """
+    return heapq.nsmallest(
+        size, ((product_id, items) for product_id, items in rows if items > 0), key=lambda row: (-row[1], row[0])
+    )
+
+
+def update_top_sellers(day: datetime.date, region_id: int, product_ids: Iterable[int], sign: int = 1) -> None:
+    """
+    Updates the board of the region and day after sales of the products changed in the rollup. When products of the
+    board lost items (cancellation), their successors may be any products of the day, so the board is refilled with
+    the best rows of the rollup of the region and day, read in index order.
+    """
+    size = settings.TOP_SELLERS_SIZE
+    product_ids = set(product_ids)
+    board = set(TopSeller.objects.filter(date=day, region_id=region_id).values_list("product_id", flat=True))
+    sales = DailySales.objects.filter(date=day, region_id=region_id)
+    if sign < 0 and board & product_ids:
+        rows = sales.order_by("-items", "product_id").values_list("product_id", "items")[:size]
+    else:
+        rows = sales.filter(product_id__in=board | product_ids).values_list("product_id", "items")
+    replace_board(day, region_id, top_products(rows, size))
+
+
+def replace_board(day: datetime.date, region_id: int, top: list[tuple[int, int]]) -> None:
+    with transaction.atomic():
+        TopSeller.objects.filter(date=day, region_id=region_id).exclude(
+            product_id__in=[product_id for product_id, _ in top]
+        ).delete()
+        TopSeller.objects.bulk_create(
+            [TopSeller(date=day, region_id=region_id, product_id=product, items=items) for product, items in top],
+            update_conflicts=True,
+            unique_fields=["date", "region", "product"],
+            update_fields=["items"],
+        )
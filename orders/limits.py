@@ -0,0 +1,235 @@
+import datetime
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, QuerySet, Sum, Value, When
+from django.utils import timezone
+
+from orders.models import LimitBucket, LimitUsage, Order, OrderEvent, OrderItem
+from orders.rollup import change_sales
+from orders.sharding import order_aliases
+from shop.models import ProductLimit
+from utils.constants import OrderEventTypes, OrderStatuses
+
+
+def lock_usage(day: datetime.date, scopes: list[str]) -> dict[str, int]:
+    """
+    Locks usage rows of the scopes for the rest of the transaction and returns their current values. Missing rows are
+    created first. Rows are locked in scope order, the global row first, so concurrent checkouts do not deadlock.
+    """
+    LimitUsage.objects.bulk_create([LimitUsage(day=day, scope=scope) for scope in scopes], ignore_conflicts=True)
+    return dict(
+        LimitUsage.objects.select_for_update().filter(day=day, scope__in=scopes).order_by("scope").values_list(
+            "scope", "items"
+        )
+    )
+
+
+def change_usage(day: datetime.date, scope_items: dict[str, int]) -> None:
+    """
+    Atomically adds (or subtracts negative) numbers of items to usage rows of the scopes with a single UPDATE.
+    """
+    add_items(LimitUsage.objects.filter(day=day), scope_items)
+
+
+def add_items(queryset: QuerySet, scope_items: dict[str, int]) -> None:
+    if not scope_items:
+        return
+    queryset.filter(scope__in=scope_items).update(items=F("items") + Case(
+        *[When(scope=scope, then=Value(items)) for scope, items in scope_items.items()], default=Value(0)
+    ))
+
+
+def rolling_window() -> bool:
+    return settings.LIMIT_WINDOW == "rolling"
+
+
+def bucket_start(moment: datetime.datetime) -> datetime.datetime:
+    """
+    Returns start of the usage bucket containing the moment. Buckets are aligned to the Unix epoch.
+    """
+    timestamp = moment.timestamp()
+    return datetime.datetime.fromtimestamp(
+        timestamp - timestamp % settings.LIMIT_BUCKET_SECONDS, tz=datetime.timezone.utc
+    )
+
+
+def window_usage(moment: datetime.datetime, scopes: list[str]) -> dict[str, int]:
+    """
+    Returns numbers of items of the scopes ordered within the window ending at the moment. At most
+    LIMIT_WINDOW_SECONDS / LIMIT_BUCKET_SECONDS buckets per scope are summed, whatever the number of orders.
+    """
+    first_bucket = bucket_start(moment) - datetime.timedelta(
+        seconds=settings.LIMIT_WINDOW_SECONDS - settings.LIMIT_BUCKET_SECONDS
+    )
+    usage = dict(
+        LimitBucket.objects.filter(scope__in=scopes, start__gte=first_bucket).values("scope").annotate(
+            total=Sum("items")
+        ).order_by().values_list("scope", "total")
+    )
+    return {scope: usage.get(scope, 0) for scope in scopes}
+
+
+def lock_window_usage(moment: datetime.datetime, scopes: list[str]) -> dict[str, int]:
+    """
+    Locks the current and the previous bucket rows of the scopes and returns usage of the window. Checkouts less than
+    a bucket apart always share a locked row, so they are serialized also across a bucket boundary.
+    """
+    current = bucket_start(moment)
+    starts = [current - datetime.timedelta(seconds=settings.LIMIT_BUCKET_SECONDS), current]
+    LimitBucket.objects.bulk_create(
+        [LimitBucket(start=start, scope=scope) for scope in scopes for start in starts], ignore_conflicts=True
+    )
+    list(LimitBucket.objects.select_for_update().filter(scope__in=scopes, start__in=starts).order_by(
+        "scope", "start"
+    ).values_list("id", flat=True))
+    schedule_prune(current)
+    return window_usage(moment, scopes)
+
+
+def change_window_usage(moment: datetime.datetime, scope_items: dict[str, int]) -> None:
+    add_items(LimitBucket.objects.filter(start=bucket_start(moment)), scope_items)
+
+
+_pruned_bucket = None
+
+
+def schedule_prune(current: datetime.datetime) -> None:
+    """
+    Deletes buckets which left the window after the transaction is committed, once per bucket in each process. The
+    bucket is marked as pruned only after the delete, rolled back transactions do not skip it.
+    """
+    if _pruned_bucket == current:
+        return
+
+    def prune() -> None:
+        global _pruned_bucket
+        prune_buckets(current)
+        _pruned_bucket = current
+
+    transaction.on_commit(prune)
+
+
+def prune_buckets(current: datetime.datetime) -> int:
+    cutoff = current - datetime.timedelta(seconds=settings.LIMIT_WINDOW_SECONDS)
+    deleted, _ = LimitBucket.objects.filter(start__lt=cutoff).delete()
+    return deleted
+
+
+def lock_order_usage(order: Order, scopes: list[str]) -> dict[str, int]:
+    """
+    Locks usage counters of the scopes in the configured window mode and returns their values for the order.
+    """
+    if rolling_window():
+        return lock_window_usage(order.ordered_at, scopes)
+    return lock_usage(order.created_at, scopes)
+
+
+def change_order_usage(order: Order, scope_items: dict[str, int], window: str | None = None) -> None:
+    """
+    Adds items to usage counters the order is counted in: its day, or its bucket in the rolling window mode. The mode
+    the order was counted in is passed on release, the configured one by default. Orders without checkout time and
+    released after their bucket was pruned do not change anything.
+    """
+    if (window or settings.LIMIT_WINDOW) == "rolling":
+        if order.ordered_at is not None:
+            change_window_usage(order.ordered_at, scope_items)
+    else:
+        change_usage(order.created_at, scope_items)
+
+
+def current_usage(scopes: list[str], day: datetime.date | None = None) -> dict[str, int]:
+    """
+    Returns current values of usage counters of the scopes (of the day, today by default) without locking them.
+    The day is ignored in the rolling window mode.
+    """
+    if rolling_window():
+        return window_usage(timezone.now(), scopes)
+    usage = dict(LimitUsage.objects.filter(
+        day=day or datetime.date.today(), scope__in=scopes
+    ).values_list("scope", "items"))
+    return {scope: usage.get(scope, 0) for scope in scopes}
+
+
+def order_scopes(region_id: int) -> list[str]:
+    return [LimitUsage.GLOBAL_SCOPE, LimitUsage.region_scope(region_id)]
+
+
+def product_rules(product_ids: Iterable[int], region_id: int) -> list[ProductLimit]:
+    """
+    Returns limits of the products which apply in the region, with their products loaded.
+    """
+    return list(ProductLimit.objects.filter(
+        Q(region__isnull=True) | Q(region_id=region_id), product_id__in=list(product_ids)
+    ).select_related("product"))
+
+
+def rule_scope(rule: ProductLimit) -> str:
+    return LimitUsage.product_scope(rule.product_id, rule.region_id)
+
+
+def order_usage(region_id: int, product_items: Counter, rules: list[ProductLimit]) -> dict[str, int]:
+    """
+    Returns numbers of items an order with given products adds to each usage scope: all items to the global and region
+    scopes, items of a limited product to the scope of each of its rules.
+    """
+    items_count = sum(product_items.values())
+    usage = {scope: items_count for scope in order_scopes(region_id)}
+    for rule in rules:
+        usage[rule_scope(rule)] = product_items[rule.product_id]
+    return usage
+
+
+def checkout_payload(order: Order) -> dict:
+    """
+    Payload of the created event of the order, with numbers of items added to each usage scope at checkout ("usage")
+    and the window mode they were counted in ("window"). Empty for orders without it (created outside checkout).
+    """
+    return OrderEvent.objects.filter(
+        order_id=order.id, event_type=OrderEventTypes.CREATED
+    ).values_list("payload", flat=True).first() or {}
+
+
+def release_order(order: Order) -> None:
+    """
+    Gives items of the order back to the capacity it was counted in and removes them from the daily sales
+    rollup. Has to be called in a transaction which takes the order out of the counted statuses. Exactly the scopes
+    counted at checkout are released in the window mode of the checkout, so changes of rules or of LIMIT_WINDOW since
+    then do not change other counters. Orders without recorded usage are released by the current rules and mode.
+    """
+    product_items = Counter(order.order_items.values_list("item_id", flat=True))
+    payload = checkout_payload(order)
+    usage = payload.get("usage")
+    if usage is None:
+        usage = order_usage(order.region_id, product_items, product_rules(product_items, order.region_id))
+    change_order_usage(order, {scope: -items for scope, items in usage.items()}, window=payload.get("window"))
+    change_sales(order.created_at, order.region_id, product_items, sign=-1)
+
+
+def rebuild_usage(day: datetime.date) -> None:
+    """
+    Recomputes usage rows of the day from its orders in all order databases, cancelled orders are not counted.
+    Product scopes are counted for the current product limits. Buckets of the rolling window mode are not rebuilt.
+    """
+    rules = defaultdict(list)
+    for rule in ProductLimit.objects.all():
+        rules[rule.product_id].append(rule)
+    usage = Counter()
+    for alias in order_aliases():
+        rows = OrderItem.objects.using(alias).filter(order__created_at=day).exclude(
+            order__status=OrderStatuses.CANCELED
+        ).values("order__region_id", "item_id").annotate(items=Count("id")).order_by()
+        for row in rows:
+            region_id = row["order__region_id"]
+            for scope in order_scopes(region_id):
+                usage[scope] += row["items"]
+            for rule in rules[row["item_id"]]:
+                if rule.region_id in (None, region_id):
+                    usage[rule_scope(rule)] += row["items"]
+    with transaction.atomic():
+        LimitUsage.objects.filter(day=day).delete()
+        LimitUsage.objects.bulk_create(
+            [LimitUsage(day=day, scope=scope, items=items) for scope, items in usage.items()]
+        )
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from orders.archive import archive_cutoff, archive_orders
+from orders.sharding import order_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves orders created more than ORDER_ARCHIVE_AFTER_DAYS days ago (or --days) to the archive tables of their "
+        "database. Orders are moved in chunks, each in its own transaction, and progress is saved after each chunk, "
+        "so an interrupted or limited (--max-chunks) run is resumed by the next one."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--days", type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS, help="Age of orders.")
+        parser.add_argument("--database", choices=order_aliases(), help="Archive only one order database.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Orders moved in one transaction.")
+        parser.add_argument("--max-chunks", type=int, help="Stop after this many chunks per database.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks.")
+
+    def handle(self, *args, **options) -> None:
+        if options["days"] < 1:
+            raise CommandError("Orders of today are needed by limits, --days has to be at least 1.")
+        cutoff = archive_cutoff(options["days"])
+        for alias in [options["database"]] if options["database"] else order_aliases():
+            run = archive_orders(
+                alias,
+                cutoff,
+                chunk_size=options["chunk_size"],
+                max_chunks=options["max_chunks"],
+                sleep=options["sleep"],
+            )
+            state = "finished" if run.finished_at else f"stopped after order {run.last_order_id}, run again to resume"
+            self.stdout.write(f"{alias}: {run.orders} orders, {run.items} items before {run.cutoff}, {state}")
+        self.stdout.write(self.style.SUCCESS(f"Orders created before {cutoff} archived."))
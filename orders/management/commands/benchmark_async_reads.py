@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from orders.management.commands.benchmark_order_serializers import Command as SerializersBenchmark
+from orders.models import Order, OrderItem
+from shop.models import Product, Region
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares throughput of the sync and async order list endpoints served by the ASGI handler with many "
+        "concurrent connections. Generated data is committed (async views read it from other threads), the user, "
+        "regions and products are deleted at the end together with the orders."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--items", type=int, default=200, help="Number of order items of the benchmark user.")
+        parser.add_argument("--items-per-order", type=int, default=5)
+        parser.add_argument("--connections", type=int, default=100, help="Number of concurrent clients.")
+        parser.add_argument("--requests", type=int, default=1000, help="Number of requests per endpoint.")
+
+    def handle(self, *args, **options) -> None:
+        if options["connections"] < 1 or options["requests"] < 1:
+            raise CommandError("--connections and --requests must be positive.")
+        queryset = SerializersBenchmark.create_orders(options["items"], options["items_per_order"])
+        user = User.objects.get(pk=queryset.values_list("user_id", flat=True)[:1])
+        client = AsyncClient()
+        client.force_login(user)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                results = async_to_sync(self.run)(client, options["connections"], options["requests"])
+        finally:
+            region_ids = list(Order.objects.filter(user=user).values_list("region_id", flat=True).distinct())
+            # Every generated product is ordered by the benchmark user.
+            product_ids = list(OrderItem.objects.filter(order__user=user).values_list("item_id", flat=True).distinct())
+            user.delete()
+            Region.objects.filter(id__in=region_ids).delete()
+            Product.objects.filter(id__in=product_ids).delete()
+
+        for name, seconds in results:
+            self.stdout.write(f"{name:<8} {options['requests'] / seconds:10.1f} req/s")
+        self.stdout.write(self.style.SUCCESS(f"Async speedup: {results[0][1] / results[1][1]:.1f}x"))
+
+    async def run(self, client: AsyncClient, connections: int, requests: int) -> list[tuple[str, float]]:
+        sync_response = await client.get(reverse("api:order-list"))
+        async_response = await client.get(reverse("async:order-list"))
+        if sync_response.json() != async_response.json():
+            raise CommandError("Async endpoint output differs from sync endpoint.")
+        return [
+            ("sync", await self.measure(client, reverse("api:order-list"), connections, requests)),
+            ("async", await self.measure(client, reverse("async:order-list"), connections, requests)),
+        ]
+
+    @staticmethod
+    async def measure(client: AsyncClient, url: str, connections: int, requests: int) -> float:
+        semaphore = asyncio.Semaphore(connections)
+
+        async def request() -> None:
+            async with semaphore:
+                response = await client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f"{url} returned {response.status_code}.")
+
+        start = time.perf_counter()
+        await asyncio.gather(*[request() for _ in range(requests)])
+        return time.perf_counter() - start
@@ -0,0 +1,80 @@
+import time
+from typing import Callable
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from orders.models import Order, OrderItem
+from orders.serializers import FastOrderSerializer, OrderSerializer
+from shop.models import Product, Region
+from utils.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares OrderSerializer with FastOrderSerializer (and JSON renderers) on generated orders. "
+        "Data is created in a transaction which is rolled back at the end."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--items", type=int, default=10000, help="Total number of order items.")
+        parser.add_argument("--items-per-order", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs is reported.")
+
+    def handle(self, *args, **options) -> None:
+        with transaction.atomic():
+            queryset = self.create_orders(options["items"], options["items_per_order"])
+
+            reference = OrderSerializer(queryset, many=True).data
+            fast = FastOrderSerializer(queryset, many=True).data
+            if JSONRenderer().render(reference) != JSONRenderer().render(fast):
+                raise CommandError("FastOrderSerializer output differs from OrderSerializer.")
+
+            results = [
+                ("OrderSerializer", self.measure(
+                    lambda: OrderSerializer(queryset, many=True).data, options["repeat"]
+                )),
+                ("FastOrderSerializer", self.measure(
+                    lambda: FastOrderSerializer(queryset, many=True).data, options["repeat"]
+                )),
+                ("JSONRenderer", self.measure(lambda: JSONRenderer().render(fast), options["repeat"])),
+                ("FastJSONRenderer", self.measure(lambda: FastJSONRenderer().render(fast), options["repeat"])),
+            ]
+            transaction.set_rollback(True)
+
+        for name, seconds in results:
+            self.stdout.write(f"{name:<20} {seconds * 1000:10.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"Serializer speedup: {results[0][1] / results[1][1]:.1f}x, "
+            f"renderer speedup: {results[2][1] / results[3][1]:.1f}x"
+        ))
+
+    @staticmethod
+    def create_orders(items: int, items_per_order: int):
+        user = User.objects.create(username=f"benchmark_{time.time_ns()}")
+        region = Region.objects.create(name="BENCHMARK", limit_size=items)
+        products = Product.objects.bulk_create(
+            [Product(name=f"Benchmark product {number}") for number in range(min(items, 100))]
+        )
+        orders = Order.objects.bulk_create(
+            [Order(user=user, region=region) for _ in range(max(items // items_per_order, 1))]
+        )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(order=orders[number % len(orders)], item=products[number % len(products)])
+                for number in range(items)
+            ],
+            batch_size=5000
+        )
+        return Order.objects.filter(user=user)
+
+    @staticmethod
+    def measure(function: Callable, repeat: int) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,47 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from orders.outbox import dispatch_events, get_sink
+
+
+class Command(BaseCommand):
+    help = (
+        "Delivers order events from the outbox to a sink (ORDER_EVENT_SINK by default). Due events are claimed in "
+        "batches skipping rows locked by other dispatchers, so several dispatchers may run at once. Failed batches "
+        "are retried with exponential backoff, delivery is at-least-once."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--sink", default=settings.ORDER_EVENT_SINK, help="file:// or http(s):// URL of the sink.")
+        parser.add_argument("--batch-size", type=int, default=100, help="Maximum number of events per delivery.")
+        parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for the HTTP sink.")
+        parser.add_argument("--lease", type=float, default=300.0, help="Seconds before claimed events are resent.")
+        parser.add_argument("--backoff-base", type=float, default=1.0, help="Seconds to wait after the first failure.")
+        parser.add_argument("--backoff-max", type=float, default=600.0, help="Maximum seconds between retries.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new events.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when nothing is due.")
+
+    def handle(self, *args, **options) -> None:
+        sink = get_sink(options["sink"], options["timeout"])
+        delivered_total = failed_total = 0
+        while True:
+            delivered, failed = dispatch_events(
+                sink,
+                batch_size=options["batch_size"],
+                lease=datetime.timedelta(seconds=options["lease"]),
+                backoff_base=options["backoff_base"],
+                backoff_max=options["backoff_max"],
+            )
+            delivered_total += delivered
+            failed_total += failed
+            if failed:
+                self.stderr.write(f"{failed} events failed, rescheduled with backoff")
+            if delivered or failed:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["poll_interval"])
+        self.stdout.write(self.style.SUCCESS(f"Delivered {delivered_total} events, {failed_total} failed attempts"))
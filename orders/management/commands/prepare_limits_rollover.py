@@ -0,0 +1,21 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from orders.rollover import rollover
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates limit usage rows of the next day (or --day) and warms the catalog caches, so the first checkouts "
+        "after midnight do not race to create them. Schedule it a few minutes before midnight; running it again "
+        "is harmless."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--day", type=datetime.date.fromisoformat, help="Defaults to tomorrow.")
+
+    def handle(self, *args, **options) -> None:
+        day = options["day"] or datetime.date.today() + datetime.timedelta(days=1)
+        scopes = rollover(day)
+        self.stdout.write(self.style.SUCCESS(f"Prepared {scopes} usage counters of {day}."))
@@ -0,0 +1,13 @@
+
+from orders.management.commands.rebuild_daily_sales import Command as RebuildCommand
+from orders.rollup import rebuild_top_sellers
+
+
+class Command(RebuildCommand):
+    help = (
+        "Recomputes top sellers boards from order history. Aggregated order items are streamed in batches and only "
+        "the best products of each region and day are kept in memory. Days are processed in chunks, each chunk is "
+        "replaced in its own transaction."
+    )
+    rebuild = staticmethod(rebuild_top_sellers)
+    rebuilt = "Top sellers"
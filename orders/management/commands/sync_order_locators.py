@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from orders.sharding import sync_order_locators
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates order locators of orders stored in the default database without one. Orders get no locators while "
+        "ORDER_SHARDS is empty, run this before enabling sharding (with checkout stopped, or once more after the "
+        "switch to cover orders created meanwhile)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=5000, help="Orders read at once.")
+
+    def handle(self, *args, **options) -> None:
+        created = sync_order_locators(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} order locators."))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0001_initial'),
+        ('orders', '0003_order_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('items', models.PositiveIntegerField(default=0, verbose_name='sold items')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='orders')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shop.product', verbose_name='product')),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shop.region', verbose_name='region')),
+            ],
+            options={
+                'verbose_name': 'Daily sales',
+                'verbose_name_plural': 'Daily sales',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysales',
+            constraint=models.UniqueConstraint(fields=('date', 'region', 'product'), name='daily_sales_date_region_product'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LimitUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('scope', models.CharField(max_length=64, verbose_name='scope')),
+                ('items', models.IntegerField(default=0, verbose_name='ordered items')),
+            ],
+            options={
+                'verbose_name': 'Limit usage',
+                'verbose_name_plural': 'Limit usages',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='limitusage',
+            constraint=models.UniqueConstraint(fields=('day', 'scope'), name='limit_usage_day_scope'),
+        ),
+    ]
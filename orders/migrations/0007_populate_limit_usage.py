@@ -0,0 +1,38 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:08
+
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import Count
+
+CANCELED = 30
+
+
+def populate_limit_usage(apps, schema_editor):
+    """
+    Creates limit usage counters from existing orders, cancelled orders are not counted.
+    """
+    OrderItem = apps.get_model("orders", "OrderItem")
+    LimitUsage = apps.get_model("orders", "LimitUsage")
+
+    usage = Counter()
+    rows = OrderItem.objects.exclude(order__status=CANCELED).values(
+        "order__created_at", "order__region_id"
+    ).annotate(items=Count("id")).order_by()
+    for row in rows.iterator():
+        usage[(row["order__created_at"], "global")] += row["items"]
+        usage[(row["order__created_at"], f"region:{row['order__region_id']}")] += row["items"]
+    LimitUsage.objects.bulk_create(
+        [LimitUsage(day=day, scope=scope, items=items) for (day, scope), items in usage.items()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_limit_usage'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_limit_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('shop', '0001_initial'),
+        ('orders', '0007_populate_limit_usage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='region',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='shop.region', verbose_name='region'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='owner'),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='item',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='shop.product', verbose_name='product'),
+        ),
+        migrations.CreateModel(
+            name='OrderLocator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(max_length=64, verbose_name='database')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='owner')),
+            ],
+            options={
+                'verbose_name': 'Order locator',
+                'verbose_name_plural': 'Order locators',
+                'indexes': [models.Index(fields=['user', 'shard'], name='order_locator_user_shard_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:27
+
+from django.db import migrations
+from django.core.management.color import no_style
+
+
+def populate_order_locator(apps, schema_editor):
+    """
+    Creates locators of existing orders with the same ids, then moves the id sequence past them.
+    """
+    Order = apps.get_model("orders", "Order")
+    OrderLocator = apps.get_model("orders", "OrderLocator")
+
+    batch = []
+    for order_id, user_id in Order.objects.order_by("id").values_list("id", "user_id").iterator(chunk_size=5000):
+        batch.append(OrderLocator(id=order_id, user_id=user_id, shard="default"))
+        if len(batch) == 5000:
+            OrderLocator.objects.bulk_create(batch)
+            batch = []
+    OrderLocator.objects.bulk_create(batch)
+
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [OrderLocator]):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_locator'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_order_locator, migrations.RunPython.noop),
+    ]
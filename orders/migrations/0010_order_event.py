@@ -0,0 +1,33 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:31
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_populate_order_locator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField(verbose_name='order id')),
+                ('event_type', models.CharField(choices=[('order.created', 'Created'), ('order.canceled', 'Canceled'), ('order.deleted', 'Deleted')], max_length=32, verbose_name='type')),
+                ('payload', models.JSONField(default=dict, verbose_name='payload')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='available at')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='delivery attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True, verbose_name='dispatched at')),
+            ],
+            options={
+                'verbose_name': 'Order event',
+                'verbose_name_plural': 'Order events',
+                'indexes': [models.Index(condition=models.Q(('dispatched_at__isnull', True)), fields=['available_at'], name='order_event_pending_idx')],
+            },
+        ),
+    ]
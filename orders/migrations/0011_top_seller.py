@@ -0,0 +1,33 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_catalog_name_indexes'),
+        ('orders', '0010_order_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopSeller',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('items', models.PositiveIntegerField(verbose_name='sold items')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shop.product', verbose_name='product')),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shop.region', verbose_name='region')),
+            ],
+            options={
+                'verbose_name': 'Top seller',
+                'verbose_name_plural': 'Top sellers',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='topseller',
+            constraint=models.UniqueConstraint(fields=('date', 'region', 'product'), name='top_seller_date_region_product'),
+        ),
+    ]
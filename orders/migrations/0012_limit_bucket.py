@@ -0,0 +1,36 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_top_seller'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='ordered_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='ordered at'),
+        ),
+        migrations.CreateModel(
+            name='LimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField(verbose_name='start')),
+                ('scope', models.CharField(max_length=64, verbose_name='scope')),
+                ('items', models.IntegerField(default=0, verbose_name='ordered items')),
+            ],
+            options={
+                'verbose_name': 'Limit bucket',
+                'verbose_name_plural': 'Limit buckets',
+                'indexes': [models.Index(fields=['start'], name='limit_bucket_start_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='limitbucket',
+            constraint=models.UniqueConstraint(fields=('scope', 'start'), name='limit_bucket_scope_start'),
+        ),
+    ]
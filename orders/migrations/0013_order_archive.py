@@ -0,0 +1,92 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('shop', '0003_product_limit'),
+        ('orders', '0012_limit_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.IntegerField(choices=[(10, 'Pending'), (20, 'Completed'), (30, 'Canceled')], verbose_name='status')),
+                ('created_at', models.DateField(verbose_name='created at')),
+                ('updated_at', models.DateTimeField(verbose_name='updated at')),
+                ('ordered_at', models.DateTimeField(blank=True, null=True, verbose_name='ordered at')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='archived at')),
+            ],
+            options={
+                'verbose_name': 'Archived order',
+                'verbose_name_plural': 'Archived orders',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'Archived order item',
+                'verbose_name_plural': 'Archived order items',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchiveRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(max_length=64, verbose_name='database')),
+                ('cutoff', models.DateField(verbose_name='archived before')),
+                ('last_order_id', models.BigIntegerField(default=0, verbose_name='last archived order id')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='archived orders')),
+                ('items', models.PositiveIntegerField(default=0, verbose_name='archived order items')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='started at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+            ],
+            options={
+                'verbose_name': 'Archive run',
+                'verbose_name_plural': 'Archive runs',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='archiverun',
+            constraint=models.UniqueConstraint(condition=models.Q(('finished_at__isnull', True)), fields=('shard',), name='archive_run_open_shard'),
+        ),
+        migrations.AddField(
+            model_name='archivedorderitem',
+            name='item',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='shop.product', verbose_name='product'),
+        ),
+        migrations.AddField(
+            model_name='archivedorderitem',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_items', to='orders.archivedorder', verbose_name='order'),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='region',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='shop.region', verbose_name='region'),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='owner'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['user', 'updated_at'], name='arch_order_user_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['created_at'], name='arch_order_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.3 on 2026-10-19 17:15
+
+import copy
+
+from django.apps.registry import Apps
+from django.db import migrations
+
+# Relations of order tables to users, regions and products. The fields have db_constraint=False, because shards do
+# not contain the referenced tables, the default database gets the constraints here. SQLite drops them when a later
+# migration remakes one of these tables, such a migration has to add them again.
+CONSTRAINED_FIELDS = {
+    "order": ["user", "region"],
+    "orderitem": ["item"],
+    "archivedorder": ["user", "region"],
+    "archivedorderitem": ["item"],
+}
+
+
+def constrained_model(model, field_names):
+    """
+    Copy of the historical model with constraints of the fields, in its own registry. SQLite remakes the whole table
+    from the model passed to the schema editor, so all constraints of the table are added with the first field.
+    """
+    body = {}
+    for field in model._meta.local_fields:
+        name, path, args, kwargs = field.deconstruct()
+        if name in field_names:
+            body[name] = field.__class__(*args, **{**kwargs, "to": field.related_model, "db_constraint": True})
+        else:
+            body[name] = copy.deepcopy(field)
+    body["Meta"] = type("Meta", (), {
+        "app_label": model._meta.app_label,
+        "db_table": model._meta.db_table,
+        "indexes": copy.deepcopy(model._meta.indexes),
+        "constraints": copy.deepcopy(model._meta.constraints),
+        "apps": Apps(),
+    })
+    body["__module__"] = model.__module__
+    return type(model._meta.object_name, model.__bases__, body)
+
+
+def add_constraints(apps, schema_editor):
+    """
+    Runs only on the default database, the router does not run data operations on shards.
+    """
+    for model_name, field_names in CONSTRAINED_FIELDS.items():
+        model = apps.get_model("orders", model_name)
+        constrained = constrained_model(model, field_names)
+        for name in field_names:
+            schema_editor.alter_field(constrained, model._meta.get_field(name), constrained._meta.get_field(name))
+
+
+def remove_constraints(apps, schema_editor):
+    for model_name, field_names in CONSTRAINED_FIELDS.items():
+        model = apps.get_model("orders", model_name)
+        constrained = constrained_model(model, field_names)
+        for name in field_names:
+            schema_editor.alter_field(model, constrained._meta.get_field(name), model._meta.get_field(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0013_order_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraints, remove_constraints),
+    ]
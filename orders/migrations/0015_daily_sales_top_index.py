@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-19 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0014_order_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailysales',
+            index=models.Index(fields=['date', 'region', '-items', 'product'], name='daily_sales_region_top_idx'),
+        ),
+    ]
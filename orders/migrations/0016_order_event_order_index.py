@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-19 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0015_daily_sales_top_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderevent',
+            index=models.Index(fields=['order_id', 'event_type'], name='order_event_order_idx'),
+        ),
+    ]
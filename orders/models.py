@@ -1,35 +1,82 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, router
+from django.utils import timezone
 
-from utils.constants import OrderStatuses
+from orders.sharding import allocate_order_ids, group_by_shard
+from utils.constants import OrderEventTypes, OrderStatuses
 from shop.models import Region, Product
 
 
+class OrderQuerySet(models.QuerySet):
+    """
+    New orders get global ids from OrderLocator when orders are sharded and (unless a database is chosen with
+    `using()`) are stored in the database of their region.
+    """
+
+    def create(self, **kwargs) -> "Order":
+        order = self.model(**kwargs)
+        self._for_write = True
+        order.save(force_insert=True, using=self._db)
+        return order
+
+    def bulk_create(self, objs, *args, **kwargs) -> list["Order"]:
+        objs = list(objs)
+        if self._db is not None:
+            allocate_order_ids([order for order in objs if order.pk is None], self._db)
+            return super().bulk_create(objs, *args, **kwargs)
+        for alias, orders in group_by_shard(objs).items():
+            allocate_order_ids([order for order in orders if order.pk is None], alias)
+            super(OrderQuerySet, self.using(alias)).bulk_create(orders, *args, **kwargs)
+        return objs
+
+
 class Order(models.Model):
+    # Users and regions may be stored in a different database than the order, so Django does not create constraints.
+    # The default database has them (migration 0014), deletes reach shards by orders.sharding.delete_from_shards.
     user = models.ForeignKey(
         User,
         verbose_name="owner",
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_constraint=False
     )
     region = models.ForeignKey(
         Region,
         verbose_name="region",
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_constraint=False
     )
     status = models.IntegerField(
         verbose_name="status",
         choices=OrderStatuses.choices,
         default=OrderStatuses.PENDING
     )
-    created_at = models.DateField(verbose_name="created at", auto_now_add=True)
+    created_at = models.DateField(verbose_name="created at", auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(verbose_name="updated at", auto_now=True)
+    # Time of checkout, selects the usage bucket of rolling limit windows. Empty for orders created before.
+    ordered_at = models.DateTimeField(verbose_name="ordered at", null=True, blank=True)
 
     class Meta:
         verbose_name = "Order"
         verbose_name_plural = "Orders"
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="order_user_created_at_idx"),
+            models.Index(fields=["user", "updated_at"], name="order_user_updated_at_idx"),
+            models.Index(fields=["region", "created_at"], name="order_region_created_at_idx"),
+            models.Index(fields=["status", "created_at"], name="order_status_created_at_idx"),
+        ]
+
+    objects = OrderQuerySet.as_manager()
 
     def __str__(self) -> str:
         return f"Order {self.id}, user {self.user}, region {self.region}"
 
+    def save(self, *args, using: str | None = None, **kwargs) -> None:
+        if self.pk is None:
+            using = using or router.db_for_write(Order, instance=self)
+            allocate_order_ids([self], using)
+            kwargs.setdefault("force_insert", True)
+        super().save(*args, using=using, **kwargs)
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(
@@ -41,7 +88,8 @@ class OrderItem(models.Model):
     item = models.ForeignKey(
         Product,
         verbose_name="product",
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_constraint=False
     )
 
     class Meta:
@@ -49,4 +97,250 @@ class OrderItem(models.Model):
         verbose_name_plural = "Order items"
 
     def __str__(self) -> str:
-        return f"Order {self.order.id} product {self.item.name}"
+        return f"Order {self.order_id} product {self.item.name}"
+
+
+class ArchivedOrder(models.Model):
+    """
+    Order moved out of the hot tables by `archive_orders` (see orders.archive). It keeps the id of the order and is
+    stored in the same database, so the order locator still points to it. Archived orders are read only.
+    """
+    id = models.BigIntegerField(verbose_name="ID", primary_key=True)
+    user = models.ForeignKey(
+        User,
+        verbose_name="owner",
+        on_delete=models.CASCADE,
+        db_constraint=False
+    )
+    region = models.ForeignKey(
+        Region,
+        verbose_name="region",
+        on_delete=models.CASCADE,
+        db_constraint=False
+    )
+    status = models.IntegerField(verbose_name="status", choices=OrderStatuses.choices)
+    created_at = models.DateField(verbose_name="created at")
+    updated_at = models.DateTimeField(verbose_name="updated at")
+    ordered_at = models.DateTimeField(verbose_name="ordered at", null=True, blank=True)
+    archived_at = models.DateTimeField(verbose_name="archived at", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Archived order"
+        verbose_name_plural = "Archived orders"
+        indexes = [
+            models.Index(fields=["user", "updated_at"], name="arch_order_user_updated_at_idx"),
+            models.Index(fields=["created_at"], name="arch_order_created_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Archived order {self.id}, user {self.user_id}, region {self.region_id}"
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(verbose_name="ID", primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        verbose_name="order",
+        related_name="order_items",
+        on_delete=models.CASCADE
+    )
+    item = models.ForeignKey(
+        Product,
+        verbose_name="product",
+        on_delete=models.CASCADE,
+        db_constraint=False
+    )
+
+    class Meta:
+        verbose_name = "Archived order item"
+        verbose_name_plural = "Archived order items"
+
+    def __str__(self) -> str:
+        return f"Archived order {self.order_id} product {self.item_id}"
+
+
+class ArchiveRun(models.Model):
+    """
+    Progress of moving orders created before `cutoff` from one order database to its archive tables. Orders are moved
+    in chunks by ascending id and `last_order_id` is the last moved one, so an interrupted run resumes after it.
+    A database has at most one unfinished run.
+    """
+    shard = models.CharField(verbose_name="database", max_length=64)
+    cutoff = models.DateField(verbose_name="archived before")
+    last_order_id = models.BigIntegerField(verbose_name="last archived order id", default=0)
+    orders = models.PositiveIntegerField(verbose_name="archived orders", default=0)
+    items = models.PositiveIntegerField(verbose_name="archived order items", default=0)
+    started_at = models.DateTimeField(verbose_name="started at", auto_now_add=True)
+    updated_at = models.DateTimeField(verbose_name="updated at", auto_now=True)
+    finished_at = models.DateTimeField(verbose_name="finished at", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Archive run"
+        verbose_name_plural = "Archive runs"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shard"], name="archive_run_open_shard", condition=models.Q(finished_at__isnull=True)
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Archive run {self.shard} before {self.cutoff}: {self.orders} orders"
+
+
+class DailySales(models.Model):
+    date = models.DateField(verbose_name="date")
+    region = models.ForeignKey(
+        Region,
+        verbose_name="region",
+        on_delete=models.CASCADE
+    )
+    product = models.ForeignKey(
+        Product,
+        verbose_name="product",
+        on_delete=models.CASCADE
+    )
+    items = models.PositiveIntegerField(verbose_name="sold items", default=0)
+    orders = models.PositiveIntegerField(verbose_name="orders", default=0)
+
+    class Meta:
+        verbose_name = "Daily sales"
+        verbose_name_plural = "Daily sales"
+        constraints = [
+            models.UniqueConstraint(fields=["date", "region", "product"], name="daily_sales_date_region_product"),
+        ]
+        indexes = [
+            # Best sellers of a region and day, read in order when a cancellation refills the board.
+            models.Index(fields=["date", "region", "-items", "product"], name="daily_sales_region_top_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Sales {self.date}, region {self.region_id}, product {self.product_id}: {self.items}"
+
+
+class TopSeller(models.Model):
+    """
+    Leaderboard of the most ordered products of a region and day, at most TOP_SELLERS_SIZE rows per region and day.
+    Maintained from the daily sales rollup (see orders.leaderboard).
+    """
+    date = models.DateField(verbose_name="date")
+    region = models.ForeignKey(Region, verbose_name="region", on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, verbose_name="product", on_delete=models.CASCADE)
+    items = models.PositiveIntegerField(verbose_name="sold items")
+
+    class Meta:
+        verbose_name = "Top seller"
+        verbose_name_plural = "Top sellers"
+        constraints = [
+            models.UniqueConstraint(fields=["date", "region", "product"], name="top_seller_date_region_product"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Top seller {self.date}, region {self.region_id}, product {self.product_id}: {self.items}"
+
+
+class LimitUsage(models.Model):
+    """
+    Number of items ordered on a day within a limit scope (whole shop, a region or a product with a limit). Rows are
+    incremented by checkout and decremented by cancellation, so limits are checked without counting orders.
+    """
+    GLOBAL_SCOPE = "global"
+
+    day = models.DateField(verbose_name="day")
+    scope = models.CharField(verbose_name="scope", max_length=64)
+    items = models.IntegerField(verbose_name="ordered items", default=0)
+
+    class Meta:
+        verbose_name = "Limit usage"
+        verbose_name_plural = "Limit usages"
+        constraints = [
+            models.UniqueConstraint(fields=["day", "scope"], name="limit_usage_day_scope"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.scope}: {self.items}"
+
+    @staticmethod
+    def region_scope(region_id: int) -> str:
+        return f"region:{region_id}"
+
+    @staticmethod
+    def product_scope(product_id: int, region_id: int | None = None) -> str:
+        if region_id is None:
+            return f"product:{product_id}"
+        return f"product:{product_id}:region:{region_id}"
+
+
+class LimitBucket(models.Model):
+    """
+    Number of items ordered within a limit scope in a fixed time bucket (LIMIT_BUCKET_SECONDS long, starting at
+    `start`). Used instead of LimitUsage in the rolling window mode (LIMIT_WINDOW = "rolling"), usage of a window is
+    the sum of its buckets. Buckets older than the window are pruned.
+    """
+    start = models.DateTimeField(verbose_name="start")
+    scope = models.CharField(verbose_name="scope", max_length=64)
+    items = models.IntegerField(verbose_name="ordered items", default=0)
+
+    class Meta:
+        verbose_name = "Limit bucket"
+        verbose_name_plural = "Limit buckets"
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "start"], name="limit_bucket_scope_start"),
+        ]
+        indexes = [
+            models.Index(fields=["start"], name="limit_bucket_start_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.start} {self.scope}: {self.items}"
+
+
+class OrderLocator(models.Model):
+    """
+    Directory of orders kept in the default database. Its ids are global order ids and `shard` is the database alias
+    where the order is stored.
+    """
+    user = models.ForeignKey(
+        User,
+        verbose_name="owner",
+        related_name="+",
+        on_delete=models.CASCADE
+    )
+    shard = models.CharField(verbose_name="database", max_length=64)
+
+    class Meta:
+        verbose_name = "Order locator"
+        verbose_name_plural = "Order locators"
+        indexes = [
+            models.Index(fields=["user", "shard"], name="order_locator_user_shard_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Order {self.id} in {self.shard}"
+
+
+class OrderEvent(models.Model):
+    """
+    Outbox of order events. Rows are written in the transaction which changes the order and delivered later by
+    `dispatch_order_events`, at least once. Undelivered events are retried from `available_at`.
+    """
+    order_id = models.BigIntegerField(verbose_name="order id")
+    event_type = models.CharField(verbose_name="type", max_length=32, choices=OrderEventTypes.choices)
+    payload = models.JSONField(verbose_name="payload", default=dict)
+    created_at = models.DateTimeField(verbose_name="created at", auto_now_add=True)
+    available_at = models.DateTimeField(verbose_name="available at", default=timezone.now)
+    attempts = models.PositiveIntegerField(verbose_name="delivery attempts", default=0)
+    last_error = models.TextField(verbose_name="last error", blank=True)
+    dispatched_at = models.DateTimeField(verbose_name="dispatched at", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Order event"
+        verbose_name_plural = "Order events"
+        indexes = [
+            models.Index(
+                fields=["available_at"], name="order_event_pending_idx", condition=models.Q(dispatched_at__isnull=True)
+            ),
+            models.Index(fields=["order_id", "event_type"], name="order_event_order_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_type} {self.order_id}"
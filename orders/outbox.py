@@ -0,0 +1,142 @@
+"""
+Transactional outbox of order events. Events are inserted by `record_event` in the same transaction (of the default
+database) as the limit usage change, so an event exists exactly when the order change is committed. They are
+delivered later to a sink by `dispatch_order_events`, which claims batches of due events, so the checkout never waits
+for downstream consumers. Delivery is at-least-once, consumers should deduplicate by event id.
+"""
+import datetime
+import json
+import urllib.request
+from typing import Callable
+from urllib.parse import urlsplit
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderEvent
+
+
+def record_event(order: Order, event_type: str, **payload) -> OrderEvent:
+    """
+    Adds an event of the order to the outbox. Has to be called in the transaction which changes the order.
+    """
+    return OrderEvent.objects.create(
+        order_id=order.id,
+        event_type=event_type,
+        payload={"region": order.region_id, "user": order.user_id, "status": order.status, **payload},
+    )
+
+
+def claim_events(batch_size: int, lease: datetime.timedelta) -> list[OrderEvent]:
+    """
+    Claims up to batch_size due events. Rows locked by another dispatcher are skipped and claimed rows are leased:
+    their `available_at` is moved forward, so if the dispatcher dies before marking them, they are delivered again
+    after the lease expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            OrderEvent.objects.select_for_update(skip_locked=True).filter(
+                dispatched_at__isnull=True, available_at__lte=now
+            ).order_by("available_at", "id")[:batch_size]
+        )
+        OrderEvent.objects.filter(id__in=[event.id for event in events]).update(available_at=now + lease)
+    return events
+
+
+def event_data(event: OrderEvent) -> dict:
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "order_id": event.order_id,
+        "created_at": event.created_at,
+        "payload": event.payload,
+    }
+
+
+def encode_events(events: list[OrderEvent]) -> list[str]:
+    return [json.dumps(event_data(event), cls=DjangoJSONEncoder) for event in events]
+
+
+class FileSink:
+    """
+    Appends events as NDJSON lines to a local file: `file:///var/log/shop/order_events.ndjson`.
+    """
+
+    def __init__(self, url: str, timeout: float) -> None:
+        self.path = urlsplit(url).path
+
+    def send(self, events: list[OrderEvent]) -> None:
+        with open(self.path, "a", encoding="utf-8") as sink_file:
+            sink_file.writelines(f"{line}\n" for line in encode_events(events))
+
+
+class HttpSink:
+    """
+    Posts a batch of events as a JSON list to the URL. Any response other than 2xx fails the whole batch.
+    """
+
+    def __init__(self, url: str, timeout: float) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events: list[OrderEvent]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=f"[{','.join(encode_events(events))}]".encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+SINKS: dict[str, Callable] = {
+    "file": FileSink,
+    "http": HttpSink,
+    "https": HttpSink,
+}
+
+
+def get_sink(url: str, timeout: float = 10.0) -> FileSink | HttpSink:
+    scheme = urlsplit(url).scheme
+    if scheme not in SINKS:
+        raise ValueError(f"Unsupported order event sink: {url}")
+    return SINKS[scheme](url, timeout)
+
+
+def retry_delay(attempts: int, base: float, maximum: float) -> datetime.timedelta:
+    """
+    Exponential backoff after given number of failed attempts.
+    """
+    return datetime.timedelta(seconds=min(base * 2 ** (attempts - 1), maximum))
+
+
+def dispatch_events(
+        sink: FileSink | HttpSink,
+        batch_size: int = 100,
+        lease: datetime.timedelta = datetime.timedelta(minutes=5),
+        backoff_base: float = 1.0,
+        backoff_max: float = 600.0,
+) -> tuple[int, int]:
+    """
+    Claims one batch of events and sends it to the sink. Delivered events are marked as dispatched, after a failure
+    the batch is rescheduled with exponential backoff. Returns numbers of delivered and failed events.
+    """
+    events = claim_events(batch_size, lease)
+    if not events:
+        return 0, 0
+    ids = [event.id for event in events]
+    try:
+        sink.send(events)
+    except Exception as exc:
+        now = timezone.now()
+        for event in events:
+            event.attempts += 1
+            event.available_at = now + retry_delay(event.attempts, backoff_base, backoff_max)
+            event.last_error = f"{type(exc).__name__}: {exc}"
+        OrderEvent.objects.bulk_update(events, ["attempts", "available_at", "last_error"])
+        return 0, len(ids)
+    OrderEvent.objects.filter(id__in=ids).update(dispatched_at=timezone.now(), last_error="")
+    return len(ids), 0
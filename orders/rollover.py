@@ -0,0 +1,88 @@
+"""
+Day rollover of limits. Usage counters of a day are created by the first checkout of the day and the catalog
+availability of a day is computed by its first request, so at midnight all workers would race to create the same rows
+and compute the same availability. `rollover` prepares the next day ahead of time: it is run by
+`prepare_limits_rollover` (e.g. from cron a few minutes before midnight) and, with LIMIT_ROLLOVER_TIMER enabled, by a
+timer in every worker process, which warms caches local to the process. LIMIT_ROLLOVER_LEAD_SECONDS should be shorter
+than CATALOG_CACHE_TIMEOUT, so warmed entries outlive midnight. Limits themselves are not cached, checkout reads them
+from the database.
+"""
+import datetime
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from orders.limits import order_scopes, rolling_window, rule_scope
+from orders.models import LimitUsage
+from shop.catalog import availability_key, region_availability
+from shop.models import ProductLimit, Region
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_usage(day: datetime.date) -> int:
+    """
+    Creates usage rows of the day for the global scope, all regions and all product limits, existing rows are kept.
+    Returns number of scopes. Nothing is needed in the rolling window mode, which has no day boundary.
+    """
+    if rolling_window():
+        return 0
+    scopes = {LimitUsage.GLOBAL_SCOPE}
+    for region_id in Region.objects.values_list("id", flat=True):
+        scopes.update(order_scopes(region_id))
+    scopes.update(rule_scope(rule) for rule in ProductLimit.objects.only("product_id", "region_id"))
+    LimitUsage.objects.bulk_create([LimitUsage(day=day, scope=scope) for scope in scopes], ignore_conflicts=True)
+    return len(scopes)
+
+
+def warm_up_caches(day: datetime.date) -> None:
+    """
+    Refills the catalog availability of the day, so the entry is fresh for CATALOG_CACHE_TIMEOUT seconds from now.
+    """
+    cache.delete(availability_key(day))
+    region_availability(day)
+
+
+def rollover(day: datetime.date) -> int:
+    scopes = prepare_usage(day)
+    warm_up_caches(day)
+    return scopes
+
+
+def seconds_until_rollover(now: datetime.datetime, lead: float) -> float:
+    """
+    Returns seconds from now until `lead` seconds before the next midnight.
+    """
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), tzinfo=now.tzinfo)
+    seconds = (midnight - now).total_seconds() - lead
+    if seconds < 0:
+        seconds += 24 * 60 * 60
+    return seconds
+
+
+def run_scheduled_rollover(lead: float) -> None:
+    close_old_connections()
+    try:
+        rollover(datetime.date.today() + datetime.timedelta(days=1))
+    except Exception:
+        logger.exception("Limits rollover failed.")
+    finally:
+        close_old_connections()
+        start_rollover_timer(lead, delay=lead + 1)
+
+
+def start_rollover_timer(lead: float | None = None, delay: float = 0) -> threading.Timer:
+    """
+    Schedules `rollover` of the next day `lead` seconds (LIMIT_ROLLOVER_LEAD_SECONDS) before midnight in this process.
+    The timer runs in a daemon thread and schedules itself again for the following day. `delay` skips the current
+    rollover time once it has run.
+    """
+    lead = settings.LIMIT_ROLLOVER_LEAD_SECONDS if lead is None else lead
+    now = datetime.datetime.now() + datetime.timedelta(seconds=delay)
+    timer = threading.Timer(seconds_until_rollover(now, lead) + delay, run_scheduled_rollover, args=[lead])
+    timer.daemon = True
+    timer.start()
+    return timer
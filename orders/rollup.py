@@ -0,0 +1,179 @@
+import datetime
+import heapq
+import logging
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Iterator
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Model
+
+from orders.leaderboard import update_top_sellers
+from orders.models import ArchivedOrder, ArchivedOrderItem, DailySales, Order, OrderItem, TopSeller
+from orders.sharding import order_aliases
+from utils.constants import OrderStatuses
+from utils.iterators import batched
+from utils.transactions import immediate_atomic, robust_on_commit
+
+logger = logging.getLogger(__name__)
+
+
+def record_sales(day: datetime.date, region_id: int, product_items: Counter, sign: int = 1) -> None:
+    """
+    Adds (or with sign -1 subtracts) one order with given products to the daily sales rollup. Missing rows are
+    created first and the rows are locked in product order (like in rebuild_sales), then counters are incremented
+    with one UPDATE per distinct number of items.
+    """
+    with transaction.atomic():
+        DailySales.objects.bulk_create(
+            [DailySales(date=day, region_id=region_id, product_id=product_id) for product_id in product_items],
+            ignore_conflicts=True
+        )
+        list(DailySales.objects.select_for_update().filter(
+            date=day, region_id=region_id, product_id__in=list(product_items)
+        ).order_by("product_id").values_list("id", flat=True))
+        products_by_count = defaultdict(list)
+        for product_id, count in product_items.items():
+            products_by_count[count].append(product_id)
+        for count, product_ids in products_by_count.items():
+            DailySales.objects.filter(date=day, region_id=region_id, product_id__in=product_ids).update(
+                items=F("items") + sign * count, orders=F("orders") + sign
+            )
+
+
+def change_sales(day: datetime.date, region_id: int, product_items: Counter, sign: int = 1) -> None:
+    """
+    Records sales of a changed order in the rollup in the transaction of the change (of the default database), so the
+    rollup commits together with limit usage and rebuild_sales never counts an order which is not yet in the rollup.
+    A failure rolls back only the rollup change and is logged, it does not fail the request (rebuild_daily_sales
+    corrects the rollup). The top sellers board is updated after the transaction commits.
+    """
+    try:
+        record_sales(day, region_id, product_items, sign=sign)
+    except Exception:
+        logger.exception("Daily sales of region %s on %s not changed.", region_id, day)
+    robust_on_commit(update_top_sellers, day, region_id, list(product_items), sign=sign)
+
+
+def rebuild_in_chunks(
+        rebuild: Callable[..., int], date_from: datetime.date, date_to: datetime.date, chunk_days: int, batch_size: int
+) -> Iterator[tuple[datetime.date, datetime.date, int]]:
+    """
+    Runs the rebuild function (rebuild_sales or rebuild_top_sellers) for chunks of chunk_days days of the date range,
+    each chunk in its own transaction. Yields the first and the last day of each chunk and number of created rows.
+    """
+    chunk = datetime.timedelta(days=chunk_days)
+    chunk_start = date_from
+    while chunk_start <= date_to:
+        chunk_end = min(chunk_start + chunk - datetime.timedelta(days=1), date_to)
+        yield chunk_start, chunk_end, rebuild(chunk_start, chunk_end, batch_size=batch_size)
+        chunk_start = chunk_end + datetime.timedelta(days=1)
+
+
+def rebuild_sales(date_from: datetime.date, date_to: datetime.date, batch_size: int = 5000) -> int:
+    """
+    Replaces rollup rows of the date range with aggregates computed from order items, in one transaction.
+    Orders of a region are stored in one database, so aggregates of each order database are written as they are.
+    Returns number of written rows.
+
+    Rows of the range are locked before orders are read and rewritten in place, so a cancellation or delete waiting
+    for them (record_sales locks them too) applies to the rebuilt rows and orders changed while the rebuild runs are
+    counted exactly once. Today is not rebuilt: checkout of an order stored in a shard commits the rollup before the
+    order (see orders.sharding), only cancellations and deletes change the rollup of past days.
+    """
+    date_to = min(date_to, datetime.date.today() - datetime.timedelta(days=1))
+    written = 0
+    with immediate_atomic():
+        rows = DailySales.objects.filter(date__range=(date_from, date_to))
+        list(rows.select_for_update().order_by("date", "region", "product").values_list("id", flat=True))
+        rows.update(items=0, orders=0)
+        for batch in batched(iter_sales_rows(date_from, date_to, batch_size), batch_size):
+            written += len(DailySales.objects.bulk_create([
+                DailySales(
+                    date=row["order__created_at"],
+                    region_id=row["order__region_id"],
+                    product_id=row["item_id"],
+                    items=row["items"],
+                    orders=row["orders"],
+                ) for row in batch
+            ], update_conflicts=True, unique_fields=["date", "region", "product"], update_fields=["items", "orders"]))
+        rows.filter(items=0, orders=0).delete()
+    return written
+
+
+def rebuild_top_sellers(date_from: datetime.date, date_to: datetime.date, batch_size: int = 5000) -> int:
+    """
+    Recomputes boards of the date range from order items. Aggregated rows are streamed in chunks and only a bounded
+    heap per region and day is kept in memory. Boards are replaced in one transaction, returns number of created rows.
+    """
+    size = settings.TOP_SELLERS_SIZE
+    heaps = defaultdict(list)
+    for row in iter_sales_rows(date_from, date_to, batch_size):
+        heap = heaps[row["order__created_at"], row["order__region_id"]]
+        entry = (row["items"], -row["item_id"])
+        if len(heap) < size:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    with transaction.atomic():
+        TopSeller.objects.filter(date__range=(date_from, date_to)).delete()
+        return len(TopSeller.objects.bulk_create([
+            TopSeller(date=day, region_id=region_id, product_id=-negative_product_id, items=items)
+            for (day, region_id), heap in heaps.items()
+            for items, negative_product_id in heap
+        ], batch_size=batch_size))
+
+
+SALES_KEY = ("order__created_at", "order__region_id", "item_id")
+
+
+def iter_sales_rows(date_from: datetime.date, date_to: datetime.date, batch_size: int) -> Iterator[dict]:
+    """
+    Yields items of hot and archived orders aggregated by day, region and product. Orders of a day may be partly
+    archived while archival runs, so sorted rows of both tables are merged and rows of the same key are added up (an
+    order is in one of them only).
+    """
+    key = itemgetter(*SALES_KEY)
+    for alias in order_aliases():
+        rows = heapq.merge(
+            sales_rows(OrderItem, alias, date_from, date_to, batch_size),
+            sales_rows(ArchivedOrderItem, alias, date_from, date_to, batch_size),
+            key=key,
+        )
+        for _, group in groupby(rows, key=key):
+            row, *others = group
+            for other in others:
+                row = {**row, "items": row["items"] + other["items"], "orders": row["orders"] + other["orders"]}
+            yield row
+
+
+def sales_rows(
+        item_model: type[Model], alias: str, date_from: datetime.date, date_to: datetime.date, batch_size: int
+) -> Iterator[dict]:
+    return item_model.objects.using(alias).filter(
+        order__created_at__range=(date_from, date_to)
+    ).exclude(
+        order__status=OrderStatuses.CANCELED
+    ).values(
+        *SALES_KEY
+    ).annotate(
+        items=Count("id"), orders=Count("order_id", distinct=True)
+    ).order_by(*SALES_KEY).iterator(chunk_size=batch_size)
+
+
+def order_date_bounds() -> tuple[datetime.date | None, datetime.date | None]:
+    """
+    Returns creation dates of the first and the last order in all order databases, archived orders included.
+    """
+    bounds = [
+        model.objects.using(alias).aggregate(first=Min("created_at"), last=Max("created_at"))
+        for alias in order_aliases()
+        for model in (Order, ArchivedOrder)
+    ]
+    return (
+        min((bound["first"] for bound in bounds if bound["first"]), default=None),
+        max((bound["last"] for bound in bounds if bound["last"]), default=None),
+    )
@@ -0,0 +1,43 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from orders.sharding import SHARDED_MODELS, is_sharded_model, shard_for_region
+
+
+class OrderShardRouter:
+    """
+    New orders are written to the database of their region, order items to the database of their order. Other
+    operations follow the database of the instance they start from (Django default), except relations from orders to
+    users, regions and products, which are always read from the default database.
+    Databases other than default contain only order tables.
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        instance = hints.get("instance")
+        if instance is not None and is_sharded_model(type(instance)) and not is_sharded_model(model):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints) -> str | None:
+        instance = hints.get("instance")
+        if instance is None:
+            return None
+        if not is_sharded_model(model):
+            return DEFAULT_DB_ALIAS if is_sharded_model(type(instance)) else None
+        if type(instance) is not model or not instance._state.adding:
+            return instance._state.db or None
+        # New instances: `_state.db` was already set by assigning related objects from the default database.
+        if model._meta.model_name == "order" and instance.region_id:
+            return shard_for_region(instance.region_id)
+        if model._meta.model_name == "orderitem" and model._meta.get_field("order").is_cached(instance):
+            return instance.order._state.db or shard_for_region(instance.order.region_id)
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        if is_sharded_model(type(obj1)) or is_sharded_model(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name: str | None = None, **hints) -> bool | None:
+        if db == DEFAULT_DB_ALIAS:
+            return None
+        return app_label == "orders" and model_name in SHARDED_MODELS
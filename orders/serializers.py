@@ -1,18 +1,34 @@
 import datetime
-
-from django.db import transaction
-from django.db.models import QuerySet, Count, Sum, Q
+import time
+from collections import Counter, defaultdict
+from functools import partial
+from typing import Iterable
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from carts.models import Cart
-from orders.models import OrderItem, Order
-from shop.models import GlobalProductLimit
+from carts.stores import get_cart_store
+from orders.archive import order_item_model
+from orders.exports import EXPORTS
+from orders.limits import change_order_usage, lock_order_usage, order_usage, product_rules, rule_scope
+from orders.models import DailySales, LimitUsage, OrderItem, Order, TopSeller
+from orders.outbox import record_event
+from orders.rollup import change_sales
+from orders.sharding import item_names, shard_atomic, shard_for_region
+from shop.models import GlobalProductLimit, Region
 from shop.serializers import ProductSerializer
-from utils.constants import CartStatuses, ErrorMessages
+from utils.admission import checkout_admission
+from utils.constants import CartStatuses, ErrorMessages, OrderEventTypes
 from utils.exceptions import (
-    GlobalProductLimitObjectDoesNotExist, GlobalLimitExceedException, RegionLimitExceedException
+    GlobalProductLimitObjectDoesNotExist, GlobalLimitExceedException, ProductLimitExceedException,
+    RegionLimitExceedException
 )
+from utils.transactions import immediate_atomic
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -32,64 +48,140 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['status']
 
 
+def build_orders_data(order_rows: Iterable[tuple], item_rows: Iterable[tuple]) -> list[dict]:
+    """
+    Assembles OrderSerializer representation from flat rows.
+    :param order_rows: (id, region id, status) tuples
+    :param item_rows: (order id, product name) tuples ordered by order item id
+    :return: list of orders data
+    """
+    order_items = defaultdict(list)
+    for order_id, name in item_rows:
+        order_items[order_id].append({"item": {"name": name}})
+    return [
+        {"id": order_id, "region": region_id, "order_items": order_items[order_id], "status": status}
+        for order_id, region_id, status in order_rows
+    ]
+
+
+class FastOrderListSerializer(serializers.ListSerializer):
+    def to_representation(self, data: QuerySet | list[Order]) -> list[dict]:
+        """
+        Fetches orders and their items with two flat queries instead of nested serializers (one more for product
+        names of orders stored in a shard). Works for archived orders as well.
+        """
+        if isinstance(data, QuerySet):
+            order_rows = data.values_list("id", "region_id", "status")
+            order_ids = data.values("id")
+            alias, model = data.db, data.model
+        else:
+            order_rows = [(order.id, order.region_id, order.status) for order in data]
+            order_ids = [order.id for order in data]
+            alias, model = (data[0]._state.db, type(data[0])) if data else (DEFAULT_DB_ALIAS, Order)
+        items = order_item_model(model).objects.using(alias).filter(order_id__in=order_ids).order_by("id")
+        item_rows = item_names(items)
+        return build_orders_data(order_rows, item_rows)
+
+
+class FastOrderSerializer(OrderSerializer):
+    """
+    Read only OrderSerializer producing the same output without nested field machinery.
+    """
+
+    class Meta(OrderSerializer.Meta):
+        list_serializer_class = FastOrderListSerializer
+
+    def to_representation(self, instance: Order) -> dict:
+        item_rows = item_names(instance.order_items.order_by("id"))
+        return build_orders_data([(instance.id, instance.region_id, instance.status)], item_rows)[0]
+
+
 class CreateOrderSerializer(serializers.Serializer):
     cart_id = serializers.IntegerField()
 
     def create(self, validated_data: dict) -> Order:
         """
-        Creates an order from the cart and validates the limits. Today's orders are locked in database until operation
-        is finished. If the limits are exceeded, raises an exception and returns API response. Changes are rolled back.
+        Creates an order from the cart and validates the limits. Today's limit usage rows are locked in database until
+        operation is finished. If the limits are exceeded, raises an exception and returns API response. Changes are
+        rolled back. The order is stored in the database of its region, limits are always checked in the default one,
+        which commits first (see orders.sharding).
+        Items of the cart are written to the database by the cart store in the same transaction (see carts.stores).
+        Time of the transaction, mostly waiting for the locks (BEGIN IMMEDIATE and the usage counters), is recorded for
+        admission control on every exit, also when the transaction fails.
         """
         cart = Cart.objects.get(id=validated_data.get('cart_id'))
-
-        today_orders = Order.objects.select_for_update().filter(
-            created_at=datetime.date.today()
-        )
-        with transaction.atomic():
-            order = Order.objects.create(
-                region=cart.region,
-                user=cart.user,
-                created_at=datetime.date.today()
-            )
-            OrderItem.objects.bulk_create(
-                objs=[OrderItem(order=order, item=cart_item.product) for cart_item in cart.cart_items.all()])
-            try:
-                self.validate_limits(order=order, today_orders=today_orders)
-            except (
-                    GlobalProductLimitObjectDoesNotExist, GlobalLimitExceedException, RegionLimitExceedException
-            ) as exc:
-                raise ValidationError(detail=exc.message, code=exc.code)
-            cart.status = CartStatuses.CLOSED
-            cart.save(update_fields=["status"])
+        cart_store = get_cart_store()
+
+        started = time.monotonic()
+        try:
+            with shard_atomic(shard_for_region(cart.region_id)), immediate_atomic():
+                order = Order.objects.create(
+                    region_id=cart.region_id,
+                    user_id=cart.user_id,
+                    created_at=datetime.date.today(),
+                    ordered_at=timezone.now()
+                )
+                order_items = OrderItem.objects.using(order._state.db).bulk_create(
+                    objs=[OrderItem(order=order, item_id=product_id) for product_id in cart_store.persist(cart)])
+                product_items = Counter(item.item_id for item in order_items)
+                try:
+                    scope_items = self.validate_limits(order=order, product_items=product_items)
+                except (
+                        GlobalProductLimitObjectDoesNotExist, GlobalLimitExceedException, RegionLimitExceedException,
+                        ProductLimitExceedException
+                ) as exc:
+                    raise ValidationError(detail=exc.message, code=exc.code)
+                cart.status = CartStatuses.CLOSED
+                cart.save(update_fields=["status", "updated_at"])
+                transaction.on_commit(partial(cart_store.forget, cart))
+                record_event(
+                    order, OrderEventTypes.CREATED, items=[item.item_id for item in order_items], usage=scope_items,
+                    window=settings.LIMIT_WINDOW
+                )
+                change_sales(order.created_at, order.region_id, product_items)
+        finally:
+            checkout_admission.record_lock_wait(time.monotonic() - started)
         return order
 
     @staticmethod
-    def validate_limits(order: Order, today_orders: QuerySet) -> None:
+    def validate_limits(order: Order, product_items: Counter) -> dict[str, int]:
         """
-        Validates the global and local limits. Today's orders including current one are counted and compared to the
-        limits. If result is negative the limits are exceeded.
-        Raises an exception if the limits are exceeded.
+        Validates the global, local and product limits. Usage counters of all of them (of today, or of the rolling
+        window, see orders.limits) are locked at once, items of the current order are added and compared to the
+        limits. If result is negative the limits are exceeded, otherwise all counters are incremented with one update.
+        Cancelled orders are subtracted from the counters when they are cancelled, so they are not counted.
+        The global limit and the region are read after the counters are locked, so changes committed by then apply.
+        Raises an exception if the limits are exceeded, returns numbers of items added to each usage scope.
         """
+        rules = product_rules(product_items, order.region_id)
+        scope_items = order_usage(order.region_id, product_items, rules)
+        usage = lock_order_usage(order, list(scope_items))
         global_limit_size = GlobalProductLimit.get_global_limit()
-
-        total_items_today = today_orders.annotate(
-            items_count=Count('order_items'),
-            region_items_count=Count("order_items", filter=Q(region=order.region))).aggregate(
-            total_items=Sum('items_count'),
-            region_items=Sum('region_items_count')
-        )
-        global_limit = global_limit_size - total_items_today['total_items']
+        order.region = Region.objects.get(id=order.region_id)
+        items_count = sum(product_items.values())
+        global_limit = global_limit_size - usage[LimitUsage.GLOBAL_SCOPE] - items_count
 
         if global_limit < 0:
             raise GlobalLimitExceedException(ErrorMessages.GLOBAL_LIMIT_EXCEEDED)
 
         if not order.region.unlimited_access:
-            ordered_items_count = total_items_today["region_items"]
+            ordered_items_count = usage[LimitUsage.region_scope(order.region_id)] + items_count
             local_limit = order.region.limit_size - ordered_items_count
 
             if order.region.closed_access or local_limit < 0:
                 raise RegionLimitExceedException(ErrorMessages.REGION_LIMIT_EXCEEDED.format(order.region.name))
 
+        for rule in rules:
+            if rule.limit_size - usage[rule_scope(rule)] - product_items[rule.product_id] < 0:
+                if rule.region_id is None:
+                    raise ProductLimitExceedException(ErrorMessages.PRODUCT_LIMIT_EXCEEDED.format(rule.product.name))
+                raise ProductLimitExceedException(
+                    ErrorMessages.PRODUCT_REGION_LIMIT_EXCEEDED.format(rule.product.name, order.region.name)
+                )
+
+        change_order_usage(order, scope_items)
+        return scope_items
+
     def validate_cart_id(self, value: int):
         """
         Validates if the cart belong to user.
@@ -97,3 +189,34 @@ class CreateOrderSerializer(serializers.Serializer):
         if not Cart.objects.filter(id=value, user=self.context['request'].user).exists():
             raise serializers.ValidationError(ErrorMessages.CART_USER_MISMATCH)
         return value
+
+
+class OrderExportSerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(choices=list(EXPORTS), default="ndjson")
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+
+class DailySalesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailySales
+        fields = ["date", "region", "product", "items", "orders"]
+
+
+class DailySalesReportSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    region = serializers.IntegerField(required=False)
+
+
+class TopSellerSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="product.name")
+
+    class Meta:
+        model = TopSeller
+        fields = ["product", "name", "items"]
+
+
+class TopSellersParamsSerializer(serializers.Serializer):
+    region = serializers.IntegerField()
+    date = serializers.DateField(required=False)
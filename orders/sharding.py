@@ -0,0 +1,222 @@
+"""
+Optional sharding of orders by region. `settings.ORDER_SHARDS` maps region ids to database aliases, orders of other
+regions (and all orders when it is empty) are stored in the default database. Databases other than default contain
+only order tables (see `orders.routers.OrderShardRouter`).
+
+Order ids are global: with sharding enabled they are allocated by `OrderLocator` rows in the default database, which
+also record the database of each order. Without shards orders get plain autoincrement ids and no locators, so
+`sync_order_locators` has to create the missing ones before ORDER_SHARDS is set. Archived orders stay in the database
+of the order (see orders.archive). Limits, usage counters and rollups stay in the default database.
+
+Foreign keys of orders to users, regions and products are constrained only in the default database. Django emulates
+CASCADE in the database of the deleted row, `delete_from_shards` deletes the related rows of shards after the delete
+is committed and `delete_order_locator` removes locators of deleted orders.
+
+A change of an order and its usage counters spans two transactions when the order is in a shard, they are committed
+one after the other. Checkout commits the default database first, cancel and delete commit the order first, so a
+failure between the commits leaves items counted which are not ordered (rebuild_usage corrects the counters), never
+an order which is not counted.
+"""
+from collections import defaultdict
+from contextlib import nullcontext
+from functools import partial
+from typing import ContextManager, Iterable
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Model, QuerySet
+
+from utils.iterators import avalues_list, batched
+
+SHARDED_MODELS = {"order", "orderitem", "archivedorder", "archivedorderitem"}
+
+
+def is_sharded_model(model) -> bool:
+    return model._meta.app_label == "orders" and model._meta.model_name in SHARDED_MODELS
+
+
+def shard_for_region(region_id: int) -> str:
+    return settings.ORDER_SHARDS.get(region_id, DEFAULT_DB_ALIAS)
+
+
+def order_aliases() -> list[str]:
+    """
+    All databases storing orders, the default database first.
+    """
+    return [DEFAULT_DB_ALIAS, *sorted(set(settings.ORDER_SHARDS.values()) - {DEFAULT_DB_ALIAS})]
+
+
+def shard_atomic(alias: str) -> ContextManager:
+    """
+    Transaction of an order database other than default. The default database has its own block (immediate_atomic),
+    so nesting them decides the commit order.
+    """
+    return nullcontext() if alias == DEFAULT_DB_ALIAS else transaction.atomic(using=alias)
+
+
+def order_alias(order_id) -> str:
+    """
+    Database of the order. Unknown ids resolve to the default database.
+    """
+    from orders.models import OrderLocator
+
+    if not settings.ORDER_SHARDS:
+        return DEFAULT_DB_ALIAS
+    try:
+        order_id = int(order_id)
+    except (TypeError, ValueError):
+        return DEFAULT_DB_ALIAS
+    return OrderLocator.objects.filter(id=order_id).values_list("shard", flat=True).first() or DEFAULT_DB_ALIAS
+
+
+def order_ids_by_alias(order_ids: list[int]) -> dict[str, list[int]]:
+    """
+    Groups order ids by their database with one query. Unknown ids are grouped with the default database.
+    """
+    from orders.models import OrderLocator
+
+    if not settings.ORDER_SHARDS:
+        return {DEFAULT_DB_ALIAS: list(order_ids)}
+    shards = dict(OrderLocator.objects.filter(id__in=order_ids).values_list("id", "shard"))
+    ids_by_alias = defaultdict(list)
+    for order_id in order_ids:
+        ids_by_alias[shards.get(order_id, DEFAULT_DB_ALIAS)].append(order_id)
+    return dict(ids_by_alias)
+
+
+def user_order_aliases(user_id: int) -> list[str]:
+    """
+    Databases holding orders of the user, so listing does not query shards without them.
+    """
+    from orders.models import OrderLocator
+
+    if not settings.ORDER_SHARDS:
+        return [DEFAULT_DB_ALIAS]
+    return list(
+        OrderLocator.objects.filter(user_id=user_id).order_by("shard").values_list("shard", flat=True).distinct()
+    )
+
+
+def allocate_order_ids(orders: Iterable, alias: str) -> None:
+    """
+    Assigns global ids to new orders stored in the `alias` database, one bulk insert of locators. Without shards the
+    orders keep their autoincrement ids.
+    """
+    from orders.models import OrderLocator
+
+    if not settings.ORDER_SHARDS:
+        return
+    orders = list(orders)
+    locators = OrderLocator.objects.bulk_create([OrderLocator(user_id=order.user_id, shard=alias) for order in orders])
+    for order, locator in zip(orders, locators):
+        order.id = locator.id
+
+
+def sync_order_locators(batch_size: int = 5000) -> int:
+    """
+    Creates locators with the same ids for orders and archived orders of the default database which have none, then
+    moves the locator id sequence past them, so allocated ids do not collide with existing orders. Returns number of
+    created locators.
+    """
+    from orders.archive import ORDER_MODELS
+    from orders.models import OrderLocator
+
+    created = 0
+    for model in ORDER_MODELS:
+        rows = model.objects.using(DEFAULT_DB_ALIAS).order_by("id").values_list("id", "user_id")
+        for batch in batched(rows.iterator(chunk_size=batch_size), batch_size):
+            known = set(OrderLocator.objects.filter(id__in=[order_id for order_id, _ in batch]).values_list(
+                "id", flat=True
+            ))
+            created += len(OrderLocator.objects.bulk_create([
+                OrderLocator(id=order_id, user_id=user_id, shard=DEFAULT_DB_ALIAS)
+                for order_id, user_id in batch if order_id not in known
+            ]))
+    connection = connections[DEFAULT_DB_ALIAS]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [OrderLocator]):
+            cursor.execute(sql)
+    return created
+
+
+def shard_relations(model: type[Model]) -> list[tuple[type[Model], str]]:
+    """
+    (sharded model, field name) of foreign keys from order tables to the model.
+    """
+    return [
+        (sharded_model, field.name)
+        for sharded_model in apps.get_app_config("orders").get_models() if is_sharded_model(sharded_model)
+        for field in sharded_model._meta.concrete_fields if field.is_relation and field.related_model is model
+    ]
+
+
+def delete_shard_rows(model: type[Model], pk: int) -> None:
+    for alias in order_aliases()[1:]:
+        with transaction.atomic(using=alias):
+            for sharded_model, field_name in shard_relations(model):
+                sharded_model.objects.using(alias).filter(**{field_name: pk}).delete()
+
+
+def delete_from_shards(sender: type[Model], instance: Model, using: str, **kwargs) -> None:
+    """
+    Deletes orders (or order items) of a deleted user, region or product from the shards, after the delete is
+    committed. Connected to post_delete signals of the related models.
+    """
+    if settings.ORDER_SHARDS:
+        transaction.on_commit(partial(delete_shard_rows, sender, instance.pk), using=using)
+
+
+def delete_order_locator(sender: type[Model], instance: Model, using: str, **kwargs) -> None:
+    """
+    Deletes the locator of a deleted order (or archived order) after the delete is committed. Connected to post_delete
+    signals of order models. Orders moved to the archive are not deleted with signals and keep their locators.
+    """
+    from orders.models import OrderLocator
+
+    if settings.ORDER_SHARDS:
+        transaction.on_commit(OrderLocator.objects.filter(id=instance.pk).delete, using=using)
+
+
+def product_names(product_ids: Iterable[int]) -> dict[int, str]:
+    """
+    Names of products by id, read from the default database with one query.
+    """
+    from shop.models import Product
+
+    return dict(Product.objects.filter(id__in=set(product_ids)).values_list("id", "name"))
+
+
+def item_names(items: QuerySet) -> list[tuple]:
+    """
+    (order id, product name) rows of order items. Items in the default database are joined with products, products
+    of items stored in a shard are read from the default database with a second query.
+    """
+    if items.db == DEFAULT_DB_ALIAS:
+        return list(items.values_list("order_id", "item__name"))
+    item_rows = list(items.values_list("order_id", "item_id"))
+    names = product_names(product_id for _, product_id in item_rows)
+    return [(order_id, names[product_id]) for order_id, product_id in item_rows]
+
+
+async def aitem_names(items: QuerySet) -> list[tuple]:
+    """
+    Async version of item_names.
+    """
+    from shop.models import Product
+
+    if items.db == DEFAULT_DB_ALIAS:
+        return await avalues_list(items, "order_id", "item__name")
+    item_rows = await avalues_list(items, "order_id", "item_id")
+    names = dict(await avalues_list(
+        Product.objects.filter(id__in={product_id for _, product_id in item_rows}), "id", "name"
+    ))
+    return [(order_id, names[product_id]) for order_id, product_id in item_rows]
+
+
+def group_by_shard(orders: Iterable) -> dict[str, list]:
+    orders_by_shard = defaultdict(list)
+    for order in orders:
+        orders_by_shard[shard_for_region(order.region_id)].append(order)
+    return orders_by_shard
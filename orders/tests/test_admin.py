@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from utils.factories import (
+    CartItemFactory, OrderFactory, OrderItemFactory, ProductFactory, UserFactory
+)
+from utils.constants import OrderStatuses
+from utils.pagination import EstimatedCountPaginator
+
+
+@pytest.mark.django_db
+class AdminChangelistTestCase:
+
+    @staticmethod
+    def count_queries(admin_client, url: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            assert admin_client.get(url).status_code == status.HTTP_200_OK
+        return len(context)
+
+    def test_order_changelist_queries_do_not_grow_with_rows(self, admin_client, region):
+        url = reverse("admin:orders_order_changelist")
+        OrderFactory.create_batch(2, region=region)
+        queries = self.count_queries(admin_client, url)
+
+        OrderFactory.create_batch(10, region=region)
+
+        assert self.count_queries(admin_client, url) == queries
+
+    def test_order_change_form_does_not_list_products_and_users(self, admin_client, region):
+        order = OrderFactory(region=region)
+        OrderItemFactory(order=order)
+        url = reverse("admin:orders_order_change", args=[order.id])
+        admin_client.get(url)
+        queries = self.count_queries(admin_client, url)
+
+        ProductFactory.create_batch(10)
+        UserFactory.create_batch(10)
+
+        assert self.count_queries(admin_client, url) == queries
+        assert ProductFactory._meta.model.objects.last().name not in admin_client.get(url).content.decode()
+
+    def test_cart_changelist_queries_do_not_grow_with_rows(self, admin_client):
+        url = reverse("admin:carts_cart_changelist")
+        CartItemFactory()
+        queries = self.count_queries(admin_client, url)
+
+        CartItemFactory.create_batch(10)
+
+        assert self.count_queries(admin_client, url) == queries
+
+    def test_filtered_changelist_count_is_capped(self, admin_client, region, monkeypatch):
+        monkeypatch.setattr(EstimatedCountPaginator, "exact_count_threshold", 3)
+        OrderFactory.create_batch(5, region=region)
+        url = reverse("admin:orders_order_changelist")
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url, {"region__id__exact": region.id})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.context["cl"].result_count == 4
+        assert any("COUNT(" in query["sql"] and "LIMIT 4" in query["sql"] for query in context)
+
+    def test_order_status_and_items_cannot_change_in_admin(self, admin_client, region):
+        order = OrderFactory(region=region, status=OrderStatuses.PENDING)
+        item = OrderItemFactory(order=order)
+        url = reverse("admin:orders_order_change", args=[order.id])
+        data = {
+            "user": order.user_id,
+            "region": region.id,
+            "status": OrderStatuses.CANCELED,
+            "order_items-TOTAL_FORMS": 2,
+            "order_items-INITIAL_FORMS": 1,
+            "order_items-0-id": item.id,
+            "order_items-0-order": order.id,
+            "order_items-0-DELETE": "on",
+            "order_items-1-order": order.id,
+            "order_items-1-item": ProductFactory().id,
+        }
+
+        admin_client.post(url, data)
+
+        order.refresh_from_db()
+        assert order.status == OrderStatuses.PENDING
+        assert list(order.order_items.values_list("id", flat=True)) == [item.id]
+        assert admin_client.get(reverse("admin:orders_order_add")).status_code == status.HTTP_403_FORBIDDEN
+        assert admin_client.get(reverse("admin:orders_order_delete", args=[order.id])).status_code == (
+            status.HTTP_403_FORBIDDEN
+        )
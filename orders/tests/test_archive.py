@@ -0,0 +1,116 @@
+import datetime
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+
+from orders.models import (
+    ArchivedOrder, ArchivedOrderItem, ArchiveRun, DailySales, Order, OrderItem, OrderLocator
+)
+from orders.sharding import sync_order_locators
+from utils.constants import OrderStatuses
+from utils.factories import OrderFactory, OrderItemFactory
+
+
+def create_order(user, region, product, days_ago: int, items: int = 1) -> Order:
+    order = OrderFactory(user=user, region=region)
+    Order.objects.filter(id=order.id).update(created_at=datetime.date.today() - datetime.timedelta(days=days_ago))
+    OrderItemFactory.create_batch(items, order=order, item=product)
+    order.refresh_from_db()
+    return order
+
+
+@pytest.mark.django_db
+class OrderArchiveTestCase:
+    url = reverse("api:order-list")
+
+    def test_old_orders_moved_with_items(self, user, region, product):
+        old_order = create_order(user, region, product, days_ago=40, items=2)
+        recent_order = create_order(user, region, product, days_ago=10)
+        item_ids = sorted(OrderItem.objects.filter(order=old_order).values_list("id", flat=True))
+
+        call_command("archive_orders", days=30, stdout=StringIO())
+
+        assert list(Order.objects.values_list("id", flat=True)) == [recent_order.id]
+        archived = ArchivedOrder.objects.get()
+        assert (archived.id, archived.user_id, archived.created_at) == (old_order.id, user.id, old_order.created_at)
+        assert sorted(ArchivedOrderItem.objects.values_list("id", flat=True)) == item_ids
+        assert not OrderItem.objects.filter(order_id=old_order.id).exists()
+        run = ArchiveRun.objects.get()
+        assert (run.orders, run.items, run.last_order_id) == (1, 2, old_order.id)
+        assert run.finished_at is not None
+
+    def test_archived_orders_keep_locators(self, settings, user, region, product, django_capture_on_commit_callbacks):
+        old_order = create_order(user, region, product, days_ago=40)
+        sync_order_locators()
+        settings.ORDER_SHARDS = {region.id: "default"}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("archive_orders", days=30, stdout=StringIO())
+
+        assert ArchivedOrder.objects.filter(id=old_order.id).exists()
+        assert OrderLocator.objects.filter(id=old_order.id).exists()
+
+    def test_interrupted_run_is_resumed(self, user, region, product):
+        orders = [create_order(user, region, product, days_ago=40) for _ in range(3)]
+
+        call_command("archive_orders", days=30, chunk_size=2, max_chunks=1, stdout=StringIO())
+
+        run = ArchiveRun.objects.get()
+        assert (run.orders, run.last_order_id, run.finished_at) == (2, orders[1].id, None)
+        assert list(Order.objects.values_list("id", flat=True)) == [orders[2].id]
+
+        call_command("archive_orders", days=30, chunk_size=2, stdout=StringIO())
+
+        run.refresh_from_db()
+        assert (run.orders, run.last_order_id) == (3, orders[2].id)
+        assert run.finished_at is not None
+        assert ArchiveRun.objects.count() == 1
+        assert not Order.objects.exists()
+
+    def test_orders_of_today_are_never_archived(self):
+        with pytest.raises(CommandError):
+            call_command("archive_orders", days=0, stdout=StringIO())
+
+    def test_reads_span_hot_and_archived_orders(self, user, client, region, product):
+        old_order = create_order(user, region, product, days_ago=40)
+        recent_order = create_order(user, region, product, days_ago=10)
+        before = client.get(self.url).data
+        detail_url = reverse("api:order-detail", args=[old_order.id])
+        etag = client.get(detail_url)["ETag"]
+
+        call_command("archive_orders", days=30, stdout=StringIO())
+
+        assert client.get(self.url).data == before
+        assert client.get(reverse("async:order-list")).json() == before
+        response = client.get(detail_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == before[0]
+        assert client.get(reverse("async:order-detail", args=[old_order.id])).json() == before[0]
+        assert client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        batch = client.get(reverse("api:order-batch"), {"ids": f"{old_order.id},{recent_order.id}"}).data
+        assert [entry["data"] for entry in batch] == before
+        lines = b"".join(client.get(reverse("api:order-export")).streaming_content).decode().splitlines()
+        assert sorted(json.loads(line)["id"] for line in lines) == [old_order.id, recent_order.id]
+
+    def test_archived_orders_cannot_be_changed(self, user, client, region, product):
+        old_order = create_order(user, region, product, days_ago=40)
+        call_command("archive_orders", days=30, stdout=StringIO())
+        detail_url = reverse("api:order-detail", args=[old_order.id])
+
+        assert client.post(reverse("api:order-cancel", args=[old_order.id])).status_code == status.HTTP_404_NOT_FOUND
+        assert client.delete(detail_url).status_code == status.HTTP_404_NOT_FOUND
+        assert ArchivedOrder.objects.get().status == OrderStatuses.PENDING
+
+    def test_rollup_rebuild_merges_partly_archived_day(self, user, region, product):
+        orders = [create_order(user, region, product, days_ago=40) for _ in range(2)]
+        call_command("archive_orders", days=30, chunk_size=1, max_chunks=1, stdout=StringIO())
+
+        call_command("rebuild_daily_sales", stdout=StringIO())
+
+        assert list(DailySales.objects.values_list("date", "product_id", "items", "orders")) == [
+            (orders[0].created_at, product.id, 2, 2)
+        ]
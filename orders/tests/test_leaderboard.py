@@ -0,0 +1,99 @@
+import datetime
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import DailySales, Order, TopSeller
+from orders.rollup import change_sales
+from utils.constants import OrderStatuses
+from utils.factories import OrderFactory, OrderItemFactory, ProductFactory
+
+
+def board(day: datetime.date, region_id: int) -> list[tuple[int, int]]:
+    return list(
+        TopSeller.objects.filter(date=day, region_id=region_id).order_by("-items").values_list("product_id", "items")
+    )
+
+
+@pytest.mark.django_db
+class TopSellersTestCase:
+
+    @pytest.fixture(autouse=True)
+    def board_size(self, settings):
+        settings.TOP_SELLERS_SIZE = 2
+
+    def test_board_keeps_best_products(self, region, django_capture_on_commit_callbacks):
+        today = datetime.date.today()
+        first, second, third = ProductFactory.create_batch(3)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            change_sales(today, region.id, Counter({first.id: 3, second.id: 1}))
+            change_sales(today, region.id, Counter({third.id: 2}))
+
+        assert board(today, region.id) == [(first.id, 3), (third.id, 2)]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            change_sales(today, region.id, Counter({first.id: 3}), sign=-1)
+
+        assert board(today, region.id) == [(third.id, 2), (second.id, 1)]
+
+    def test_order_commit_updates_board(
+            self, client, product, global_limit, region, cart_1_item, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(path=reverse("api:order-list"), data={"cart_id": cart_1_item.id})
+
+        response = APIClient().get(reverse("api:top-sellers-list"), {"region": region.id})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [{"product": product.id, "name": product.name, "items": 1}]
+
+    def test_board_failure_keeps_rollup(
+            self, region, product, django_capture_on_commit_callbacks, monkeypatch, caplog
+    ):
+        def fail(*args, **kwargs):
+            raise RuntimeError("board unavailable")
+
+        monkeypatch.setattr("orders.rollup.update_top_sellers", fail)
+        today = datetime.date.today()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            change_sales(today, region.id, Counter({product.id: 2}))
+
+        assert DailySales.objects.get(date=today, region=region, product=product).items == 2
+        assert board(today, region.id) == []
+        assert "failed after commit" in caplog.text
+
+    def test_endpoint_is_cached(self, region, product, django_assert_num_queries):
+        today = datetime.date.today()
+        url = reverse("api:top-sellers-list")
+        APIClient().get(url, {"region": region.id, "date": today.isoformat()})
+        TopSeller.objects.create(date=today, region=region, product=product, items=1)
+
+        with django_assert_num_queries(0):
+            assert APIClient().get(url, {"region": region.id}).data == []
+
+    def test_endpoint_requires_region(self):
+        assert APIClient().get(reverse("api:top-sellers-list")).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rebuild_command_matches_history(self, region):
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        first, second, third = ProductFactory.create_batch(3)
+        order = OrderFactory(region=region)
+        Order.objects.filter(id=order.id).update(created_at=yesterday)
+        OrderItemFactory.create_batch(3, order=order, item=first)
+        OrderItemFactory.create_batch(2, order=order, item=second)
+        OrderItemFactory(order=order, item=third)
+        canceled = OrderFactory(region=region, status=OrderStatuses.CANCELED)
+        Order.objects.filter(id=canceled.id).update(created_at=yesterday)
+        OrderItemFactory.create_batch(5, order=canceled, item=third)
+        TopSeller.objects.create(date=yesterday, region=region, product=third, items=100)
+
+        call_command("rebuild_top_sellers", batch_size=1, stdout=StringIO())
+
+        assert board(yesterday, region.id) == [(first.id, 3), (second.id, 2)]
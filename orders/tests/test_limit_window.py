@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from freezegun import freeze_time
+from rest_framework import status
+
+from orders import limits
+from orders.models import LimitBucket, LimitUsage
+from utils.factories import CartItemFactory
+
+
+@pytest.mark.django_db
+class RollingLimitWindowTestCase:
+    url = reverse("api:order-list")
+
+    @pytest.fixture(autouse=True)
+    def rolling_window(self, settings, monkeypatch):
+        settings.LIMIT_WINDOW = "rolling"
+        settings.LIMIT_WINDOW_SECONDS = 24 * 60 * 60
+        settings.LIMIT_BUCKET_SECONDS = 5 * 60
+        monkeypatch.setattr(limits, "_pruned_bucket", None)
+
+    def create_order(self, client, cart):
+        return client.post(path=self.url, data={"cart_id": cart.id})
+
+    def test_limit_does_not_reset_at_midnight(self, client, product, global_limit, region, cart_1_item):
+        CartItemFactory.create_batch(2, cart=cart_1_item, product=product)
+
+        with freeze_time("2023-06-01 23:58:00"):
+            assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+        with freeze_time("2023-06-02 00:05:00"):
+            assert self.create_order(client, cart_1_item).status_code == status.HTTP_400_BAD_REQUEST
+        with freeze_time("2023-06-03 00:00:00"):
+            assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+        assert not LimitUsage.objects.exists()
+
+    def test_cancel_releases_bucket_of_order(self, client, product, global_limit, region, cart_1_item):
+        CartItemFactory.create_batch(2, cart=cart_1_item, product=product)
+        with freeze_time("2023-06-01 12:01:00"):
+            order_id = self.create_order(client, cart_1_item).data["order_id"]
+        with freeze_time("2023-06-01 18:00:00"):
+            client.post(reverse("api:order-cancel", args=[order_id]))
+
+            assert limits.window_usage(datetime.datetime.now(datetime.timezone.utc), [LimitUsage.GLOBAL_SCOPE]) == {
+                LimitUsage.GLOBAL_SCOPE: 0
+            }
+            assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+    def test_buckets_outside_window_are_pruned(
+            self, client, product, global_limit, region, cart_1_item, django_capture_on_commit_callbacks
+    ):
+        with freeze_time("2023-06-01 12:00:00"), django_capture_on_commit_callbacks(execute=True):
+            self.create_order(client, cart_1_item)
+        with freeze_time("2023-06-02 12:10:00"), django_capture_on_commit_callbacks(execute=True):
+            assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+        # Only the current and the previous bucket of each scope of the last order remain.
+        assert sorted(LimitBucket.objects.values_list("start", flat=True).distinct()) == [
+            datetime.datetime(2023, 6, 2, 12, 5, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2023, 6, 2, 12, 10, tzinfo=datetime.timezone.utc),
+        ]
+
+    def test_bucket_marked_pruned_after_commit(
+            self, client, product, global_limit, region, cart_1_item, django_capture_on_commit_callbacks
+    ):
+        with freeze_time("2023-06-01 12:00:00"):
+            self.create_order(client, cart_1_item)
+
+            assert limits._pruned_bucket is None
+
+            with django_capture_on_commit_callbacks(execute=True):
+                self.create_order(client, cart_1_item)
+
+        assert limits._pruned_bucket == datetime.datetime(2023, 6, 1, 12, 0, tzinfo=datetime.timezone.utc)
+
+    def test_cancel_releases_day_of_order_counted_before_switch(
+            self, settings, client, product, global_limit, region, cart_1_item
+    ):
+        settings.LIMIT_WINDOW = "day"
+        order_id = self.create_order(client, cart_1_item).data["order_id"]
+        settings.LIMIT_WINDOW = "rolling"
+
+        client.post(reverse("api:order-cancel", args=[order_id]))
+
+        assert LimitUsage.objects.get(scope=LimitUsage.GLOBAL_SCOPE).items == 0
+        assert not LimitBucket.objects.exists()
+
+    def test_window_sums_bounded_number_of_buckets(self, region):
+        now = datetime.datetime(2023, 6, 2, 12, 0, tzinfo=datetime.timezone.utc)
+        scope = LimitUsage.region_scope(region.id)
+        LimitBucket.objects.bulk_create([
+            LimitBucket(start=now - datetime.timedelta(minutes=5 * step), scope=scope, items=1) for step in range(300)
+        ])
+
+        assert limits.window_usage(now, [scope]) == {scope: 24 * 12}
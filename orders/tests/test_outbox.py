@@ -0,0 +1,118 @@
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import OrderEvent
+from orders.outbox import dispatch_events, get_sink
+from utils.constants import OrderEventTypes
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in of an HTTP consumer, stores posted batches on the server.
+    """
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.batches.append(json.loads(body))
+        self.send_response(self.server.status)
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def http_sink_server():
+    server = HTTPServer(("127.0.0.1", 0), RecordingHandler)
+    server.batches, server.status = [], 204
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+class OrderOutboxTestCase:
+
+    def create_order(self, client, cart) -> int:
+        return client.post(path=reverse("api:order-list"), data={"cart_id": cart.id}).data["order_id"]
+
+    def test_events_written_with_order_changes(self, client, product, global_limit, region, cart_1_item):
+        order_id = self.create_order(client, cart_1_item)
+        client.post(reverse("api:order-cancel", args=[order_id]))
+        client.delete(reverse("api:order-detail", args=[order_id]))
+
+        events = list(OrderEvent.objects.filter(order_id=order_id).order_by("id"))
+        assert [event.event_type for event in events] == [
+            OrderEventTypes.CREATED, OrderEventTypes.CANCELED, OrderEventTypes.DELETED
+        ]
+        assert events[0].payload["items"] == [product.id]
+        assert events[0].payload["region"] == region.id
+        assert events[1].payload["status"] == events[2].payload["status"] == 30
+
+    def test_rejected_order_writes_no_event(self, client, product, global_limit, region, cart_1_item):
+        global_limit.limit_size = 0
+        global_limit.save()
+        client.post(path=reverse("api:order-list"), data={"cart_id": cart_1_item.id})
+        assert not OrderEvent.objects.exists()
+
+    def test_file_sink_delivers_once(self, client, product, global_limit, region, cart_1_item, tmp_path):
+        order_id = self.create_order(client, cart_1_item)
+        path = tmp_path / "events.ndjson"
+
+        call_command("dispatch_order_events", sink=f"file://{path}", stdout=StringIO())
+        call_command("dispatch_order_events", sink=f"file://{path}", stdout=StringIO())
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [(line["type"], line["order_id"]) for line in lines] == [(OrderEventTypes.CREATED, order_id)]
+        assert OrderEvent.objects.get().dispatched_at is not None
+
+    def test_http_sink_failure_is_retried_with_backoff(
+            self, client, product, global_limit, region, cart_1_item, http_sink_server
+    ):
+        order_id = self.create_order(client, cart_1_item)
+        sink = get_sink(f"http://127.0.0.1:{http_sink_server.server_port}/events", timeout=5)
+        http_sink_server.status = 500
+
+        assert dispatch_events(sink, backoff_base=30) == (0, 1)
+        event = OrderEvent.objects.get()
+        assert event.attempts == 1
+        assert event.dispatched_at is None
+        assert "500" in event.last_error
+        assert event.available_at > timezone.now() + datetime.timedelta(seconds=25)
+        assert dispatch_events(sink) == (0, 0)
+
+        http_sink_server.status = 204
+        OrderEvent.objects.update(available_at=timezone.now())
+        assert dispatch_events(sink) == (1, 0)
+        assert [[event["order_id"] for event in batch] for batch in http_sink_server.batches] == [
+            [order_id], [order_id]
+        ]
+        assert OrderEvent.objects.get().dispatched_at is not None
+
+    def test_claimed_events_are_leased(self, client, product, global_limit, region, cart_1_item, tmp_path):
+        self.create_order(client, cart_1_item)
+
+        class CrashingSink:
+            def send(self, events):
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            dispatch_events(CrashingSink(), lease=datetime.timedelta(minutes=5))
+        sink = get_sink(f"file://{tmp_path / 'events.ndjson'}")
+        assert dispatch_events(sink) == (0, 0)
+        OrderEvent.objects.update(available_at=timezone.now())
+        assert dispatch_events(sink) == (1, 0)
+
+    def test_unsupported_sink(self):
+        with pytest.raises(ValueError):
+            get_sink("ftp://example.com/events")
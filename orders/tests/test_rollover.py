@@ -0,0 +1,65 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from freezegun import freeze_time
+from rest_framework import status
+
+from orders.models import LimitUsage
+from orders.rollover import seconds_until_rollover
+from utils.factories import ProductLimitFactory
+
+
+@pytest.mark.django_db
+class LimitsRolloverTestCase:
+    url = reverse("api:order-list")
+
+    def test_first_checkout_after_midnight_uses_prepared_state(
+            self, client, product, global_limit, region, cart_1_item
+    ):
+        ProductLimitFactory(product=product, limit_size=5)
+        new_day = datetime.date(2023, 6, 2)
+
+        with freeze_time("2023-06-01 23:59:30"):
+            call_command("prepare_limits_rollover", stdout=StringIO())
+
+        assert set(LimitUsage.objects.filter(day=new_day).values_list("scope", "items")) == {
+            (LimitUsage.GLOBAL_SCOPE, 0),
+            (LimitUsage.region_scope(region.id), 0),
+            (LimitUsage.product_scope(product.id), 0),
+        }
+
+        with freeze_time("2023-06-02 00:00:01"), CaptureQueriesContext(connection) as queries:
+            response = client.post(path=self.url, data={"cart_id": cart_1_item.id})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        # Usage rows of the day already exist, checkout only locks and updates them.
+        assert not [query for query in queries if query["sql"].startswith('INSERT INTO "orders_limitusage"')]
+        assert LimitUsage.objects.filter(day=new_day).count() == 3
+        assert LimitUsage.objects.get(day=new_day, scope=LimitUsage.GLOBAL_SCOPE).items == 1
+
+    def test_rollover_is_repeatable(self, global_limit, region):
+        LimitUsage.objects.create(day=datetime.date(2023, 6, 2), scope=LimitUsage.GLOBAL_SCOPE, items=2)
+
+        call_command("prepare_limits_rollover", day=datetime.date(2023, 6, 2), stdout=StringIO())
+
+        assert LimitUsage.objects.get(day=datetime.date(2023, 6, 2), scope=LimitUsage.GLOBAL_SCOPE).items == 2
+
+    def test_rolling_window_needs_no_usage_rows(self, settings, global_limit, region):
+        settings.LIMIT_WINDOW = "rolling"
+
+        call_command("prepare_limits_rollover", stdout=StringIO())
+
+        assert not LimitUsage.objects.exists()
+
+    @pytest.mark.parametrize("now, seconds", [
+        (datetime.datetime(2023, 6, 1, 23, 59), 30),
+        (datetime.datetime(2023, 6, 1, 12, 0), 12 * 60 * 60 - 30),
+        (datetime.datetime(2023, 6, 1, 23, 59, 45), 24 * 60 * 60 - 15),
+    ])
+    def test_seconds_until_rollover(self, now, seconds):
+        assert seconds_until_rollover(now, lead=30) == seconds
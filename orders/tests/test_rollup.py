@@ -0,0 +1,89 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import DailySales, Order
+from utils.constants import OrderStatuses
+from utils.factories import CartItemFactory, OrderFactory, OrderItemFactory, ProductFactory, UserFactory
+
+
+@pytest.mark.django_db
+class DailySalesTestCase:
+
+    def test_order_creation_updates_rollup(self, client, product, global_limit, region, cart_1_item):
+        global_limit.limit_size = 10
+        global_limit.save()
+        region.limit_size = 10
+        region.save()
+        other_product = ProductFactory()
+        CartItemFactory(cart=cart_1_item, product=product)
+        CartItemFactory(cart=cart_1_item, product=other_product)
+
+        for _ in range(2):
+            client.post(path=reverse("api:order-list"), data={"cart_id": cart_1_item.id})
+
+        today = datetime.date.today()
+        assert DailySales.objects.get(date=today, region=region, product=product).items == 4
+        assert DailySales.objects.get(date=today, region=region, product=product).orders == 2
+        assert DailySales.objects.get(date=today, region=region, product=other_product).items == 2
+
+    def test_rollup_failure_does_not_fail_order(self, client, global_limit, cart_1_item, monkeypatch, caplog):
+        def fail(*args, **kwargs):
+            raise RuntimeError("rollup unavailable")
+
+        monkeypatch.setattr("orders.rollup.record_sales", fail)
+
+        response = client.post(path=reverse("api:order-list"), data={"cart_id": cart_1_item.id})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Order.objects.filter(id=response.data["order_id"]).exists()
+        assert "not changed" in caplog.text
+
+    def test_rebuild_command_matches_history(self, region, product):
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        old_order = OrderFactory(region=region)
+        Order.objects.filter(id=old_order.id).update(created_at=yesterday)
+        OrderItemFactory.create_batch(2, order=old_order, item=product)
+        canceled = OrderFactory(region=region, status=OrderStatuses.CANCELED)
+        Order.objects.filter(id=canceled.id).update(created_at=yesterday)
+        OrderItemFactory(order=canceled, item=ProductFactory())
+        rebuilt = DailySales.objects.create(date=yesterday, region=region, product=product, items=100, orders=100)
+        DailySales.objects.create(date=yesterday, region=region, product=canceled.order_items.get().item, items=1)
+
+        call_command("rebuild_daily_sales", chunk_days=1, stdout=StringIO())
+
+        assert list(DailySales.objects.values_list("id", "date", "items", "orders")) == [
+            (rebuilt.id, yesterday, 2, 1)
+        ]
+
+    def test_rebuild_keeps_incremental_rollup_of_today(self, client, product, global_limit, region, cart_1_item):
+        client.post(path=reverse("api:order-list"), data={"cart_id": cart_1_item.id})
+        OrderItemFactory(order=OrderFactory(region=region), item=product)
+
+        call_command("rebuild_daily_sales", stdout=StringIO())
+
+        # The order created without checkout is not in the rollup, today is counted only by checkouts.
+        assert list(DailySales.objects.values_list("date", "items", "orders")) == [(datetime.date.today(), 1, 1)]
+
+    def test_sales_report_for_staff_only(self, client, region, product):
+        today = datetime.date.today()
+        DailySales.objects.create(date=today, region=region, product=product, items=3, orders=2)
+        params = {"date_from": today.isoformat(), "date_to": today.isoformat(), "region": region.id}
+        url = reverse("api:sales-report-list")
+
+        assert client.get(url, params).status_code == status.HTTP_403_FORBIDDEN
+
+        staff_client = APIClient()
+        staff_client.force_authenticate(UserFactory(is_staff=True))
+        response = staff_client.get(url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"date": today.isoformat(), "region": region.id, "product": product.id, "items": 3, "orders": 2}
+        ]
+        assert staff_client.get(url).status_code == status.HTTP_400_BAD_REQUEST
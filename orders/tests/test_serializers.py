@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from orders.models import Order, OrderItem
+from orders.serializers import FastOrderSerializer, OrderSerializer
+from shop.models import Product, Region
+from utils.factories import OrderFactory, OrderItemFactory, ProductFactory
+from utils.renderers import FastJSONRenderer
+
+
+@pytest.mark.django_db
+class FastOrderSerializerTestCase:
+
+    @pytest.fixture
+    def orders(self, user, region):
+        products = ProductFactory.create_batch(3)
+        orders = OrderFactory.create_batch(3, user=user, region=region)
+        for order in orders[:2]:
+            for product in products:
+                OrderItemFactory(order=order, item=product)
+        return Order.objects.filter(user=user)
+
+    def test_list_output_matches_order_serializer(self, orders):
+        expected = JSONRenderer().render(OrderSerializer(orders, many=True).data)
+
+        assert JSONRenderer().render(FastOrderSerializer(orders, many=True).data) == expected
+        assert JSONRenderer().render(FastOrderSerializer(list(orders), many=True).data) == expected
+
+    def test_retrieve_output_matches_order_serializer(self, orders):
+        order = orders.first()
+
+        assert FastOrderSerializer(order).data == OrderSerializer(order).data
+
+    def test_list_uses_two_queries(self, orders, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            FastOrderSerializer(orders, many=True).data
+
+    def test_fast_json_renderer_output_is_valid_json(self, orders):
+        data = FastOrderSerializer(orders, many=True).data
+
+        assert FastJSONRenderer().render(data).replace(b" ", b"") == JSONRenderer().render(data).replace(b" ", b"")
+
+    def test_benchmark_command(self):
+        stdout = StringIO()
+
+        call_command("benchmark_order_serializers", items=20, repeat=1, stdout=stdout)
+
+        assert "Serializer speedup" in stdout.getvalue()
+        assert not Order.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class AsyncReadsBenchmarkTestCase:
+
+    def test_generated_data_is_deleted(self):
+        stdout = StringIO()
+
+        call_command("benchmark_async_reads", items=10, connections=2, requests=4, stdout=stdout)
+
+        assert "Async speedup" in stdout.getvalue()
+        assert not Order.objects.exists()
+        assert not OrderItem.objects.exists()
+        assert not Product.objects.exists()
+        assert not Region.objects.exists()
+        assert not User.objects.exists()
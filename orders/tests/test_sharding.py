@@ -0,0 +1,178 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+from rest_framework import status
+
+from orders.models import ArchivedOrder, ArchiveRun, LimitUsage, Order, OrderItem, OrderLocator
+from utils.constants import OrderStatuses
+
+SHARDED_DATABASES = ["default", "shard_1", "shard_2"]
+
+
+@pytest.fixture
+def sharded_regions(settings, region, cart_1_item_second_region):
+    settings.ORDER_SHARDS = {region.id: "shard_1", cart_1_item_second_region.region_id: "shard_2"}
+
+
+@pytest.mark.django_db(databases=SHARDED_DATABASES)
+class OrderShardingTestCase:
+    url = reverse("api:order-list")
+
+    def test_order_stored_in_shard_of_region(self, client, global_limit, cart_1_item, sharded_regions):
+        response = client.post(self.url, data={"cart_id": cart_1_item.id})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        order_id = response.data["order_id"]
+        assert Order.objects.using("shard_1").filter(id=order_id).exists()
+        assert OrderItem.objects.using("shard_1").filter(order_id=order_id).count() == 1
+        assert not Order.objects.filter(id=order_id).exists()
+        assert OrderLocator.objects.get(id=order_id).shard == "shard_1"
+
+    def test_list_and_retrieve_read_all_shards(
+            self, client, global_limit, product, cart_1_item, cart_1_item_second_region, sharded_regions
+    ):
+        order_ids = [
+            client.post(self.url, data={"cart_id": cart.id}).data["order_id"]
+            for cart in (cart_1_item, cart_1_item_second_region)
+        ]
+
+        response = client.get(self.url)
+
+        assert sorted(order["id"] for order in response.data) == sorted(order_ids)
+        assert response.data[0]["order_items"] == [{"item": {"name": product.name}}]
+        assert client.get(reverse("async:order-list")).json() == response.json()
+        for order_id in order_ids:
+            assert client.get(reverse("api:order-detail", args=[order_id])).status_code == status.HTTP_200_OK
+
+    def test_batch_retrieve_reads_all_shards(
+            self, client, global_limit, product, cart_1_item, cart_1_item_second_region, sharded_regions
+    ):
+        order_ids = [
+            client.post(self.url, data={"cart_id": cart.id}).data["order_id"]
+            for cart in (cart_1_item, cart_1_item_second_region)
+        ]
+
+        response = client.get(reverse("api:order-batch"), {"ids": f"{order_ids[1]},{order_ids[0]}"})
+
+        assert [(entry["id"], entry["status"]) for entry in response.data] == [
+            (order_ids[1], status.HTTP_200_OK), (order_ids[0], status.HTTP_200_OK)
+        ]
+        assert response.data[0]["data"]["order_items"] == [{"item": {"name": product.name}}]
+
+    def test_global_limit_enforced_across_shards(
+            self, client, global_limit, cart_1_item, cart_1_item_second_region, sharded_regions
+    ):
+        global_limit.limit_size = 1
+        global_limit.save(update_fields=["limit_size"])
+
+        assert client.post(self.url, data={"cart_id": cart_1_item.id}).status_code == status.HTTP_201_CREATED
+        response = client.post(self.url, data={"cart_id": cart_1_item_second_region.id})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(response.data[0]) == "Global limit exceeded."
+        assert not Order.objects.using("shard_2").exists()
+
+    def test_cancel_releases_capacity_on_default_database(
+            self, client, global_limit, cart_1_item, sharded_regions
+    ):
+        order_id = client.post(self.url, data={"cart_id": cart_1_item.id}).data["order_id"]
+
+        response = client.post(reverse("api:order-cancel", args=[order_id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Order.objects.using("shard_1").get(id=order_id).status == OrderStatuses.CANCELED
+        usage = LimitUsage.objects.get(day=datetime.date.today(), scope=LimitUsage.GLOBAL_SCOPE)
+        assert usage.items == 0
+
+    def test_orders_archived_within_their_shard(self, client, global_limit, product, cart_1_item, sharded_regions):
+        order_id = client.post(self.url, data={"cart_id": cart_1_item.id}).data["order_id"]
+        Order.objects.using("shard_1").filter(id=order_id).update(created_at=datetime.date(2020, 1, 1))
+
+        call_command("archive_orders", days=1, stdout=StringIO())
+
+        assert not Order.objects.using("shard_1").exists()
+        assert ArchivedOrder.objects.using("shard_1").filter(id=order_id).exists()
+        assert ArchiveRun.objects.filter(shard="shard_1", orders=1).exists()
+        response = client.get(reverse("api:order-detail", args=[order_id]))
+        assert response.data["order_items"] == [{"item": {"name": product.name}}]
+
+    def test_admin_lists_and_changes_shard_orders(
+            self, admin_client, client, global_limit, cart_1_item, sharded_regions
+    ):
+        order_id = client.post(self.url, data={"cart_id": cart_1_item.id}).data["order_id"]
+
+        changelist = admin_client.get(reverse("admin:orders_order_changelist"), {"shard": "shard_1"})
+        change = admin_client.get(reverse("admin:orders_order_change", args=[order_id]))
+
+        assert changelist.status_code == status.HTTP_200_OK
+        assert list(changelist.context["cl"].result_list) == [Order.objects.using("shard_1").get(id=order_id)]
+        assert change.status_code == status.HTTP_200_OK
+        assert change.context["original"]._state.db == "shard_1"
+
+    def test_region_delete_reaches_shards(
+            self, client, global_limit, region, cart_1_item, sharded_regions, django_capture_on_commit_callbacks
+    ):
+        order_id = client.post(self.url, data={"cart_id": cart_1_item.id}).data["order_id"]
+
+        with django_capture_on_commit_callbacks(using="shard_1", execute=True), \
+                django_capture_on_commit_callbacks(execute=True):
+            region.delete()
+
+        assert not Order.objects.using("shard_1").exists()
+        assert not OrderItem.objects.using("shard_1").exists()
+        assert not OrderLocator.objects.filter(id=order_id).exists()
+
+    def test_order_delete_removes_locator(
+            self, client, global_limit, cart_1_item, sharded_regions, django_capture_on_commit_callbacks
+    ):
+        order_id = client.post(self.url, data={"cart_id": cart_1_item.id}).data["order_id"]
+
+        with django_capture_on_commit_callbacks(using="shard_1", execute=True):
+            response = client.delete(reverse("api:order-detail", args=[order_id]))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not OrderLocator.objects.filter(id=order_id).exists()
+
+    def test_foreign_keys_constrained_only_in_default_database(self):
+        def foreign_keys(alias: str) -> set:
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, "orders_order")
+            return {constraint["foreign_key"][0] for constraint in constraints.values() if constraint["foreign_key"]}
+
+        assert foreign_keys("default") == {"auth_user", "shop_region"}
+        assert foreign_keys("shard_1") == set()
+
+    def test_shards_contain_only_order_tables(self):
+        assert set(connections["shard_1"].introspection.table_names()) == {
+            "django_migrations", "orders_order", "orders_orderitem", "orders_archivedorder", "orders_archivedorderitem"
+        }
+
+
+@pytest.mark.django_db
+class OrderLocatorTestCase:
+    url = reverse("api:order-list")
+
+    def test_no_locators_without_shards(self, client, global_limit, cart_1_item):
+        response = client.post(self.url, data={"cart_id": cart_1_item.id})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Order.objects.filter(id=response.data["order_id"]).exists()
+        assert not OrderLocator.objects.exists()
+
+    def test_sync_before_enabling_shards(self, settings, client, global_limit, region, cart_1_item):
+        order_id = client.post(self.url, data={"cart_id": cart_1_item.id}).data["order_id"]
+
+        call_command("sync_order_locators", stdout=StringIO())
+        call_command("sync_order_locators", stdout=StringIO())
+
+        assert list(OrderLocator.objects.values_list("id", "shard")) == [(order_id, "default")]
+        settings.ORDER_SHARDS = {region.id + 1: "shard_1"}
+        assert client.get(self.url).data[0]["id"] == order_id
+        new_order = Order.objects.create(user_id=cart_1_item.user_id, region=region)
+        assert new_order.id > order_id
+        assert OrderLocator.objects.get(id=new_order.id).shard == "default"
@@ -1,13 +1,20 @@
 import datetime
+import json
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from freezegun import freeze_time
 from rest_framework import status
+from rest_framework.test import APIClient
 
-from orders.models import Order
+from orders.limits import rebuild_usage
+from orders.models import LimitUsage, Order
+from orders.views import OrderViewSet
+from shop.models import Region
 from utils.constants import OrderStatuses, CartStatuses, ErrorMessages
-from utils.factories import CartItemFactory
+from utils.factories import CartItemFactory, OrderFactory, OrderItemFactory, ProductFactory, ProductLimitFactory
 
 
 @pytest.mark.django_db
@@ -109,6 +116,18 @@ class OrderViewSetTestCase:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.data[0] == ErrorMessages.REGION_LIMIT_EXCEEDED.format(region.name)
 
+    def test_closed_access_applies_while_catalog_is_cached(
+            self, user, client, product, global_limit, region, cart_1_item
+    ):
+        client.get(reverse("api:region-detail", args=[region.id]))
+        # The generation is bumped after commit only, the cached catalog still has the region open.
+        Region.objects.filter(id=region.id).update(closed_access=True)
+
+        response = client.post(path=self.url, data={"cart_id": cart_1_item.id})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get(reverse("api:region-detail", args=[region.id])).data["available"] is True
+
     def test_cannot_create_order_when_global_limit_exceeded_but_local_not(
             self, user, client, product, global_limit, region, cart_1_item,
     ):
@@ -234,3 +253,306 @@ class OrderViewSetTestCase:
 
             assert response.status_code == status.HTTP_201_CREATED
             assert datetime.date.today() == tomorrow
+
+
+@pytest.mark.django_db
+class OrderExportTestCase:
+    url = reverse("api:order-export")
+
+    def test_export_ndjson_streams_user_orders_with_items(self, user, client, product, region):
+        order = OrderFactory(user=user, region=region)
+        OrderItemFactory.create_batch(2, order=order, item=product)
+        OrderItemFactory(order=OrderFactory(region=region), item=product)
+
+        response = client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 1
+        exported = json.loads(lines[0])
+        assert exported["id"] == order.id
+        assert exported["status"] == OrderStatuses.PENDING
+        assert exported["items"] == [{"product": product.id, "name": product.name}] * 2
+
+    def test_export_csv_filtered_by_date(self, user, client, product, region):
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        old_order = OrderFactory(user=user, region=region)
+        Order.objects.filter(id=old_order.id).update(created_at=yesterday)
+        OrderItemFactory(order=old_order, item=product)
+        OrderItemFactory(order=OrderFactory(user=user, region=region), item=product)
+
+        response = client.get(self.url, {"export_format": "csv", "date_to": yesterday.isoformat()})
+
+        assert response.status_code == status.HTTP_200_OK
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == "order_id,created_at,region,status,product,product_name"
+        assert lines[1:] == [
+            f"{old_order.id},{yesterday.isoformat()},{region.id},{OrderStatuses.PENDING},{product.id},{product.name}"
+        ]
+
+    def test_export_unknown_format(self, client):
+        response = client.get(self.url, {"export_format": "xml"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class OrderConditionalGetTestCase:
+
+    def test_retrieve_not_modified_after_single_query(self, user, client, region, django_assert_num_queries):
+        order = OrderFactory(user=user, region=region)
+        OrderItemFactory(order=order)
+        url = reverse("api:order-detail", args=[order.id])
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+        with django_assert_num_queries(1):
+            not_modified = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified["ETag"] == response["ETag"]
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_retrieve_modified_after_status_change(self, user, client, region):
+        order = OrderFactory(user=user, region=region)
+        url = reverse("api:order-detail", args=[order.id])
+        etag = client.get(url)["ETag"]
+
+        order.status = OrderStatuses.COMPLETED
+        order.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == OrderStatuses.COMPLETED
+        assert response["ETag"] != etag
+
+    def test_list_etag_changes_when_order_deleted(self, user, client, region):
+        orders = OrderFactory.create_batch(2, user=user, region=region)
+        url = reverse("api:order-list")
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        orders[0].delete()
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class ProductLimitTestCase:
+    url = reverse("api:order-list")
+
+    def create_order(self, client, cart):
+        return client.post(path=self.url, data={"cart_id": cart.id})
+
+    def test_product_limit_in_all_regions(
+            self, client, product, global_limit, region, cart_1_item, cart_1_item_second_region
+    ):
+        ProductLimitFactory(product=product, limit_size=1)
+
+        assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+        response = self.create_order(client, cart_1_item_second_region)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(response.data[0]) == ErrorMessages.PRODUCT_LIMIT_EXCEEDED.format(product.name)
+
+    def test_product_limit_of_region(
+            self, client, product, global_limit, region, cart_1_item, cart_1_item_second_region
+    ):
+        ProductLimitFactory(product=product, region=region, limit_size=1)
+        CartItemFactory(cart=cart_1_item, product=product)
+
+        response = self.create_order(client, cart_1_item)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert str(response.data[0]) == ErrorMessages.PRODUCT_REGION_LIMIT_EXCEEDED.format(product.name, region.name)
+        assert self.create_order(client, cart_1_item_second_region).status_code == status.HTTP_201_CREATED
+
+    def test_other_products_not_limited(self, client, product, global_limit, region, cart_1_item):
+        ProductLimitFactory(limit_size=0)
+        CartItemFactory(cart=cart_1_item, product=ProductFactory())
+
+        assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+    def test_limits_checked_in_one_counter_pass(self, client, product, global_limit, region, cart_1_item):
+        global_limit.limit_size = 10
+        global_limit.save()
+        region.limit_size = 10
+        region.save()
+        self.create_order(client, cart_1_item)
+        with CaptureQueriesContext(connection) as without_rules:
+            self.create_order(client, cart_1_item)
+        ProductLimitFactory(product=product, limit_size=5)
+        ProductLimitFactory(product=product, region=region, limit_size=5)
+        self.create_order(client, cart_1_item)
+
+        with CaptureQueriesContext(connection) as with_rules:
+            assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+        # Usage counters of product scopes are locked and updated together with the global and region ones.
+        assert len(with_rules) == len(without_rules)
+
+    def test_cancel_and_rebuild_product_usage(self, client, product, global_limit, region, cart_1_item):
+        rule = ProductLimitFactory(product=product, region=region, limit_size=1)
+        scope = LimitUsage.product_scope(product.id, region.id)
+        order_id = self.create_order(client, cart_1_item).data["order_id"]
+        self.create_order(client, cart_1_item)
+        today = datetime.date.today()
+
+        assert LimitUsage.objects.get(day=today, scope=scope).items == 1
+
+        client.post(reverse("api:order-cancel", args=[order_id]))
+        assert LimitUsage.objects.get(day=today, scope=scope).items == 0
+        assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+        LimitUsage.objects.filter(day=today, scope=scope).update(items=10)
+        rebuild_usage(today)
+        assert LimitUsage.objects.get(day=today, scope=scope).items == rule.limit_size
+
+    def test_cancel_releases_scopes_counted_at_checkout(self, client, product, global_limit, region, cart_1_item):
+        old_rule = ProductLimitFactory(product=product, limit_size=5)
+        order_id = self.create_order(client, cart_1_item).data["order_id"]
+        old_rule.delete()
+        ProductLimitFactory(product=product, region=region, limit_size=5)
+        today = datetime.date.today()
+        LimitUsage.objects.create(day=today, scope=LimitUsage.product_scope(product.id, region.id), items=3)
+
+        client.post(reverse("api:order-cancel", args=[order_id]))
+
+        assert LimitUsage.objects.get(day=today, scope=LimitUsage.product_scope(product.id, None)).items == 0
+        assert LimitUsage.objects.get(day=today, scope=LimitUsage.product_scope(product.id, region.id)).items == 3
+
+
+@pytest.mark.django_db
+class OrderBatchRetrieveTestCase:
+    url = reverse("api:order-batch")
+
+    def test_batch_reports_each_entry(self, user, client, product, region, django_assert_num_queries):
+        orders = OrderFactory.create_batch(2, user=user, region=region)
+        OrderItemFactory(order=orders[0], item=product)
+        foreign_order = OrderFactory(region=region)
+        ids = [orders[1].id, foreign_order.id, 987654, orders[0].id]
+
+        # Orders and items, missing ids are looked up in the archive as well.
+        with django_assert_num_queries(4):
+            response = client.get(self.url, {"ids": ",".join(map(str, ids))})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [(entry["id"], entry["status"]) for entry in response.data] == [
+            (orders[1].id, status.HTTP_200_OK),
+            (foreign_order.id, status.HTTP_404_NOT_FOUND),
+            (987654, status.HTTP_404_NOT_FOUND),
+            (orders[0].id, status.HTTP_200_OK),
+        ]
+        assert response.data[1]["detail"] == ErrorMessages.OBJECT_NOT_FOUND
+        assert response.data[3]["data"] == client.get(reverse("api:order-detail", args=[orders[0].id])).data
+
+    def test_batch_rejects_invalid_ids(self, client):
+        response = client.get(self.url, {"ids": "1,x"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["ids"] == [ErrorMessages.BATCH_IDS_INVALID]
+
+    @pytest.mark.parametrize("ids", ["1,0", "-1", str(2 ** 63), "1," + "9" * 30])
+    def test_batch_rejects_ids_out_of_range(self, client, ids):
+        response = client.get(self.url, {"ids": ids})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["ids"] == [ErrorMessages.BATCH_IDS_INVALID]
+
+    def test_batch_limits_number_of_ids(self, client, settings):
+        settings.BATCH_RETRIEVE_MAX_IDS = 2
+
+        response = client.get(self.url, {"ids": "1,2,3"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["ids"] == [ErrorMessages.BATCH_IDS_TOO_MANY.format(2)]
+
+
+@pytest.mark.django_db
+class OrderCancelTestCase:
+    url = reverse("api:order-list")
+
+    def create_order(self, client, cart):
+        return client.post(path=self.url, data={"cart_id": cart.id})
+
+    def test_cancel_releases_daily_capacity(self, user, client, product, global_limit, region, cart_1_item):
+        CartItemFactory.create_batch(2, cart=cart_1_item, product=product)
+        order_id = self.create_order(client, cart_1_item).data["order_id"]
+        assert self.create_order(client, cart_1_item).status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.post(reverse("api:order-cancel", args=[order_id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == OrderStatuses.CANCELED
+        assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+    def test_cannot_cancel_twice(self, user, client, product, global_limit, region, cart_1_item):
+        order_id = self.create_order(client, cart_1_item).data["order_id"]
+        client.post(reverse("api:order-cancel", args=[order_id]))
+
+        response = client.post(reverse("api:order-cancel", args=[order_id]))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == ErrorMessages.ORDER_CANCEL_NOT_ALLOWED
+
+    def test_cannot_cancel_order_of_other_user(self, client, region):
+        order = OrderFactory(region=region)
+
+        response = client.post(reverse("api:order-cancel", args=[order.id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert Order.objects.get(id=order.id).status == OrderStatuses.PENDING
+
+    def test_destroy_releases_daily_capacity(self, user, client, product, global_limit, region, cart_1_item):
+        CartItemFactory.create_batch(2, cart=cart_1_item, product=product)
+        order_id = self.create_order(client, cart_1_item).data["order_id"]
+
+        assert client.delete(reverse("api:order-detail", args=[order_id])).status_code == status.HTTP_204_NO_CONTENT
+        assert self.create_order(client, cart_1_item).status_code == status.HTTP_201_CREATED
+
+    def test_destroy_after_concurrent_cancel_releases_once(self, client, global_limit, region, cart_1_item):
+        order_id = self.create_order(client, cart_1_item).data["order_id"]
+        loaded = Order.objects.get(id=order_id)
+        client.post(reverse("api:order-cancel", args=[order_id]))
+
+        OrderViewSet().perform_destroy(loaded)
+
+        assert not Order.objects.filter(id=order_id).exists()
+        assert LimitUsage.objects.get(day=datetime.date.today(), scope=LimitUsage.GLOBAL_SCOPE).items == 0
+
+
+@pytest.mark.django_db
+class OrderAsyncViewsTestCase:
+    def test_list_matches_sync_list(self, user, client, product, region):
+        for _ in range(2):
+            OrderItemFactory.create_batch(2, order=OrderFactory(user=user, region=region), item=product)
+        OrderFactory(region=region)
+
+        response = client.get(reverse("async:order-list"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == json.loads(client.get(reverse("api:order-list")).content)
+
+    def test_retrieve_matches_sync_retrieve(self, user, client, product, region):
+        order = OrderFactory(user=user, region=region)
+        OrderItemFactory(order=order, item=product)
+
+        response = client.get(reverse("async:order-detail", args=[order.id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == json.loads(client.get(reverse("api:order-detail", args=[order.id])).content)
+
+    def test_cannot_retrieve_order_of_other_user(self, client, region):
+        order = OrderFactory(region=region)
+
+        response = client.get(reverse("async:order-detail", args=[order.id]))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_anonymous_user_not_authenticated(self):
+        response = APIClient().get(reverse("async:order-list"))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from orders.views import OrderViewSet
+from orders.views import CheckoutAdmissionViewSet, DailySalesViewSet, OrderViewSet, TopSellerViewSet
 
 router = routers.DefaultRouter()
 router.register('order', OrderViewSet, basename="order")
+router.register('sales-report', DailySalesViewSet, basename="sales-report")
+router.register('top-sellers', TopSellerViewSet, basename="top-sellers")
+router.register('checkout-admission', CheckoutAdmissionViewSet, basename="checkout-admission")
 
 urlpatterns = [
     path('api/', include((router.urls, 'api'), namespace='api')),
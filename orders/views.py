@@ -1,44 +1,277 @@
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import Http404, HttpRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from orders.models import Order
-from orders.serializers import CreateOrderSerializer, OrderSerializer
+from orders.archive import ORDER_MODELS, order_item_model
+from orders.exports import EXPORTS
+from orders.limits import release_order
+from orders.models import ArchivedOrder, DailySales, Order, TopSeller
+from orders.outbox import record_event
+from orders.sharding import aitem_names, order_alias, order_ids_by_alias, user_order_aliases
+from orders.serializers import (
+    CreateOrderSerializer, DailySalesReportSerializer, DailySalesSerializer, FastOrderSerializer,
+    OrderExportSerializer, OrderSerializer, TopSellerSerializer, TopSellersParamsSerializer, build_orders_data
+)
+from utils.admission import checkout_admission
+from utils.authentication import aauthenticate, not_authenticated_response, not_found_response
+from utils.constants import ErrorMessages, OrderEventTypes, OrderStatuses
+from utils.iterators import avalues_list
+from utils.mixins import BatchRetrieveMixin, ConditionalGetMixin, MultiDatabaseListMixin
+from utils.throttling import CheckoutThrottleMixin
+from utils.pagination import ReportPagination
+from utils.transactions import immediate_atomic
 
 
 # Create your views here.
 class OrderViewSet(
-    mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin, mixins.ListModelMixin, GenericViewSet
+    CheckoutThrottleMixin, ConditionalGetMixin, BatchRetrieveMixin, mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin, mixins.DestroyModelMixin, MultiDatabaseListMixin, GenericViewSet
 ):
     """
     OrderViewSet is a viewset that provides the following actions:
-    create, retrieve, destroy, list.
+    create, retrieve, batch (see BatchRetrieveMixin), destroy, list, export and cancel.
     All action is available only for the owner of the carts and orders.
+    List and retrieve answer conditional requests (ETag, Last-Modified) with 304 if the orders did not change.
+    Create is throttled per user, region and globally (see CheckoutThrottleMixin).
+    Orders may be stored in several databases (see orders.sharding), list and export read all of them.
+    List, retrieve, batch and export read archived orders as well (see orders.archive), other actions change only
+    orders which are not archived.
     """
 
     def get_queryset(self) -> QuerySet:
-        return Order.objects.filter(user=self.request.user)
+        return self.get_order_queryset(Order)
+
+    def get_order_queryset(self, model: type[Order] | type[ArchivedOrder]) -> QuerySet:
+        """
+        Orders (or archived orders) of the user, for detail actions in the database of the requested order.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return model.objects.none()
+        queryset = model.objects.filter(user=self.request.user)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            return queryset.using(order_alias(self.kwargs[lookup_url_kwarg]))
+        return queryset
+
+    def get_list_querysets(self) -> list[QuerySet]:
+        """
+        Archived and hot orders of each database of the user, older orders first.
+        """
+        return [
+            self.filter_queryset(self.get_order_queryset(model)).using(alias)
+            for alias in user_order_aliases(self.request.user.id)
+            for model in (ArchivedOrder, Order)
+        ]
+
+    def get_retrieve_querysets(self) -> list[QuerySet]:
+        return [self.get_order_queryset(model) for model in ORDER_MODELS]
+
+    def get_batch_querysets(self, ids: list[int]) -> list[QuerySet]:
+        return [
+            self.get_order_queryset(model).using(alias).filter(pk__in=alias_ids)
+            for alias, alias_ids in order_ids_by_alias(ids).items()
+            for model in ORDER_MODELS
+        ]
+
+    def get_object(self) -> Order | ArchivedOrder:
+        """
+        Retrieve falls back to archived orders when the order is not in the hot tables.
+        """
+        try:
+            return super().get_object()
+        except Http404:
+            if self.action != "retrieve":
+                raise
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        order = get_object_or_404(self.get_order_queryset(ArchivedOrder), pk=self.kwargs[lookup_url_kwarg])
+        self.check_object_permissions(self.request, order)
+        return order
 
     def perform_create(self, serializer: CreateOrderSerializer) -> None:
         serializer.save(user=self.request.user)
 
-    def get_serializer_class(self) -> CreateOrderSerializer | OrderSerializer:
+    def perform_destroy(self, instance: Order) -> None:
+        """
+        Deletes the order, items of not cancelled orders are given back to the limits of the day. The order is locked
+        and read again in the transaction, so items of an order cancelled concurrently are not given back twice.
+        """
+        alias = instance._state.db
+        with immediate_atomic(), transaction.atomic(using=alias):
+            order = get_object_or_404(Order.objects.using(alias).select_for_update(), pk=instance.pk)
+            if order.status != OrderStatuses.CANCELED:
+                release_order(order)
+            record_event(order, OrderEventTypes.DELETED)
+            order.delete()
+
+    def get_serializer_class(self) -> CreateOrderSerializer | OrderSerializer | OrderExportSerializer:
         if self.action == 'create':
             return CreateOrderSerializer
+        if self.action == 'export':
+            return OrderExportSerializer
+        if self.action in ('list', 'retrieve', 'batch', 'cancel'):
+            return FastOrderSerializer
         return OrderSerializer
 
     def create(self, request: Request, *args, **kwargs) -> Response:
         """
-        Create an order from the cart.
+        Create an order from the cart. Checkouts are admitted by admission control (see utils.admission), overloaded
+        checkout is rejected with 503 and Retry-After.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with checkout_admission.admit():
+            serializer.save()
         serializer = OrderSerializer(serializer.instance)
         return Response({
             "order_id": serializer.data.get("id"),
             "order_status": serializer.data.get("status"),
             "shelves": serializer.data.get("order_items")
         }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request: Request, pk: int | None = None) -> Response:
+        """
+        Cancels a pending order. Its items are given back to the global and region limits of the day it was created.
+        """
+        order = self.get_object()
+        with immediate_atomic(), transaction.atomic(using=order._state.db):
+            canceled = Order.objects.using(order._state.db).filter(pk=order.pk, status=OrderStatuses.PENDING).update(
+                status=OrderStatuses.CANCELED, updated_at=timezone.now()
+            )
+            if not canceled:
+                raise ValidationError(ErrorMessages.ORDER_CANCEL_NOT_ALLOWED)
+            release_order(order)
+            order.status = OrderStatuses.CANCELED
+            record_event(order, OrderEventTypes.CANCELED)
+        order.refresh_from_db()
+        return Response(self.get_serializer(order).data)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """
+        Streams the order history of the user as NDJSON (one order per line) or CSV (one order item per line).
+        Optional `date_from` and `date_to` params limit the range of order creation dates.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        querysets = self.get_list_querysets()
+        if "date_from" in params:
+            querysets = [queryset.filter(created_at__gte=params["date_from"]) for queryset in querysets]
+        if "date_to" in params:
+            querysets = [queryset.filter(created_at__lte=params["date_to"]) for queryset in querysets]
+
+        export_format = params["export_format"]
+        export, content_type = EXPORTS[export_format]
+        response = StreamingHttpResponse(export(querysets), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="orders.{export_format}"'
+        return response
+
+
+class DailySalesViewSet(mixins.ListModelMixin, GenericViewSet):
+    """
+    Report of items sold per day, region and product, read from the daily sales rollup.
+    Params: date_from, date_to (required) and optional region id. Available only for staff users.
+    """
+    serializer_class = DailySalesSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = ReportPagination
+
+    def get_queryset(self) -> QuerySet:
+        params = DailySalesReportSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = DailySales.objects.filter(
+            date__range=(params.validated_data["date_from"], params.validated_data["date_to"])
+        )
+        if "region" in params.validated_data:
+            queryset = queryset.filter(region_id=params.validated_data["region"])
+        return queryset.order_by("date", "region", "-items")
+
+
+class CheckoutAdmissionViewSet(GenericViewSet):
+    """
+    Counters of checkout admission decisions of the worker process serving the request, checkouts in flight and the
+    average lock wait in seconds (see utils.admission). Available only for staff users, not documented in the API
+    schema.
+    """
+    permission_classes = [IsAdminUser]
+    swagger_schema = None
+
+    def list(self, request: Request) -> Response:
+        return Response(checkout_admission.snapshot())
+
+
+class TopSellerViewSet(GenericViewSet):
+    """
+    Most ordered products of a region on a day (params: region id, optional date, today by default), read from the
+    precomputed top sellers board. Responses are cached for TOP_SELLERS_CACHE_TIMEOUT seconds.
+    """
+    serializer_class = TopSellerSerializer
+
+    def list(self, request: Request) -> Response:
+        params = TopSellersParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        region_id = params.validated_data["region"]
+        day = params.validated_data.get("date", datetime.date.today())
+        data = cache.get_or_set(
+            f"top-sellers:{region_id}:{day.isoformat()}",
+            lambda: self.get_serializer(
+                TopSeller.objects.filter(date=day, region_id=region_id).select_related("product").order_by(
+                    "-items", "product_id"
+                ),
+                many=True,
+            ).data,
+            settings.TOP_SELLERS_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
+
+async def order_list_async(request: HttpRequest) -> JsonResponse:
+    """
+    Async version of order list, returns the same data as OrderViewSet.list using the async ORM.
+    """
+    user = await aauthenticate(request)
+    if user is None:
+        return not_authenticated_response()
+    data = []
+    for alias in await sync_to_async(user_order_aliases)(user.id):
+        for model in (ArchivedOrder, Order):
+            order_rows = await avalues_list(model.objects.using(alias).filter(user=user), "id", "region_id", "status")
+            item_rows = await aitem_names(
+                order_item_model(model).objects.using(alias).filter(order__user=user).order_by("id")
+            )
+            data.extend(build_orders_data(order_rows, item_rows))
+    return JsonResponse(data, safe=False)
+
+
+async def order_detail_async(request: HttpRequest, pk: int) -> JsonResponse:
+    """
+    Async version of order retrieve, archived orders are read when the order is not in the hot tables.
+    """
+    user = await aauthenticate(request)
+    if user is None:
+        return not_authenticated_response()
+    alias = await sync_to_async(order_alias)(pk)
+    for model in ORDER_MODELS:
+        try:
+            order = await model.objects.using(alias).filter(user=user).values("id", "region_id", "status").aget(pk=pk)
+        except model.DoesNotExist:
+            continue
+        item_rows = await aitem_names(order_item_model(model).objects.using(alias).filter(order_id=pk).order_by("id"))
+        return JsonResponse(build_orders_data([tuple(order.values())], item_rows)[0])
+    return not_found_response()
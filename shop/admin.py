@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from shop.models import Product, Region, GlobalProductLimit
+from shop.models import Product, ProductLimit, Region, GlobalProductLimit
+from utils.pagination import EstimatedCountPaginator
 
 
 @admin.register(GlobalProductLimit)
@@ -16,4 +17,12 @@ class RegionAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    pass
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ProductLimit)
+class ProductLimitAdmin(admin.ModelAdmin):
+    list_display = ["product", "region", "limit_size"]
+    list_select_related = ["product", "region"]
+    raw_id_fields = ["product"]
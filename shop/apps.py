@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ShopConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shop'
+
+    def ready(self) -> None:
+        from django.db.models.signals import post_delete, post_save
+
+        from shop.catalog import catalog_changed
+        from shop.models import GlobalProductLimit, Product, Region
+
+        for model in (GlobalProductLimit, Product, Region):
+            post_save.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_save_{model.__name__}")
+            post_delete.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_delete_{model.__name__}")
@@ -0,0 +1,85 @@
+"""
+Caching of the read only catalog (products and regions). Cached entries are keyed by a generation number which is
+incremented after commit of every change of a product, region or the global limit, so stale entries are never read
+and just expire. Entries are kept in the default cache, which has to be shared by workers (CACHE_URL) for invalidation
+to reach all of them. Bulk operations do not send signals, call `bump_catalog_generation` after them.
+Checkout does not read the catalog cache, limits are read from the database in the checkout transaction.
+"""
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from orders.limits import current_usage
+from orders.models import LimitUsage
+from shop.models import GlobalProductLimit, Region
+
+GENERATION_KEY = "catalog:generation"
+
+
+def catalog_generation() -> int:
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def bump_catalog_generation() -> None:
+    """
+    Invalidates all cached catalog entries.
+    """
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 2, timeout=None)
+
+
+def catalog_changed(using: str | None = None, **kwargs) -> None:
+    """
+    Bumps the generation after the change is committed, a bump before commit would let concurrent readers cache
+    the old rows under the new generation. Connected to save and delete signals of catalog models.
+    """
+    transaction.on_commit(bump_catalog_generation, using=using)
+
+
+def catalog_cache_key(name: str, url: str) -> str:
+    return f"catalog:{catalog_generation()}:{name}:{hashlib.md5(url.encode()).hexdigest()}"
+
+
+def availability_key(day: datetime.date) -> str:
+    return f"catalog:{catalog_generation()}:availability:{day.isoformat()}"
+
+
+def compute_region_availability(day: datetime.date | None = None) -> dict[int, bool]:
+    """
+    Returns for each region whether it accepts orders now (or on the day): access is not closed, the global limit is
+    set and neither the global nor the region limit is used up yet.
+    """
+    global_limit = GlobalProductLimit.objects.values_list("limit_size", flat=True).first()
+    regions = list(Region.objects.values_list("id", "limit_size", "closed_access", "unlimited_access"))
+    usage = current_usage(
+        [LimitUsage.GLOBAL_SCOPE] + [LimitUsage.region_scope(region[0]) for region in regions], day=day
+    )
+    global_open = global_limit is not None and usage[LimitUsage.GLOBAL_SCOPE] < global_limit
+    return {
+        region_id: global_open and not closed_access and (
+            unlimited_access or usage[LimitUsage.region_scope(region_id)] < limit_size
+        )
+        for region_id, limit_size, closed_access, unlimited_access in regions
+    }
+
+
+def region_availability(day: datetime.date | None = None) -> dict[int, bool]:
+    """
+    Availability of regions, computed once per catalog generation and day (today by default). Usage counters change
+    with every order and do not bump the generation, so the value may be up to CATALOG_CACHE_TIMEOUT seconds old.
+    """
+    day = day or datetime.date.today()
+    return cache.get_or_set(
+        availability_key(day),
+        lambda: compute_region_availability(day),
+        settings.CATALOG_CACHE_TIMEOUT,
+    )
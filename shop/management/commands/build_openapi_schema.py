@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from django_drf_shop.schema import generate_schema
+
+
+class Command(BaseCommand):
+    help = "Generates the OpenAPI schema into OPENAPI_SCHEMA_FILE, served by /openapi.json."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--output", default=None, help="Defaults to OPENAPI_SCHEMA_FILE setting.")
+
+    def handle(self, *args, **options) -> None:
+        output = options["output"] or settings.OPENAPI_SCHEMA_FILE
+        with open(output, "wb") as schema_file:
+            schema_file.write(generate_schema())
+        self.stdout.write(self.style.SUCCESS(f"OpenAPI schema written to {output}."))
@@ -0,0 +1,159 @@
+import datetime
+import itertools
+import random
+from collections import defaultdict
+from typing import Iterator
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from carts.models import Cart, CartItem
+from orders.limits import rebuild_usage
+from orders.models import Order, OrderItem
+from shop.catalog import bump_catalog_generation
+from shop.models import GlobalProductLimit, Product, Region
+from utils.iterators import batched
+
+
+def zipf_cum_weights(size: int, skew: float) -> list[float]:
+    """
+    Returns cumulative Zipf weights for `size` elements. The first elements are the "hot" ones, skew 0 means uniform.
+    """
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users, regions, products, open carts and a multi-day order history with skewed (Zipf) "
+        "popularity of regions and products. Rows are streamed in bulk_create batches."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--regions", type=int, default=10)
+        parser.add_argument("--products", type=int, default=500)
+        parser.add_argument("--carts", type=int, default=500, help="Open carts, at most one per user.")
+        parser.add_argument("--orders", type=int, default=10000)
+        parser.add_argument("--days", type=int, default=30, help="Number of days of order history, ending today.")
+        parser.add_argument("--max-items", type=int, default=5, help="Maximum number of items per cart or order.")
+        parser.add_argument("--region-skew", type=float, default=1.2, help="Zipf exponent of region popularity.")
+        parser.add_argument("--product-skew", type=float, default=1.1, help="Zipf exponent of product popularity.")
+        parser.add_argument("--global-limit", type=int, default=1000000)
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Rows held in memory and sent to the database per INSERT. Bounds the memory used by the command."
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data sets.")
+        parser.add_argument("--prefix", default="seed", help="Username prefix of generated users.")
+
+    def handle(self, *args, **options) -> None:
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.max_items = options["max_items"]
+
+        if not GlobalProductLimit.objects.exists():
+            GlobalProductLimit.objects.create(limit_size=options["global_limit"])
+
+        self.user_ids = self.create_users(options["users"], options["prefix"])
+        self.region_ids = self.create_regions(options["regions"])
+        self.product_ids = self.create_products(options["products"])
+        bump_catalog_generation()
+        self.region_weights = zipf_cum_weights(len(self.region_ids), options["region_skew"])
+        self.product_weights = zipf_cum_weights(len(self.product_ids), options["product_skew"])
+
+        carts = self.create_carts(min(options["carts"], len(self.user_ids)))
+        orders, items = self.create_orders(options["orders"], options["days"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(self.user_ids)} users, {len(self.region_ids)} regions, {len(self.product_ids)} products, "
+            f"{carts} carts and {orders} orders with {items} items."
+        ))
+
+    def bulk_insert(self, model, objs: Iterator) -> list[int]:
+        """
+        Inserts objects batch by batch, each batch in its own transaction. Returns primary keys of created rows.
+        """
+        ids = []
+        for batch in batched(objs, self.batch_size):
+            with transaction.atomic():
+                ids.extend(obj.pk for obj in model.objects.bulk_create(batch, batch_size=self.batch_size))
+        return ids
+
+    def create_users(self, count: int, prefix: str) -> list[int]:
+        # Hashing is deliberately slow, all generated users share one password hash.
+        password = make_password(prefix)
+        offset = User.objects.count()
+        return self.bulk_insert(
+            User, (User(username=f"{prefix}_{offset + number}", password=password) for number in range(count))
+        )
+
+    def create_regions(self, count: int) -> list[int]:
+        offset = Region.objects.count()
+        return self.bulk_insert(
+            Region,
+            (
+                Region(name=f"R{offset + number:03d}", limit_size=self.rng.randint(100, 10000))
+                for number in range(count)
+            )
+        )
+
+    def create_products(self, count: int) -> list[int]:
+        offset = Product.objects.count()
+        return self.bulk_insert(Product, (Product(name=f"Product {offset + number}") for number in range(count)))
+
+    def random_region(self) -> int:
+        return self.rng.choices(self.region_ids, cum_weights=self.region_weights)[0]
+
+    def random_products(self) -> list[int]:
+        return self.rng.choices(
+            self.product_ids, cum_weights=self.product_weights, k=self.rng.randint(1, self.max_items)
+        )
+
+    def create_carts(self, count: int) -> int:
+        for user_ids in batched(self.user_ids[:count], self.batch_size):
+            with transaction.atomic():
+                carts = Cart.objects.bulk_create(
+                    [Cart(user_id=user_id, region_id=self.random_region()) for user_id in user_ids]
+                )
+                CartItem.objects.bulk_create(
+                    (
+                        CartItem(cart_id=cart.pk, product_id=product_id)
+                        for cart in carts for product_id in self.random_products()
+                    ),
+                    batch_size=self.batch_size
+                )
+        return count
+
+    def create_orders(self, count: int, days: int) -> tuple[int, int]:
+        """
+        Spreads orders evenly over the last `days` days. `created_at` is auto_now_add, so each batch is moved to its
+        day with a single UPDATE after insertion.
+        """
+        today = datetime.date.today()
+        items_count = 0
+        for day_offset in range(days):
+            day = today - datetime.timedelta(days=days - day_offset - 1)
+            day_orders = count // days + (1 if day_offset < count % days else 0)
+            for batch_start in range(0, day_orders, self.batch_size):
+                batch_size = min(self.batch_size, day_orders - batch_start)
+                with transaction.atomic():
+                    orders = Order.objects.bulk_create([
+                        Order(user_id=self.rng.choice(self.user_ids), region_id=self.random_region())
+                        for _ in range(batch_size)
+                    ])
+                    # Orders are stored in the databases of their regions.
+                    order_ids = defaultdict(list)
+                    for order in orders:
+                        order_ids[order._state.db].append(order.pk)
+                    for alias, shard_order_ids in order_ids.items():
+                        Order.objects.using(alias).filter(id__in=shard_order_ids).update(created_at=day)
+                        items = [
+                            OrderItem(order_id=order_id, item_id=product_id)
+                            for order_id in shard_order_ids for product_id in self.random_products()
+                        ]
+                        OrderItem.objects.using(alias).bulk_create(items, batch_size=self.batch_size)
+                        items_count += len(items)
+            rebuild_usage(day)
+            self.stdout.write(f"{day}: {day_orders} orders")
+        return count, items_count
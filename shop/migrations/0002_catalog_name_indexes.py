@@ -0,0 +1,21 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name'], name='product_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='region',
+            index=models.Index(fields=['name'], name='region_name_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.3 on 2026-10-19 16:38
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_catalog_name_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductLimit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('limit_size', models.IntegerField(validators=[django.core.validators.MinValueValidator(0)], verbose_name='product limit size')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='limits', to='shop.product', verbose_name='product')),
+                ('region', models.ForeignKey(blank=True, help_text='Empty for all regions.', null=True, on_delete=django.db.models.deletion.CASCADE, to='shop.region', verbose_name='region')),
+            ],
+            options={
+                'verbose_name': 'Product limit',
+                'verbose_name_plural': 'Product limits',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productlimit',
+            constraint=models.UniqueConstraint(fields=('product', 'region'), name='product_limit_product_region'),
+        ),
+        migrations.AddConstraint(
+            model_name='productlimit',
+            constraint=models.UniqueConstraint(condition=models.Q(('region__isnull', True)), fields=('product',), name='product_limit_product_all_regions'),
+        ),
+    ]
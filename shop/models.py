@@ -50,6 +50,10 @@ class Region(models.Model):
     class Meta:
         verbose_name = "Region"
         verbose_name_plural = "Regions"
+        indexes = [
+            # Prefix search of the catalog (LIKE 'x%'), the operator class is used by PostgreSQL only.
+            models.Index(fields=["name"], name="region_name_prefix_idx", opclasses=["varchar_pattern_ops"]),
+        ]
 
     def __str__(self) -> str:
         return f"Region {self.name}"
@@ -69,6 +73,39 @@ class Product(models.Model):
     class Meta:
         verbose_name = "Product"
         verbose_name_plural = "Products"
+        indexes = [
+            models.Index(fields=["name"], name="product_name_prefix_idx", opclasses=["varchar_pattern_ops"]),
+        ]
 
     def __str__(self) -> str:
         return self.name
+
+
+class ProductLimit(models.Model):
+    """
+    Daily limit of items of one product, in all regions together or (with region set) in one region. Checked by
+    checkout together with the global and region limits.
+    """
+    product = models.ForeignKey(Product, verbose_name="product", related_name="limits", on_delete=models.CASCADE)
+    region = models.ForeignKey(
+        Region,
+        verbose_name="region",
+        null=True,
+        blank=True,
+        help_text="Empty for all regions.",
+        on_delete=models.CASCADE
+    )
+    limit_size = models.IntegerField(verbose_name='product limit size', validators=[MinValueValidator(0)])
+
+    class Meta:
+        verbose_name = "Product limit"
+        verbose_name_plural = "Product limits"
+        constraints = [
+            models.UniqueConstraint(fields=["product", "region"], name="product_limit_product_region"),
+            models.UniqueConstraint(
+                fields=["product"], condition=models.Q(region__isnull=True), name="product_limit_product_all_regions"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Product {self.product_id} limit: {self.limit_size}"
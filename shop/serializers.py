@@ -13,3 +13,23 @@ class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['name']
+
+
+class CatalogRegionSerializer(serializers.ModelSerializer):
+    """
+    Region of the catalog. `available` is read from the `availability` mapping of the serializer context.
+    """
+    available = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Region
+        fields = ['id', 'name', 'limit_size', 'closed_access', 'unlimited_access', 'available']
+
+    def get_available(self, region: Region) -> bool:
+        return self.context["availability"].get(region.id, False)
+
+
+class CatalogProductSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ['id', 'name']
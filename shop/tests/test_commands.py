@@ -0,0 +1,37 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from carts.models import Cart
+from orders.models import Order, OrderItem
+from shop.models import GlobalProductLimit, Product, Region
+
+
+@pytest.mark.django_db
+class SeedShopCommandTestCase:
+
+    def test_seed_shop_creates_skewed_history(self):
+        call_command(
+            "seed_shop", users=20, regions=4, products=30, carts=10, orders=200, days=5, max_items=3,
+            batch_size=7, seed=1, stdout=StringIO()
+        )
+
+        assert User.objects.count() == 20
+        assert Region.objects.count() == 4
+        assert Product.objects.count() == 30
+        assert Cart.objects.count() == 10
+        assert Order.objects.count() == 200
+        assert GlobalProductLimit.objects.exists()
+        assert OrderItem.objects.filter(order__isnull=False).count() >= 200
+
+        today = datetime.date.today()
+        days = set(Order.objects.values_list("created_at", flat=True))
+        assert days == {today - datetime.timedelta(days=offset) for offset in range(5)}
+
+        hottest_region, coldest_region = Region.objects.order_by("id")[0], Region.objects.order_by("-id")[0]
+        assert Order.objects.filter(region=hottest_region).count() > Order.objects.filter(
+            region=coldest_region
+        ).count()
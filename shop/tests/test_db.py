@@ -0,0 +1,78 @@
+import environ
+import pytest
+from django.db import connection
+from django.db.utils import ConnectionHandler, OperationalError
+from django.test.utils import CaptureQueriesContext
+
+from django_drf_shop.db import database_config
+from utils.transactions import immediate_atomic
+
+
+class DatabaseConfigTestCase:
+
+    def test_sqlite_uses_tuned_backend(self, monkeypatch):
+        monkeypatch.setenv("SQL_ENGINE", "django.db.backends.sqlite3")
+        monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "2.5")
+
+        config = database_config(environ.Env())
+
+        assert config["ENGINE"] == "django_drf_shop.db.sqlite3"
+        assert config["OPTIONS"]["timeout"] == 2.5
+        assert config["CONN_HEALTH_CHECKS"] is True
+
+    def test_postgresql_pool_only_when_size_set(self, monkeypatch):
+        monkeypatch.setenv("SQL_ENGINE", "django.db.backends.postgresql")
+        monkeypatch.delenv("DB_POOL_MAX_SIZE", raising=False)
+        assert database_config(environ.Env())["ENGINE"] == "django.db.backends.postgresql"
+
+        monkeypatch.setenv("DB_POOL_MAX_SIZE", "20")
+        config = database_config(environ.Env())
+
+        assert config["ENGINE"] == "django_drf_shop.db.postgresql_pool"
+        assert config["OPTIONS"]["pool_max_size"] == 20
+        assert config["CONN_MAX_AGE"] == 0
+
+
+@pytest.mark.django_db
+class SQLiteBackendTestCase:
+
+    @staticmethod
+    def connections(tmp_path, timeout: float) -> ConnectionHandler:
+        database = {
+            "ENGINE": "django_drf_shop.db.sqlite3",
+            "NAME": str(tmp_path / "db.sqlite3"),
+            "OPTIONS": {"timeout": timeout, "journal_mode": "WAL", "synchronous": "NORMAL"},
+        }
+        return ConnectionHandler({"default": database, "second": database})
+
+    def test_new_connection_uses_wal(self, tmp_path):
+        handler = self.connections(tmp_path, timeout=1)
+        with handler["default"].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            assert cursor.fetchone()[0] == "wal"
+        handler.close_all()
+
+    def test_begin_immediate_waits_for_write_lock(self, tmp_path):
+        handler = self.connections(tmp_path, timeout=0.1)
+        first, second = handler["default"], handler["second"]
+        first.begin_immediate = second.begin_immediate = True
+        first.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+
+        with pytest.raises(OperationalError, match="locked"):
+            second.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+
+        first.rollback()
+        handler.close_all()
+
+
+@pytest.mark.django_db(transaction=True)
+class ImmediateAtomicTestCase:
+
+    def test_outermost_block_begins_immediate(self):
+        with CaptureQueriesContext(connection) as queries:
+            with immediate_atomic():
+                with immediate_atomic():
+                    pass
+
+        assert queries.captured_queries[0]["sql"] == "BEGIN IMMEDIATE"
+        assert not connection.begin_immediate
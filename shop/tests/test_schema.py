@@ -0,0 +1,67 @@
+import base64
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from django_drf_shop.schema import generate_schema, load_schema
+
+
+@pytest.fixture
+def schema_file(settings, tmp_path):
+    settings.OPENAPI_SCHEMA_FILE = str(tmp_path / "openapi.json")
+    load_schema.cache_clear()
+    yield settings.OPENAPI_SCHEMA_FILE
+    load_schema.cache_clear()
+
+
+@pytest.mark.django_db
+class OpenAPISchemaTestCase:
+    url = reverse("openapi-schema")
+
+    def test_build_command_writes_schema_served_by_view(self, schema_file, admin_client):
+        call_command("build_openapi_schema", stdout=StringIO())
+        with open(schema_file) as prebuilt:
+            assert "/order/{id}/cancel/" in json.load(prebuilt)["paths"]
+
+        response = admin_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        with open(schema_file) as prebuilt:
+            assert json.loads(response.content) == json.load(prebuilt)
+        assert "max-age=86400" in response["Cache-Control"]
+        not_modified = admin_client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_schema_generated_when_file_missing(self, schema_file, admin_client):
+        response = admin_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "/cart/" in json.loads(response.content)["paths"]
+
+    def test_swagger_ui_uses_schema_file(self, schema_file, admin_client, admin_user):
+        credentials = base64.b64encode(b"admin:password").decode()
+
+        response = admin_client.get(reverse("schema-swagger-ui"), HTTP_AUTHORIZATION=f"Basic {credentials}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self.url in response.content.decode()
+
+    def test_login_required(self, schema_file, client):
+        assert client.get(self.url).status_code == status.HTTP_302_FOUND
+
+
+class SchemaGenerationTestCase:
+
+    def test_schema_generated_without_database(self, caplog):
+        schema = json.loads(generate_schema())
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert not [message for message in messages if "during schema generation" in message]
+        assert "CatalogRegion" in schema["definitions"]
+        assert "/checkout-admission/" not in schema["paths"]
+        assert "200" in schema["paths"]["/region/"]["get"]["responses"]
+        assert "schema" in schema["paths"]["/region/"]["get"]["responses"]["200"]
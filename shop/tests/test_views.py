@@ -0,0 +1,108 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import LimitUsage
+from shop.catalog import catalog_generation
+from utils.factories import ProductFactory, RegionFactory
+
+
+@pytest.mark.django_db
+class ProductCatalogTestCase:
+
+    def test_list_is_paginated_by_name(self):
+        for name in ["pear", "apple", "plum"]:
+            ProductFactory(name=name)
+
+        response = APIClient().get(reverse("api:product-list"), {"limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 3
+        assert [product["name"] for product in response.data["results"]] == ["apple", "pear"]
+        assert response.data["next"] is not None
+
+    def test_search_by_name_prefix(self):
+        for name in ["pear", "apple", "plum", "peach"]:
+            ProductFactory(name=name)
+
+        response = APIClient().get(reverse("api:product-list"), {"search": "pe"})
+
+        assert [product["name"] for product in response.data["results"]] == ["peach", "pear"]
+
+    def test_response_cached_until_product_changes(
+            self, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        product = ProductFactory(name="apple")
+        url = reverse("api:product-detail", args=[product.id])
+        APIClient().get(url)
+
+        with django_assert_num_queries(0):
+            assert APIClient().get(url).data == {"id": product.id, "name": "apple"}
+
+        product.name = "banana"
+        with django_capture_on_commit_callbacks(execute=True):
+            product.save()
+        assert APIClient().get(url).data["name"] == "banana"
+
+    def test_deleted_product_removed_from_cached_list(self, django_capture_on_commit_callbacks):
+        product = ProductFactory()
+        url = reverse("api:product-list")
+        assert APIClient().get(url).data["count"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.delete()
+
+        assert APIClient().get(url).data["count"] == 0
+
+
+@pytest.mark.django_db
+class RegionCatalogTestCase:
+
+    def test_availability(self, global_limit):
+        open_region = RegionFactory(name="A", limit_size=3)
+        full_region = RegionFactory(name="B", limit_size=3)
+        closed_region = RegionFactory(name="C", closed_access=True)
+        unlimited_region = RegionFactory(name="D", limit_size=0, unlimited_access=True)
+        LimitUsage.objects.create(day=datetime.date.today(), scope=LimitUsage.region_scope(full_region.id), items=3)
+
+        response = APIClient().get(reverse("api:region-list"))
+
+        assert {region["id"]: region["available"] for region in response.data["results"]} == {
+            open_region.id: True, full_region.id: False, closed_region.id: False, unlimited_region.id: True
+        }
+
+    def test_no_region_available_without_global_limit(self, region):
+        response = APIClient().get(reverse("api:region-detail", args=[region.id]))
+
+        assert response.data["available"] is False
+
+    def test_availability_computed_once_per_generation(self, global_limit, region, django_assert_num_queries):
+        APIClient().get(reverse("api:region-list"))
+
+        # Availability is reused, only the page and its count are queried.
+        with django_assert_num_queries(2):
+            APIClient().get(reverse("api:region-list"), {"search": region.name})
+
+    def test_region_change_invalidates_availability(self, global_limit, region, django_capture_on_commit_callbacks):
+        url = reverse("api:region-detail", args=[region.id])
+        assert APIClient().get(url).data["available"] is True
+
+        region.closed_access = True
+        with django_capture_on_commit_callbacks(execute=True):
+            region.save()
+
+        assert APIClient().get(url).data["available"] is False
+
+    def test_generation_bumped_after_commit(self, region, django_capture_on_commit_callbacks):
+        generation = catalog_generation()
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            region.save()
+            assert catalog_generation() == generation
+
+        for callback in callbacks:
+            callback()
+        assert catalog_generation() == generation + 1
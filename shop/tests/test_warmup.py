@@ -0,0 +1,23 @@
+import pytest
+from django.db import connection, connections
+
+from django_drf_shop.schema import load_schema
+from django_drf_shop.warmup import warm_up_master, warm_up_worker
+
+
+@pytest.mark.django_db
+class WarmUpTestCase:
+
+    def test_warm_up_loads_schema_and_opens_connection(self, settings, tmp_path, monkeypatch):
+        settings.OPENAPI_SCHEMA_FILE = str(tmp_path / "openapi.json")
+        settings.LIMIT_ROLLOVER_TIMER = False
+        load_schema.cache_clear()
+        # The test transaction has to survive closing connections in the master process.
+        monkeypatch.setattr(connections, "close_all", lambda: None)
+
+        warm_up_master()
+        warm_up_worker()
+
+        assert load_schema.cache_info().currsize == 1
+        assert connection.connection is not None
+        load_schema.cache_clear()
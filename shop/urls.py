@@ -1,13 +1,30 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from orders.views import OrderViewSet
-from carts.views import CartViewSet
+from orders.views import (
+    CheckoutAdmissionViewSet, DailySalesViewSet, OrderViewSet, TopSellerViewSet, order_detail_async, order_list_async
+)
+from carts.views import CartViewSet, cart_detail_async, cart_list_async
+from shop.views import ProductViewSet, RegionViewSet
 
 router = routers.DefaultRouter()
 router.register('cart', CartViewSet, basename="cart")
 router.register('order', OrderViewSet, basename="order")
+router.register('sales-report', DailySalesViewSet, basename="sales-report")
+router.register('top-sellers', TopSellerViewSet, basename="top-sellers")
+router.register('checkout-admission', CheckoutAdmissionViewSet, basename="checkout-admission")
+router.register('product', ProductViewSet, basename="product")
+router.register('region', RegionViewSet, basename="region")
+
+# Async read only endpoints, intended for ASGI deployment.
+async_urls = [
+    path('order/', order_list_async, name='order-list'),
+    path('order/<int:pk>/', order_detail_async, name='order-detail'),
+    path('cart/', cart_list_async, name='cart-list'),
+    path('cart/<int:pk>/', cart_detail_async, name='cart-detail'),
+]
 
 urlpatterns = [
     path('api/', include((router.urls, 'api'), namespace='api')),
+    path('api/async/', include((async_urls, 'async'), namespace='async')),
 ]
@@ -0,0 +1,69 @@
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
+from rest_framework import mixins
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from shop.catalog import catalog_cache_key, region_availability
+from shop.models import Product, Region
+from shop.serializers import CatalogProductSerializer, CatalogRegionSerializer
+from utils.pagination import CatalogPagination
+
+
+class CatalogViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+    """
+    Read only catalog, ordered by name. `search` param of the list filters names by prefix (case sensitive, uses the
+    name index). Whole responses are cached per URL until the catalog changes (see shop.catalog).
+    """
+    pagination_class = CatalogPagination
+
+    def get_queryset(self) -> QuerySet:
+        if getattr(self, 'swagger_fake_view', False):
+            return self.queryset.none()
+        queryset = self.queryset.order_by("name", "id")
+        search = self.request.query_params.get("search")
+        if search:
+            queryset = queryset.filter(name__startswith=search)
+        return queryset
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request: Request, handler: Callable, *args, **kwargs) -> Response:
+        key = catalog_cache_key(self.basename, request.build_absolute_uri())
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
+
+
+class ProductViewSet(CatalogViewSet):
+    """
+    Products which can be added to carts.
+    """
+    queryset = Product.objects.all()
+    serializer_class = CatalogProductSerializer
+
+
+class RegionViewSet(CatalogViewSet):
+    """
+    Regions with their limits. `available` tells whether the region accepts orders today, it is refreshed at least
+    every CATALOG_CACHE_TIMEOUT seconds.
+    """
+    queryset = Region.objects.all()
+    serializer_class = CatalogRegionSerializer
+
+    def get_serializer_context(self) -> dict:
+        context = super().get_serializer_context()
+        if getattr(self, 'swagger_fake_view', False) or self.action not in ("list", "retrieve"):
+            return context
+        return {**context, "availability": region_availability()}
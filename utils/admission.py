@@ -0,0 +1,120 @@
+"""
+Admission control of checkout. Checkouts serialize on locks of limit usage counters, when the locks back up, new
+checkouts would wait in worker threads until requests time out. The controller of each worker process admits at most
+CHECKOUT_MAX_IN_FLIGHT checkouts at once, others wait up to CHECKOUT_QUEUE_SECONDS for a slot. While the average wait
+for the limit locks is above CHECKOUT_MAX_LOCK_WAIT seconds, checkouts are rejected at once. Rejected checkouts get
+503 with Retry-After, other endpoints are not affected.
+
+The lock wait is an exponentially weighted moving average of recent checkouts, which decays by half every
+CHECKOUT_LOCK_WAIT_HALF_LIFE seconds without new samples, so checkouts are admitted again after the backlog had time to
+clear. With sync workers (one thread per process) the in-flight limit is never reached and the lock wait does the
+shedding. Decisions are counted per process, see `snapshot`.
+"""
+import math
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.conf import settings
+
+from utils.exceptions import CheckoutOverloadedException
+
+# Weight of a new sample in the lock wait average.
+LOCK_WAIT_WEIGHT = 0.2
+
+DECISIONS = ["admitted", "queued", "rejected_in_flight", "rejected_lock_wait"]
+
+
+class AdmissionController:
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears counters and the lock wait average.
+        """
+        with self.condition:
+            self.counters = Counter({decision: 0 for decision in DECISIONS})
+            self.lock_wait = 0.0
+            self.lock_wait_at = time.monotonic()
+
+    def current_lock_wait(self, now: float) -> float:
+        elapsed = max(now - self.lock_wait_at, 0.0)
+        return self.lock_wait * 0.5 ** (elapsed / settings.CHECKOUT_LOCK_WAIT_HALF_LIFE)
+
+    def record_lock_wait(self, seconds: float) -> None:
+        """
+        Adds the time a checkout waited for limit locks to the average.
+        """
+        with self.condition:
+            now = time.monotonic()
+            current = self.current_lock_wait(now)
+            self.lock_wait = current + LOCK_WAIT_WEIGHT * (seconds - current)
+            self.lock_wait_at = now
+
+    def acquire(self) -> None:
+        """
+        Admits a checkout or raises CheckoutOverloadedException. Retry-After of a rejection because of the lock wait is
+        the time the average needs to decay below the threshold.
+        """
+        with self.condition:
+            now = time.monotonic()
+            lock_wait = self.current_lock_wait(now)
+            if lock_wait > settings.CHECKOUT_MAX_LOCK_WAIT:
+                self.counters["rejected_lock_wait"] += 1
+                decay = settings.CHECKOUT_LOCK_WAIT_HALF_LIFE * math.log2(lock_wait / settings.CHECKOUT_MAX_LOCK_WAIT)
+                raise CheckoutOverloadedException(wait=max(1, math.ceil(decay)))
+
+            deadline = now + settings.CHECKOUT_QUEUE_SECONDS
+            queued = False
+            while self.in_flight >= settings.CHECKOUT_MAX_IN_FLIGHT:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["rejected_in_flight"] += 1
+                    raise CheckoutOverloadedException(wait=max(1, math.ceil(settings.CHECKOUT_QUEUE_SECONDS)))
+                queued = True
+                self.condition.wait(remaining)
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            if queued:
+                self.counters["queued"] += 1
+
+    def release(self) -> None:
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """
+        Runs the block as an admitted checkout, unless CHECKOUT_ADMISSION is disabled.
+        """
+        if not settings.CHECKOUT_ADMISSION:
+            yield
+            return
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        """
+        Counters of decisions of this process since start, checkouts in flight and the current lock wait average.
+        """
+        with self.condition:
+            return {
+                "pid": os.getpid(),
+                "in_flight": self.in_flight,
+                "lock_wait": round(self.current_lock_wait(time.monotonic()), 6),
+                **self.counters,
+            }
+
+
+checkout_admission = AdmissionController()
@@ -0,0 +1,36 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.http import HttpRequest, JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def authenticate(request: HttpRequest) -> User | None:
+    """
+    Authenticates plain Django request with DRF authentication classes. Returns None for anonymous users.
+    """
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        user = drf_request.user
+    except exceptions.APIException:
+        return None
+    return user if user.is_authenticated else None
+
+
+async def aauthenticate(request: HttpRequest) -> User | None:
+    """
+    Async version of authenticate, for views which use the async ORM.
+    """
+    return await sync_to_async(authenticate)(request)
+
+
+def not_authenticated_response() -> JsonResponse:
+    return JsonResponse(
+        {"detail": exceptions.NotAuthenticated.default_detail}, status=status.HTTP_401_UNAUTHORIZED,
+        headers={"WWW-Authenticate": 'Basic realm="api"'}
+    )
+
+
+def not_found_response() -> JsonResponse:
+    return JsonResponse({"detail": exceptions.NotFound.default_detail}, status=status.HTTP_404_NOT_FOUND)
@@ -9,8 +9,18 @@ class ErrorMessages:
     REGION_ACCESS_ERROR = "Region cannot have closed and unlimited access at the same time."
     REGION_LIMIT_EXCEEDED = "Region {}: closed or limit exceeded."
 
+    PRODUCT_LIMIT_EXCEEDED = "Product {}: limit exceeded."
+    PRODUCT_REGION_LIMIT_EXCEEDED = "Product {} in region {}: limit exceeded."
+
     CART_USER_MISMATCH = "Cart does not belong to user or does not exist."
 
+    ORDER_CANCEL_NOT_ALLOWED = "Only pending orders can be canceled."
+    CHECKOUT_OVERLOADED = "Checkout is overloaded, try again later."
+
+    OBJECT_NOT_FOUND = "Not found."
+    BATCH_IDS_INVALID = "Enter comma separated ids."
+    BATCH_IDS_TOO_MANY = "Enter at most {} ids."
+
 
 class CartStatuses(models.IntegerChoices):
     OPEN = 10
@@ -21,3 +31,9 @@ class OrderStatuses(models.IntegerChoices):
     PENDING = 10
     COMPLETED = 20
     CANCELED = 30
+
+
+class OrderEventTypes(models.TextChoices):
+    CREATED = "order.created"
+    CANCELED = "order.canceled"
+    DELETED = "order.deleted"
@@ -1,7 +1,7 @@
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from rest_framework import status
 
-from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.exceptions import APIException, ValidationError as APIValidationError
 
 from utils.constants import ErrorMessages
 
@@ -21,5 +21,22 @@ class RegionLimitExceedException(ValidationError):
     status_code = 400
 
 
+class ProductLimitExceedException(ValidationError):
+    status_code = 400
+
+
 class ObjectDoesNotExistAPIException(APIValidationError):
     status_code = 404
+
+
+class CheckoutOverloadedException(APIException):
+    """
+    Checkout rejected by admission control, `wait` seconds are sent in the Retry-After header.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = ErrorMessages.CHECKOUT_OVERLOADED
+    default_code = "checkout_overloaded"
+
+    def __init__(self, wait: int, detail: str | None = None, code: str | None = None) -> None:
+        super().__init__(detail, code)
+        self.wait = wait
@@ -3,7 +3,7 @@ from django.contrib.auth.models import User
 
 from faker import Factory as FakerFactory
 
-from shop.models import GlobalProductLimit, Product, Region
+from shop.models import GlobalProductLimit, Product, ProductLimit, Region
 from orders.models import Order, OrderItem
 from carts.models import Cart, CartItem
 
@@ -11,6 +11,8 @@ faker = FakerFactory.create()
 
 
 class UserFactory(factory.django.DjangoModelFactory):
+    username = factory.Sequence(lambda number: f"user{number}")
+
     class Meta:
         model = User
 
@@ -37,6 +39,14 @@ class ProductFactory(factory.django.DjangoModelFactory):
         model = Product
 
 
+class ProductLimitFactory(factory.django.DjangoModelFactory):
+    product = factory.SubFactory(ProductFactory)
+    limit_size = 1
+
+    class Meta:
+        model = ProductLimit
+
+
 class CartFactory(factory.django.DjangoModelFactory):
     user = factory.SubFactory(UserFactory)
     region = factory.SubFactory(RegionFactory)
@@ -0,0 +1,21 @@
+import itertools
+from typing import Iterable, Iterator
+
+from django.db.models import QuerySet
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Yields lists of at most `size` elements, so only one batch is held in memory at a time.
+    """
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+async def avalues_list(queryset: QuerySet, *fields: str) -> list[tuple]:
+    """
+    Async equivalent of `list(queryset.values_list(*fields))`. Rows are fetched with `values().aiterator()`, because
+    in Django 4.2 `values_list().aiterator()` executes the query in the event loop thread.
+    """
+    return [tuple(row[field] for field in fields) async for row in queryset.values(*fields).aiterator()]
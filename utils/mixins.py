@@ -0,0 +1,136 @@
+import datetime
+from typing import Callable
+
+from django.db.models import Count, Max, QuerySet
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from utils.constants import ErrorMessages
+from utils.serializers import BatchRetrieveSerializer
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional list and retrieve requests with 304 Not Modified. Version stamps are read with a single query
+    on the `updated_at` column, objects and their items are loaded only when the client's copy is stale.
+    Retrieve supports If-None-Match and If-Modified-Since. List supports If-None-Match only, its ETag includes number
+    of objects so deletions are detected as well.
+    """
+    stamp_field = "updated_at"
+
+    def get_list_querysets(self) -> list[QuerySet]:
+        """
+        Querysets of the list action, one per database storing the objects.
+        """
+        return [self.filter_queryset(self.get_queryset())]
+
+    def get_retrieve_querysets(self) -> list[QuerySet]:
+        """
+        Querysets which may contain the retrieved object, searched in order.
+        """
+        return [self.get_queryset()]
+
+    def get_changed_at(self) -> datetime.datetime | None:
+        """
+        Time of the last change not reflected by the stamp field (of data kept outside of the database).
+        """
+        return None
+
+    def latest_change(self, last_modified: datetime.datetime | None) -> datetime.datetime | None:
+        return max(filter(None, [last_modified, self.get_changed_at()]), default=None)
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        count, last_modified = 0, None
+        for queryset in self.get_list_querysets():
+            stamp = queryset.aggregate(last_modified=Max(self.stamp_field), count=Count("pk"))
+            count += stamp["count"]
+            if stamp["last_modified"] and (last_modified is None or stamp["last_modified"] > last_modified):
+                last_modified = stamp["last_modified"]
+        last_modified = self.latest_change(last_modified)
+        etag = f"{count}-{last_modified.timestamp() if last_modified else 0}"
+        return self.conditional_response(request, super().list, etag, None, *args, **kwargs)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        last_modified = None
+        for queryset in self.get_retrieve_querysets():
+            last_modified = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list(self.stamp_field, flat=True).first()
+            if last_modified is not None:
+                break
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        last_modified = self.latest_change(last_modified)
+        etag = f"{self.kwargs[lookup_url_kwarg]}-{last_modified.timestamp()}"
+        return self.conditional_response(request, super().retrieve, etag, last_modified, *args, **kwargs)
+
+    @staticmethod
+    def conditional_response(
+            request: Request, handler: Callable, etag: str, last_modified: datetime.datetime | None, *args, **kwargs
+    ) -> Response:
+        """
+        Returns 304 response if client's version matches, otherwise calls the handler. Sets validators on response.
+        """
+        etag = quote_etag(etag)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class MultiDatabaseListMixin:
+    """
+    List action for objects stored in several databases: serialized objects of `get_list_querysets()` (see
+    ConditionalGetMixin) are concatenated. The list is not paginated.
+    """
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        data = []
+        for queryset in self.get_list_querysets():
+            data.extend(self.get_serializer(queryset, many=True).data)
+        return Response(data)
+
+
+class BatchRetrieveMixin:
+    """
+    `batch` action returning up to BATCH_RETRIEVE_MAX_IDS objects requested by `ids` param in one response. Objects
+    are read with the querysets of `get_batch_querysets()`, which are filtered by `get_queryset()`, so objects of other
+    users are reported as not found just like missing ones. Entries keep the order of the requested ids. Querysets
+    left when all objects are found are not evaluated.
+    """
+
+    def get_batch_querysets(self, ids: list[int]) -> list[QuerySet]:
+        """
+        Querysets of the requested objects, one per database storing them.
+        """
+        return [self.get_queryset().filter(pk__in=ids)]
+
+    @action(detail=False, methods=["get"])
+    def batch(self, request: Request) -> Response:
+        """
+        Retrieve several objects by `ids` (comma separated). Each entry has the id and status, with `data` of found
+        objects or `detail` of missing ones.
+        """
+        params = BatchRetrieveSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ids = params.validated_data["ids"]
+        found = {}
+        for queryset in self.get_batch_querysets(ids):
+            if len(found) == len(ids):
+                break
+            for data in self.get_serializer(queryset, many=True).data:
+                found[data["id"]] = data
+        return Response([
+            {"id": object_id, "status": status.HTTP_200_OK, "data": found[object_id]} if object_id in found
+            else {"id": object_id, "status": status.HTTP_404_NOT_FOUND, "detail": ErrorMessages.OBJECT_NOT_FOUND}
+            for object_id in ids
+        ])
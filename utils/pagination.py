@@ -0,0 +1,55 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class ReportPagination(LimitOffsetPagination):
+    default_limit = 1000
+    max_limit = 10000
+
+
+class CatalogPagination(LimitOffsetPagination):
+    default_limit = 100
+    max_limit = 1000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of huge tables, which never counts more than exact_count_threshold rows. For
+    unfiltered querysets on PostgreSQL the number of rows is taken from table statistics instead of COUNT(*), which
+    scans the whole table. Other querysets are counted up to the threshold, larger ones are estimated by the planner on
+    PostgreSQL and reported as just above the threshold elsewhere.
+    """
+    exact_count_threshold = 100000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > self.exact_count_threshold:
+                return int(row[0])
+        # Counting a slice stops the scan after the threshold.
+        count = queryset.order_by()[:self.exact_count_threshold + 1].count()
+        if count <= self.exact_count_threshold or connection.vendor != "postgresql":
+            return count
+        return max(count, self.planner_estimate(queryset))
+
+    @staticmethod
+    def planner_estimate(queryset) -> int:
+        """
+        Number of rows of the queryset estimated by the PostgreSQL planner.
+        """
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,14 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer serializing with orjson. Falls back to the standard renderer when indented output is requested.
+    """
+
+    def render(self, data, accepted_media_type: str | None = None, renderer_context: dict | None = None) -> bytes:
+        renderer_context = renderer_context or {}
+        if data is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder_class().default)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from utils.constants import ErrorMessages
+
+# Largest value of BigAutoField primary keys, larger ids overflow database integer parameters.
+MAX_ID = 2 ** 63 - 1
+
+
+class BatchRetrieveSerializer(serializers.Serializer):
+    """
+    Params of batch retrieve: `ids`, comma separated positive ids, at most BATCH_RETRIEVE_MAX_IDS. Duplicates are
+    dropped, the order of the first occurrences is kept.
+    """
+    ids = serializers.CharField()
+
+    def validate_ids(self, value: str) -> list[int]:
+        try:
+            ids = list(dict.fromkeys(int(object_id) for object_id in value.split(",")))
+        except ValueError:
+            raise serializers.ValidationError(ErrorMessages.BATCH_IDS_INVALID)
+        if any(not 0 < object_id <= MAX_ID for object_id in ids):
+            raise serializers.ValidationError(ErrorMessages.BATCH_IDS_INVALID)
+        if len(ids) > settings.BATCH_RETRIEVE_MAX_IDS:
+            raise serializers.ValidationError(ErrorMessages.BATCH_IDS_TOO_MANY.format(settings.BATCH_RETRIEVE_MAX_IDS))
+        return ids
@@ -0,0 +1,128 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from django.db import OperationalError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from orders.models import Order
+from utils.admission import AdmissionController, checkout_admission
+from utils.exceptions import CheckoutOverloadedException
+from utils.factories import UserFactory
+
+
+@pytest.fixture
+def admission(settings):
+    settings.CHECKOUT_MAX_IN_FLIGHT = 1
+    settings.CHECKOUT_QUEUE_SECONDS = 0.05
+    settings.CHECKOUT_MAX_LOCK_WAIT = 1.0
+    settings.CHECKOUT_LOCK_WAIT_HALF_LIFE = 5.0
+    checkout_admission.reset()
+    yield checkout_admission
+    checkout_admission.reset()
+
+
+@pytest.mark.django_db
+class CheckoutAdmissionTestCase:
+    url = reverse("api:order-list")
+
+    def test_rejected_while_lock_wait_is_high(self, admission, client, global_limit, region, cart_1_item):
+        for _ in range(20):
+            admission.record_lock_wait(8.0)
+
+        response = client.post(self.url, data={"cart_id": cart_1_item.id})
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        # The average of 8 seconds halves below 1 second in three half-lives.
+        assert 10 < int(response["Retry-After"]) <= 15
+        assert not Order.objects.exists()
+        assert client.get(reverse("api:order-list")).status_code == status.HTTP_200_OK
+        assert admission.snapshot()["rejected_lock_wait"] == 1
+
+    def test_rejected_when_queue_wait_runs_out(self, admission, client, global_limit, region, cart_1_item):
+        admission.acquire()
+        try:
+            response = client.post(self.url, data={"cart_id": cart_1_item.id})
+        finally:
+            admission.release()
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "1"
+        assert client.post(self.url, data={"cart_id": cart_1_item.id}).status_code == status.HTTP_201_CREATED
+        snapshot = admission.snapshot()
+        assert (snapshot["admitted"], snapshot["rejected_in_flight"], snapshot["in_flight"]) == (2, 1, 0)
+
+    def test_checkout_records_lock_wait(self, admission, client, global_limit, region, cart_1_item):
+        assert client.post(self.url, data={"cart_id": cart_1_item.id}).status_code == status.HTTP_201_CREATED
+
+        assert admission.snapshot()["lock_wait"] > 0
+
+    def test_failed_transaction_records_lock_wait(
+            self, admission, client, global_limit, region, cart_1_item, monkeypatch
+    ):
+        @contextmanager
+        def busy_database():
+            time.sleep(0.01)
+            raise OperationalError("database is locked")
+            yield
+
+        monkeypatch.setattr("orders.serializers.immediate_atomic", busy_database)
+
+        with pytest.raises(OperationalError):
+            client.post(self.url, data={"cart_id": cart_1_item.id})
+
+        assert admission.snapshot()["lock_wait"] > 0
+
+    def test_disabled(self, admission, settings, client, global_limit, region, cart_1_item):
+        settings.CHECKOUT_ADMISSION = False
+        admission.record_lock_wait(100.0)
+
+        assert client.post(self.url, data={"cart_id": cart_1_item.id}).status_code == status.HTTP_201_CREATED
+
+    def test_counters_available_to_staff(self, admission, client):
+        url = reverse("api:checkout-admission-list")
+
+        assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
+        staff_client = APIClient()
+        staff_client.force_authenticate(UserFactory(is_staff=True))
+        response = staff_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data) == {
+            "pid", "in_flight", "lock_wait", "admitted", "queued", "rejected_in_flight", "rejected_lock_wait"
+        }
+
+
+class AdmissionControllerTestCase:
+
+    def test_queued_checkout_admitted_when_slot_frees(self, settings):
+        settings.CHECKOUT_MAX_IN_FLIGHT = 1
+        settings.CHECKOUT_QUEUE_SECONDS = 5.0
+        controller = AdmissionController()
+        controller.acquire()
+        threading.Timer(0.05, controller.release).start()
+
+        controller.acquire()
+
+        assert controller.counters["queued"] == 1
+        assert controller.in_flight == 1
+
+    def test_lock_wait_decays(self, settings):
+        settings.CHECKOUT_MAX_LOCK_WAIT = 1.0
+        settings.CHECKOUT_LOCK_WAIT_HALF_LIFE = 5.0
+        controller = AdmissionController()
+        controller.record_lock_wait(4.0)
+        controller.record_lock_wait(4.0)
+
+        with pytest.raises(CheckoutOverloadedException):
+            controller.acquire()
+
+        controller.lock_wait_at -= 10.0
+        controller.acquire()
+
+        assert controller.counters["rejected_lock_wait"] == 1
+        assert controller.counters["admitted"] == 1
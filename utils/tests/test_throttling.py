@@ -0,0 +1,55 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.settings import api_settings
+
+from orders.models import Order
+from utils.factories import CartFactory, CartItemFactory, UserFactory
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"checkout_user": "1/min", "checkout_region": "2/min", "checkout_global": "100/min"},
+    }
+    yield api_settings.DEFAULT_THROTTLE_RATES
+
+
+@pytest.mark.django_db
+class CheckoutThrottleTestCase:
+    url = reverse("api:order-list")
+
+    def test_user_throttled_before_checkout(
+            self, throttle_rates, client, global_limit, region, cart_1_item, django_assert_max_num_queries
+    ):
+        assert client.post(self.url, data={"cart_id": cart_1_item.id}).status_code == status.HTTP_201_CREATED
+
+        with django_assert_max_num_queries(1):
+            response = client.post(self.url, data={"cart_id": cart_1_item.id})
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 0 < int(response["Retry-After"]) <= 60
+        assert Order.objects.count() == 1
+
+    def test_region_throttle_shared_by_users(self, throttle_rates, client, product, region):
+        data = {"region": region.id, "cart_items": [{"product": product.id}]}
+        assert client.post(reverse("api:cart-list"), data=data, format="json").status_code == status.HTTP_201_CREATED
+
+        other_client = client.__class__()
+        other_client.force_authenticate(UserFactory())
+        assert other_client.post(
+            reverse("api:cart-list"), data=data, format="json"
+        ).status_code == status.HTTP_201_CREATED
+
+        third_client = client.__class__()
+        third_client.force_authenticate(UserFactory())
+        assert third_client.post(
+            reverse("api:cart-list"), data=data, format="json"
+        ).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_reads_are_not_throttled(self, throttle_rates, client, user, region):
+        CartItemFactory(cart=CartFactory(user=user, region=region))
+
+        for _ in range(3):
+            assert client.get(reverse("api:cart-list")).status_code == status.HTTP_200_OK
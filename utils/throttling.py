@@ -0,0 +1,102 @@
+from django.core.cache import caches
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from carts.models import Cart
+
+THROTTLE_CACHE = "throttle"
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket throttle. Rate is read from DEFAULT_THROTTLE_RATES[scope] in DRF format ("30/min"): the bucket holds
+    that many requests and is refilled evenly over the period. Buckets are kept in the THROTTLE_CACHE cache which
+    is shared by worker processes (file based by default). Read and write of a bucket is not atomic, under heavy
+    contention a few additional requests may pass.
+    """
+    cache_format = "throttle_%(scope)s_%(ident)s"
+
+    def __init__(self) -> None:
+        self.cache = caches[THROTTLE_CACHE]
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.wait_seconds = None
+
+    def get_rate(self) -> str | None:
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request: Request, view) -> bool:
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = self.timer()
+        tokens, updated_at = self.cache.get(key, (self.num_requests, now))
+        tokens = min(self.num_requests, tokens + (now - updated_at) * self.num_requests / self.duration)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            self.wait_seconds = (1 - tokens) * self.duration / self.num_requests
+        self.cache.set(key, (tokens, now), self.duration)
+        return allowed
+
+    def wait(self) -> float | None:
+        return self.wait_seconds
+
+
+class CheckoutUserThrottle(TokenBucketThrottle):
+    scope = "checkout_user"
+
+    def get_cache_key(self, request: Request, view) -> str:
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk or self.get_ident(request)}
+
+
+class CheckoutRegionThrottle(TokenBucketThrottle):
+    """
+    Region is taken from request data of cart creation or from the cart of order creation.
+    """
+    scope = "checkout_region"
+
+    def get_cache_key(self, request: Request, view) -> str | None:
+        try:
+            if "region" in request.data:
+                region_id = int(request.data["region"])
+            else:
+                region_id = Cart.objects.filter(id=int(request.data["cart_id"])).values_list(
+                    "region_id", flat=True
+                ).first()
+        except (KeyError, TypeError, ValueError):
+            return None
+        if region_id is None:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": region_id}
+
+
+class CheckoutGlobalThrottle(TokenBucketThrottle):
+    scope = "checkout_global"
+
+    def get_cache_key(self, request: Request, view) -> str:
+        return self.cache_format % {"scope": self.scope, "ident": "all"}
+
+
+class CheckoutThrottleMixin:
+    """
+    Throttles only create action of a viewset, before any database locking takes place. Throttles are checked in
+    order (user, region, global) and checking stops at the first rejection, so one client exceeding its own limit
+    does not use up region and global buckets.
+    """
+    throttle_classes = [CheckoutUserThrottle, CheckoutRegionThrottle, CheckoutGlobalThrottle]
+
+    def get_throttles(self) -> list[TokenBucketThrottle]:
+        if self.action != "create":
+            return []
+        return super().get_throttles()
+
+    def check_throttles(self, request: Request) -> None:
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())
@@ -0,0 +1,43 @@
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def immediate_atomic(using: str | None = None) -> Iterator[None]:
+    """
+    `transaction.atomic` for transactions which lock and update shared rows (limit usage counters). On SQLite the
+    outermost block starts with BEGIN IMMEDIATE, so concurrent checkouts wait for the write lock up to the busy
+    timeout instead of failing with "database is locked". Other databases lock rows with SELECT ... FOR UPDATE and
+    get a plain atomic block.
+    """
+    connection = transaction.get_connection(using)
+    immediate = hasattr(connection, "begin_immediate") and not connection.in_atomic_block
+    if immediate:
+        connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            if immediate:
+                connection.begin_immediate = False
+            yield
+    finally:
+        if immediate:
+            connection.begin_immediate = False
+
+
+def robust_on_commit(func: Callable, *args, using: str | None = None, **kwargs) -> None:
+    """
+    Calls func with the arguments after the transaction commits. The change is committed by then, so errors are logged
+    instead of failing the request (a client retrying a committed checkout would order twice).
+    """
+    def callback() -> None:
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("%s failed after commit.", func.__qualname__)
+
+    transaction.on_commit(callback, using=using)